@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Parallel Asymptotic File Hasher
+
+Fingerprints files with convert.asymptotic_hash without loading them into
+memory. Files are streamed through convert.AsymptoticHasher with large read
+buffers and hashed concurrently on a thread pool (hashlib releases the GIL
+while hashing large buffers, so threads use all cores).
+
+Output follows the sha256sum layout, one "<hash>  <path>" line per file.
+
+Usage:
+    python3 ahash.py backup/*.tar
+    python3 ahash.py -r artifacts/ --bits 256 -w 8
+    cat notes.txt | python3 ahash.py -
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Tuple
+
+import convert
+
+DEFAULT_BUFFER_SIZE = 4 * 1024 * 1024
+
+
+def iter_paths(paths: List[str], recursive: bool) -> Iterator[str]:
+    """Expand directories (when recursive) into the files they contain."""
+    for path in paths:
+        if recursive and os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    yield os.path.join(root, name)
+        else:
+            yield path
+
+
+def hash_path(path: str, bits: int, buffer_size: int) -> Tuple[str, str, int]:
+    """
+    Hash one file.
+
+    Returns:
+        Tuple[str, str, int]: (path, hex digest or error message, bytes read)
+        where a failed file reports "[Error: ...]" and 0 bytes
+    """
+    try:
+        size = os.path.getsize(path)
+        return path, convert.asymptotic_hash_file(path, bits, buffer_size), size
+    except OSError as e:
+        return path, f"[Error: {e.strerror or e}]", 0
+
+
+def hash_stdin(bits: int, buffer_size: int) -> Tuple[str, int]:
+    """Hash standard input incrementally; returns (hex digest, bytes read)."""
+    hasher = convert.AsymptoticHasher(bits=bits)
+    total = 0
+    while True:
+        chunk = sys.stdin.buffer.read(buffer_size)
+        if not chunk:
+            break
+        hasher.update(chunk)
+        total += len(chunk)
+    return hasher.hexdigest(), total
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Compute asymptotic hashes of files in parallel"
+    )
+    parser.add_argument(
+        "paths", nargs="+", help="Files to hash ('-' for stdin)"
+    )
+    parser.add_argument(
+        "-r", "--recursive", action="store_true",
+        help="Hash every file under directory arguments",
+    )
+    parser.add_argument(
+        "--bits", type=int, default=128,
+        help="Hash size in bits, 8-512 (default: 128)",
+    )
+    parser.add_argument(
+        "-w", "--workers", type=int, default=os.cpu_count() or 1,
+        help="Files hashed concurrently (default: all cores)",
+    )
+    parser.add_argument(
+        "--buffer-size", type=int, default=DEFAULT_BUFFER_SIZE,
+        help=f"Read buffer size in bytes (default: {DEFAULT_BUFFER_SIZE})",
+    )
+    parser.add_argument(
+        "-q", "--quiet", action="store_true", help="Do not report throughput"
+    )
+    args = parser.parse_args()
+
+    if not 8 <= args.bits <= 512:
+        parser.error("--bits must be between 8 and 512")
+
+    start = time.perf_counter()
+    total_bytes = 0
+    failures = 0
+
+    if args.paths == ["-"]:
+        digest, total_bytes = hash_stdin(args.bits, args.buffer_size)
+        print(f"{digest}  -")
+    else:
+        with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+            # map() keeps output in argument order
+            results = pool.map(
+                lambda p: hash_path(p, args.bits, args.buffer_size),
+                iter_paths(args.paths, args.recursive),
+            )
+            for path, digest, size in results:
+                if digest.startswith("[Error"):
+                    failures += 1
+                    print(f"{path}: {digest}", file=sys.stderr)
+                    continue
+                total_bytes += size
+                print(f"{digest}  {path}")
+
+    elapsed = time.perf_counter() - start
+    if not args.quiet:
+        mb = total_bytes / (1024 * 1024)
+        rate = mb / elapsed if elapsed > 0 else 0.0
+        print(f"Hashed {mb:.2f} MB in {elapsed:.2f}s ({rate:.1f} MB/s)",
+              file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,562 @@
+#!/usr/bin/env python3
+"""
+Conversion Benchmark Suite
+
+Performance baseline for the public convert.py functions. Each case builds
+an input of a given size, then calls one function repeatedly and records:
+
+- ops/s: calls per second (best of several timed rounds)
+- throughput: input units per second, where the unit is bytes for text and
+  crypto cases and items for batch builders such as UTM URLs
+- peak memory: peak Python heap allocation during one call (tracemalloc;
+  buffers allocated inside OpenSSL are not seen)
+
+Sizes sweep from 10 B to 100 MB where the function is meant for large
+input; URL builders and RSA-OAEP only run at the sizes they accept.
+Sizes above --max-size (default 10M) are skipped, so pass --max-size 100M
+for the full sweep.
+
+Results can be written as JSON and compared against a stored baseline.
+Cases that got slower, or use more memory, by more than --threshold are
+flagged, and the exit status is 1.
+
+Usage:
+    python3 bench_suite.py --list
+    python3 bench_suite.py -o results.json
+    python3 bench_suite.py --max-size 100M -o baseline.json
+    python3 bench_suite.py --filter aes,base64 --baseline baseline.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+import convert
+
+KB = 1024
+MB = 1024 * 1024
+TEXT_SIZES = (10, KB, 100 * KB, 10 * MB, 100 * MB)
+SMALL_SIZES = (10, 100, KB, 10 * KB)
+DEFAULT_MAX_SIZE = 10 * MB
+DEFAULT_MIN_TIME = 0.2
+DEFAULT_THRESHOLD = 0.2
+MEMORY_SLACK = 64 * KB  # peak changes below this are never flagged
+
+PASSWORD = "benchmark-password"
+URL = "https://www.example.com/login"
+
+
+class BenchCase(NamedTuple):
+    """
+    One benchmarked function.
+
+    setup(size) builds the input and returns a zero-argument callable that
+    performs one operation on it.
+    """
+    name: str
+    family: str
+    setup: Callable[[int], Callable[[], object]]
+    sizes: Sequence[int]
+    unit: str = "B"
+    backends: Sequence[str] = ()
+
+
+class BenchResult(NamedTuple):
+    case: str
+    family: str
+    size: int
+    unit: str
+    ops_per_sec: float
+    units_per_sec: float
+    peak_bytes: int
+
+
+def make_text(size: int) -> str:
+    """Mostly ASCII text with some multi-byte characters, size chars long."""
+    unit = "The quick brown fox <jumps> & \"runs\" 42 times. héllo wörld ✓\n"
+    return (unit * (size // len(unit) + 1))[:size]
+
+
+# --- case builders -------------------------------------------------------
+
+def _html_entities(size: int):
+    text = make_text(size)
+    return lambda: convert.text_to_html_entities(text)
+
+
+def _base64_encode(size: int):
+    text = make_text(size)
+    return lambda: convert.text_to_base64(text)
+
+
+def _base64_decode(size: int):
+    encoded = convert.text_to_base64(make_text(size))
+    return lambda: convert.base64_to_text(encoded)
+
+
+def _regex(level: int, linear: bool = False):
+    def setup(size: int):
+        text = make_text(size)
+        return lambda: convert.escape_regex(text, level, linear)
+    return setup
+
+
+def _saml_url(size: int):
+    relay_state = make_text(size)
+    return lambda: convert.create_saml_url(URL, relay_state, URL)
+
+
+def _saml_hash(size: int):
+    custom_hash = "a" * size
+    return lambda: convert.create_saml_url_with_hash(URL, custom_hash)
+
+
+def _advanced_saml(size: int):
+    email = "u" * max(1, size - len("@example.com")) + "@example.com"
+    return lambda: convert.create_advanced_saml_url(
+        URL, email, "[a-z0-9]+", PASSWORD
+    )
+
+
+def _advanced_saml_verify(cached: bool):
+    def setup(size: int):
+        email = "u" * max(1, size - len("@example.com")) + "@example.com"
+        saml_url = convert.create_advanced_saml_url(URL, email, "[a-z0-9]+",
+                                                    PASSWORD)
+        return lambda: convert.verify_advanced_saml_url(saml_url, PASSWORD,
+                                                        cached)
+    return setup
+
+
+def _utm_batch(count: int):
+    return lambda: convert.generate_batch_utm_urls(
+        URL, "newsletter", "email", "spring", content="a", count=count
+    )
+
+
+def _cipher(encrypt_many, decrypt_many, decrypt: bool, salt_size: int):
+    # A fixed salt keeps the derived key cached, as in a real batch
+    def setup(size: int):
+        records = [make_text(size)]
+        salt = os.urandom(salt_size)
+        if not decrypt:
+            return lambda: encrypt_many(records, PASSWORD, salt)
+        sealed = encrypt_many(records, PASSWORD, salt)
+        return lambda: decrypt_many(sealed, PASSWORD)
+    return setup
+
+
+def _envelope(algorithm: str, decrypt: bool):
+    def setup(size: int):
+        records = [make_text(size)]
+        salt = os.urandom(16)
+        sealed = convert.envelope_encrypt_many(records, PASSWORD, algorithm,
+                                               salt)
+        if not decrypt:
+            return lambda: convert.envelope_encrypt_many(
+                records, PASSWORD, algorithm, salt
+            )
+        return lambda: convert.decrypt_many(sealed, PASSWORD)
+    return setup
+
+
+def _raw_cipher(algorithm: str):
+    """Bare cipher pass over bytes, without KDF, padding or base64."""
+    def setup(size: int):
+        data = os.urandom(size)
+        if algorithm in ("aes-256-gcm", "chacha20-poly1305"):
+            aead = (convert.AESGCM if algorithm == "aes-256-gcm"
+                    else convert.ChaCha20Poly1305)(os.urandom(32))
+            nonce = os.urandom(12)
+            return lambda: aead.encrypt(nonce, data, None)
+        if algorithm == "aes-256-cbc":
+            block, iv = convert.AES(os.urandom(32)), os.urandom(16)
+        else:
+            block, iv = convert.Blowfish(os.urandom(56)), os.urandom(8)
+        data = data[:len(data) - len(data) % len(iv)] or bytes(len(iv))
+
+        def run():
+            encryptor = convert.Cipher(block, convert.modes.CBC(iv)).encryptor()
+            return encryptor.update(data) + encryptor.finalize()
+        return run
+    return setup
+
+
+_rsa_keys: Dict[str, object] = {}
+
+
+def _rsa_keypair():
+    """One 2048-bit keypair shared by every RSA case."""
+    if not _rsa_keys:
+        private_pem, public_pem = convert.rsa_generate_keys(2048)
+        _rsa_keys["private"] = convert.load_rsa_private_key(private_pem)
+        _rsa_keys["public"] = convert.load_rsa_public_key(public_pem)
+    return _rsa_keys["private"], _rsa_keys["public"]
+
+
+def _rsa_oaep(decrypt: bool):
+    def setup(size: int):
+        private_key, public_key = _rsa_keypair()
+        data = make_text(size).encode("utf-8")[:size]
+        oaep = convert.rsa_oaep_padding()
+        if not decrypt:
+            return lambda: public_key.encrypt(data, oaep)
+        sealed = public_key.encrypt(data, oaep)
+        return lambda: private_key.decrypt(sealed, oaep)
+    return setup
+
+
+def _rsa_envelope(decrypt: bool):
+    def setup(size: int):
+        import rsa_envelope
+        private_key, public_key = _rsa_keypair()
+        data = make_text(size).encode("utf-8")[:size]
+        if not decrypt:
+            return lambda: rsa_envelope.encrypt_bytes(data, public_key)
+        sealed = rsa_envelope.encrypt_bytes(data, public_key)
+        return lambda: rsa_envelope.decrypt_bytes(sealed, private_key)
+    return setup
+
+
+def _snapi_link(compact: bool):
+    def setup(size: int):
+        url = URL + "/" + "p" * max(0, size - len(URL) - 1)
+        return lambda: convert.generate_snapi_link(url, PASSWORD,
+                                                   compact=compact)
+    return setup
+
+
+def _snapi_verify(cached: bool, compact: bool = False):
+    def setup(size: int):
+        url = URL + "/" + "p" * max(0, size - len(URL) - 1)
+        link = convert.generate_snapi_link(url, PASSWORD, compact=compact)
+        return lambda: convert.verify_snapi_link(link, PASSWORD, cached)
+    return setup
+
+
+def _asymptotic_hash(size: int):
+    text = make_text(size)
+    return lambda: convert.asymptotic_hash(text, 256)
+
+
+CRYPTO = ("crypto",)
+OAEP_SIZES = (10, 100, 190)  # 190 B is the OAEP-SHA256 limit for RSA-2048
+
+CASES: List[BenchCase] = [
+    BenchCase("html-entities", "text", _html_entities, TEXT_SIZES[:4]),
+    BenchCase("base64-encode", "text", _base64_encode, TEXT_SIZES),
+    BenchCase("base64-decode", "text", _base64_decode, TEXT_SIZES),
+    BenchCase("regex-escape-1", "text", _regex(1), SMALL_SIZES),
+    BenchCase("regex-escape-2", "text", _regex(2), SMALL_SIZES),
+    BenchCase("regex-escape-3", "text", _regex(3), SMALL_SIZES),
+    BenchCase("regex-escape-3-linear", "text", _regex(3, True), SMALL_SIZES),
+    BenchCase("saml-url", "saml", _saml_url, SMALL_SIZES),
+    BenchCase("saml-hash", "saml", _saml_hash, SMALL_SIZES),
+    BenchCase("advanced-saml", "saml", _advanced_saml, (32, 256, KB),
+              backends=CRYPTO),
+    BenchCase("advanced-saml-verify", "saml", _advanced_saml_verify(False),
+              (32, 256, KB), backends=CRYPTO),
+    BenchCase("advanced-saml-verify-cached", "saml",
+              _advanced_saml_verify(True), (32, 256, KB), backends=CRYPTO),
+    BenchCase("utm-batch", "saml", _utm_batch, (1, 100, 10000), unit="urls"),
+    BenchCase("aes-encrypt", "crypto",
+              _cipher(convert.aes_encrypt_many, convert.aes_decrypt_many,
+                      False, 16), TEXT_SIZES, backends=CRYPTO),
+    BenchCase("aes-decrypt", "crypto",
+              _cipher(convert.aes_encrypt_many, convert.aes_decrypt_many,
+                      True, 16), TEXT_SIZES, backends=CRYPTO),
+    BenchCase("blowfish-encrypt", "crypto",
+              _cipher(convert.blowfish_encrypt_many,
+                      convert.blowfish_decrypt_many, False, 8),
+              TEXT_SIZES, backends=CRYPTO),
+    BenchCase("blowfish-decrypt", "crypto",
+              _cipher(convert.blowfish_encrypt_many,
+                      convert.blowfish_decrypt_many, True, 8),
+              TEXT_SIZES, backends=CRYPTO),
+    BenchCase("envelope-aes-gcm-encrypt", "crypto",
+              _envelope("aes-256-gcm", False), TEXT_SIZES, backends=CRYPTO),
+    BenchCase("envelope-aes-gcm-decrypt", "crypto",
+              _envelope("aes-256-gcm", True), TEXT_SIZES, backends=CRYPTO),
+    BenchCase("envelope-chacha20-encrypt", "crypto",
+              _envelope("chacha20-poly1305", False), TEXT_SIZES,
+              backends=CRYPTO),
+    BenchCase("envelope-chacha20-decrypt", "crypto",
+              _envelope("chacha20-poly1305", True), TEXT_SIZES,
+              backends=CRYPTO),
+    BenchCase("cipher-aes-256-cbc", "cipher", _raw_cipher("aes-256-cbc"),
+              TEXT_SIZES, backends=CRYPTO),
+    BenchCase("cipher-blowfish-cbc", "cipher", _raw_cipher("blowfish-cbc"),
+              TEXT_SIZES, backends=CRYPTO),
+    BenchCase("cipher-aes-256-gcm", "cipher", _raw_cipher("aes-256-gcm"),
+              TEXT_SIZES, backends=CRYPTO),
+    BenchCase("cipher-chacha20-poly1305", "cipher",
+              _raw_cipher("chacha20-poly1305"), TEXT_SIZES, backends=CRYPTO),
+    BenchCase("rsa-oaep-encrypt", "crypto", _rsa_oaep(False), OAEP_SIZES,
+              backends=CRYPTO),
+    BenchCase("rsa-oaep-decrypt", "crypto", _rsa_oaep(True), OAEP_SIZES,
+              backends=CRYPTO),
+    BenchCase("rsa-envelope-encrypt", "crypto", _rsa_envelope(False),
+              TEXT_SIZES, backends=CRYPTO),
+    BenchCase("rsa-envelope-decrypt", "crypto", _rsa_envelope(True),
+              TEXT_SIZES, backends=CRYPTO),
+    BenchCase("snapi-link", "math", _snapi_link(False), (64, 256, KB)),
+    BenchCase("snapi-link-compact", "math", _snapi_link(True),
+              (64, 256, KB)),
+    BenchCase("snapi-verify", "math", _snapi_verify(False), (64, 256, KB)),
+    BenchCase("snapi-verify-compact", "math", _snapi_verify(False, True),
+              (64, 256, KB)),
+    BenchCase("snapi-verify-cached", "math", _snapi_verify(True),
+              (64, 256, KB)),
+    BenchCase("asymptotic-hash", "math", _asymptotic_hash, TEXT_SIZES),
+]
+
+
+# --- measurement ---------------------------------------------------------
+
+def time_operation(op: Callable[[], object], min_time: float,
+                   repeat: int) -> float:
+    """
+    Return the best seconds per call over repeat timed rounds.
+
+    The first call doubles as a warm-up and calibrates how many calls are
+    needed for one round to last at least min_time.
+    """
+    start = time.perf_counter()
+    op()
+    single = time.perf_counter() - start
+    calls = max(1, int(min_time / single)) if single > 0 else 1000
+
+    best = single
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(calls):
+                op()
+            best = min(best, (time.perf_counter() - start) / calls)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return best
+
+
+def peak_memory(op: Callable[[], object]) -> int:
+    """Peak Python heap bytes allocated while running op once."""
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        op()
+        return tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+
+
+def run_case(case: BenchCase, size: int, min_time: float,
+             repeat: int) -> BenchResult:
+    """Build the input for one size and measure the operation on it."""
+    op = case.setup(size)
+    seconds = time_operation(op, min_time, repeat)
+    ops = 1 / seconds if seconds > 0 else float("inf")
+    return BenchResult(case.name, case.family, size, case.unit, ops,
+                       ops * size, peak_memory(op))
+
+
+def select_cases(names: Optional[str]) -> List[BenchCase]:
+    """Cases whose name or family contains one of the comma-separated terms."""
+    if not names:
+        return list(CASES)
+    terms = [t.strip() for t in names.split(",") if t.strip()]
+    return [c for c in CASES
+            if any(t in c.name or t == c.family for t in terms)]
+
+
+def run_suite(cases: Sequence[BenchCase], max_size: int, min_time: float,
+              repeat: int, quiet: bool = False) -> List[BenchResult]:
+    """Run every case at every size up to max_size, printing as it goes."""
+    results = []
+    if not quiet:
+        print(f"{'case':<28} {'size':>8} {'ops/s':>12} {'throughput':>12} "
+              f"{'peak mem':>10}")
+    for case in cases:
+        if not all(convert.load_backend(b) for b in case.backends):
+            if not quiet:
+                print(f"{case.name:<28} skipped (backend not installed)")
+            continue
+        for size in case.sizes:
+            if size > max_size:
+                continue
+            result = run_case(case, size, min_time, repeat)
+            results.append(result)
+            if not quiet:
+                print(f"{case.name:<28} {format_size(size, case.unit):>8} "
+                      f"{result.ops_per_sec:>12,.1f} "
+                      f"{format_rate(result.units_per_sec, case.unit):>12} "
+                      f"{format_size(result.peak_bytes, 'B'):>10}",
+                      flush=True)
+    return results
+
+
+# --- reporting and baselines ----------------------------------------------
+
+def format_size(value: float, unit: str) -> str:
+    if unit != "B":
+        return f"{value:,.0f}"
+    for suffix, scale in (("M", MB), ("K", KB)):
+        if value >= scale:
+            return f"{value / scale:.1f}{suffix}"
+    return f"{value:.0f}B"
+
+
+def format_rate(value: float, unit: str) -> str:
+    if unit != "B":
+        return f"{value:,.0f} {unit}/s"
+    return f"{format_size(value, 'B')}/s"
+
+
+def parse_size(text: str) -> int:
+    """Parse sizes such as 100, 64K or 100M."""
+    text = text.strip().upper()
+    scale = {"K": KB, "M": MB, "G": 1024 * MB}.get(text[-1:], 1)
+    return int(float(text[:-1] if scale > 1 else text) * scale)
+
+
+def to_json(results: Sequence[BenchResult], args: argparse.Namespace) -> dict:
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "min_time": args.min_time,
+            "repeat": args.repeat,
+        },
+        "results": [r._asdict() for r in results],
+    }
+
+
+def compare(results: Sequence[BenchResult], baseline: dict,
+            threshold: float) -> List[str]:
+    """
+    Compare results with a baseline produced by to_json.
+
+    Returns:
+        List[str]: One line per regression; cases missing from the baseline
+        are ignored
+    """
+    previous = {
+        (r["case"], r["size"]): r for r in baseline.get("results", [])
+    }
+    regressions = []
+    for result in results:
+        old = previous.get((result.case, result.size))
+        if old is None:
+            continue
+        label = f"{result.case} @ {format_size(result.size, result.unit)}"
+        speed = result.ops_per_sec / old["ops_per_sec"] - 1
+        if speed < -threshold:
+            regressions.append(
+                f"{label}: {old['ops_per_sec']:,.1f} -> "
+                f"{result.ops_per_sec:,.1f} ops/s ({speed:+.0%})"
+            )
+        grown = result.peak_bytes - old["peak_bytes"]
+        if (grown > MEMORY_SLACK
+                and result.peak_bytes > old["peak_bytes"] * (1 + threshold)):
+            regressions.append(
+                f"{label}: peak memory "
+                f"{format_size(old['peak_bytes'], 'B')} -> "
+                f"{format_size(result.peak_bytes, 'B')}"
+            )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark convert.py conversions across input sizes"
+    )
+    parser.add_argument(
+        "--filter", metavar="TERMS",
+        help="Comma-separated case names or families (text, saml, crypto, "
+             "cipher, math); substrings match",
+    )
+    parser.add_argument(
+        "--max-size", type=parse_size, default=DEFAULT_MAX_SIZE,
+        help="Largest input size to run, e.g. 1M or 100M (default: 10M)",
+    )
+    parser.add_argument(
+        "--min-time", type=float, default=DEFAULT_MIN_TIME,
+        help=f"Seconds per timed round (default: {DEFAULT_MIN_TIME})",
+    )
+    parser.add_argument(
+        "-r", "--repeat", type=int, default=3,
+        help="Timed rounds per size; the best is kept (default: 3)",
+    )
+    parser.add_argument(
+        "-o", "--output", metavar="FILE", help="Write results as JSON"
+    )
+    parser.add_argument(
+        "--baseline", metavar="FILE",
+        help="Compare with a JSON baseline and flag regressions",
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=DEFAULT_THRESHOLD,
+        help="Allowed slowdown or memory growth as a fraction "
+             f"(default: {DEFAULT_THRESHOLD})",
+    )
+    parser.add_argument(
+        "--list", action="store_true", help="List the cases and exit"
+    )
+    parser.add_argument(
+        "-q", "--quiet", action="store_true", help="Do not print the table"
+    )
+    args = parser.parse_args()
+
+    cases = select_cases(args.filter)
+    if args.list:
+        for case in cases:
+            sizes = ", ".join(format_size(s, case.unit) for s in case.sizes)
+            print(f"{case.name:<28} {case.family:<7} {sizes}")
+        return 0
+    if not cases:
+        print(f"Error: no cases match {args.filter!r}", file=sys.stderr)
+        return 1
+
+    baseline = None
+    if args.baseline:
+        try:
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error: cannot read baseline: {e}", file=sys.stderr)
+            return 1
+
+    results = run_suite(cases, args.max_size, args.min_time,
+                        max(1, args.repeat), args.quiet)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(to_json(results, args), f, indent=2)
+            f.write("\n")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) against "
+                  f"{args.baseline}:", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            return 1
+        print(f"\nNo regressions against {args.baseline} "
+              f"(threshold {args.threshold:.0%})", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Bulk Field Encryption
+
+Encrypts or decrypts selected fields of every record in a JSONL or CSV file
+using a process pool. Records are read in chunks, processed on all cores and
+written back in input order as soon as each chunk is ready, so memory stays
+bounded by the number of chunks in flight.
+
+With -a aes or blowfish, ciphertexts use the same salt+iv+ciphertext layout
+as convert.aes_encrypt and convert.blowfish_encrypt. With -a aes-256-gcm or
+chacha20-poly1305 they are versioned envelopes (convert.envelope_encrypt_many).
+Either way, values written here can be opened with the single-record
+functions and vice versa. Decryption recognises envelopes whatever -a says.
+Each worker derives its key once and reuses it for every chunk it handles.
+
+String fields are encrypted as-is. Numbers, booleans, lists and objects are
+JSON-encoded behind a JSON_VALUE_PREFIX marker and decoded again on
+decryption, so a JSONL round trip keeps field types. Null fields are left
+untouched.
+
+Usage:
+    python3 bulk_crypt.py encrypt -i users.jsonl -o users.enc.jsonl -f email,phone
+    python3 bulk_crypt.py decrypt -i users.enc.csv -o users.csv -f email -a blowfish
+    python3 bulk_crypt.py encrypt -i users.jsonl -o users.enc.jsonl -f email -a chacha20-poly1305
+"""
+
+import argparse
+import csv
+import getpass
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import convert
+
+DEFAULT_CHUNK_SIZE = 1000
+# Marks plaintexts that hold a JSON-encoded non-string value
+JSON_VALUE_PREFIX = "\x00json:"
+SALT_SIZES = {"aes": 16, "blowfish": 8, "aes-256-gcm": 16,
+              "chacha20-poly1305": 16}
+
+# Per-worker state set by _init_worker
+_worker_password: Optional[str] = None
+_worker_salt: Optional[bytes] = None
+
+
+def _init_worker(password: str, algorithm: str) -> None:
+    """Store the password and pick one batch salt for this worker process."""
+    global _worker_password, _worker_salt
+    _worker_password = password
+    _worker_salt = os.urandom(SALT_SIZES[algorithm])
+
+
+def _encode_value(value: Any) -> str:
+    """Return the plaintext for a field value, tagging non-string values."""
+    if isinstance(value, str):
+        return value
+    return JSON_VALUE_PREFIX + json.dumps(value, ensure_ascii=False)
+
+
+def _decode_value(plaintext: str) -> Any:
+    """Restore a value written by _encode_value."""
+    if not plaintext.startswith(JSON_VALUE_PREFIX):
+        return plaintext
+    try:
+        return json.loads(plaintext[len(JSON_VALUE_PREFIX):])
+    except ValueError as e:
+        return f"[Decryption error: invalid JSON value: {e}]"
+
+
+def _process_chunk(
+    records: List[Dict[str, Any]], fields: Sequence[str],
+    mode: str, algorithm: str
+) -> List[Dict[str, Any]]:
+    """
+    Encrypt or decrypt the selected fields of a chunk of records.
+
+    Missing or null fields are left untouched. Non-string values are
+    JSON-encoded behind JSON_VALUE_PREFIX before encryption and decoded back
+    to their original type on decryption. Values that fail to decrypt are
+    replaced with "[Decryption error: ...]" strings, matching convert.py.
+    """
+    if algorithm in convert.ENVELOPE_ALGORITHMS:
+        if mode == "encrypt":
+            def many(values, password, salt):
+                return convert.envelope_encrypt_many(values, password,
+                                                     algorithm, salt)
+        else:
+            many = convert.decrypt_many
+    elif mode == "encrypt":
+        many = (convert.aes_encrypt_many if algorithm == "aes"
+                else convert.blowfish_encrypt_many)
+    else:
+        many = (convert.aes_decrypt_many if algorithm == "aes"
+                else convert.blowfish_decrypt_many)
+
+    for field in fields:
+        rows = [r for r in records if r.get(field) not in (None, "")]
+        if not rows:
+            continue
+        values = [r[field] for r in rows]
+        if mode == "encrypt":
+            results = many([_encode_value(v) for v in values],
+                           _worker_password, salt=_worker_salt)
+        else:
+            results = [
+                _decode_value(v)
+                for v in many([v if isinstance(v, str) else json.dumps(v)
+                              for v in values], _worker_password)
+            ]
+        for row, value in zip(rows, results):
+            row[field] = value
+    return records
+
+
+def _chunked(records: Iterable[Dict[str, Any]],
+             size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Group records into lists of at most size items."""
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def process_records(
+    records: Iterable[Dict[str, Any]], fields: Sequence[str], password: str,
+    mode: str = "encrypt", algorithm: str = "aes",
+    workers: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[Dict[str, Any]]:
+    """
+    Encrypt or decrypt fields of records across a process pool.
+
+    Args:
+        records: Iterable of dict records (consumed lazily)
+        fields: Names of the fields to transform
+        password: Encryption password
+        mode: "encrypt" or "decrypt"
+        algorithm: "aes", "blowfish", "aes-256-gcm" or "chacha20-poly1305"
+        workers: Number of worker processes (default: all cores)
+        chunk_size: Records per work unit
+
+    Yields:
+        Dict[str, Any]: Transformed records in input order
+    """
+    if not convert.CRYPTO_AVAILABLE:
+        raise RuntimeError("Cryptography package not installed")
+    if mode not in ("encrypt", "decrypt"):
+        raise ValueError(f"Invalid mode: {mode}")
+    if algorithm not in SALT_SIZES:
+        raise ValueError(f"Invalid algorithm: {algorithm}")
+    if not password:
+        raise ValueError("Empty password")
+
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = workers * 2
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(password, algorithm),
+    ) as pool:
+        pending = deque()
+        for chunk in _chunked(records, chunk_size):
+            pending.append(
+                pool.submit(_process_chunk, chunk, fields, mode, algorithm)
+            )
+            if len(pending) >= max_in_flight:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def _detect_format(path: Optional[str], explicit: Optional[str]) -> str:
+    """Choose jsonl or csv from the explicit flag or the file extension."""
+    if explicit:
+        return explicit
+    if path and path.lower().endswith(".csv"):
+        return "csv"
+    return "jsonl"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Encrypt or decrypt fields of JSONL/CSV records in parallel"
+    )
+    parser.add_argument("mode", choices=["encrypt", "decrypt"])
+    parser.add_argument("-i", "--input", help="Input file (default: stdin)")
+    parser.add_argument("-o", "--output", help="Output file (default: stdout)")
+    parser.add_argument(
+        "-f", "--fields", required=True,
+        help="Comma-separated list of fields to transform",
+    )
+    parser.add_argument(
+        "-a", "--algorithm", choices=sorted(SALT_SIZES), default="aes",
+        help="Cipher to use (default: aes)",
+    )
+    parser.add_argument(
+        "--format", choices=["jsonl", "csv"],
+        help="Record format (default: from input extension, else jsonl)",
+    )
+    parser.add_argument(
+        "-w", "--workers", type=int,
+        help="Worker processes (default: all cores)",
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+        help=f"Records per work unit (default: {DEFAULT_CHUNK_SIZE})",
+    )
+    parser.add_argument(
+        "--password-env", metavar="VAR",
+        help="Read the password from this environment variable",
+    )
+    args = parser.parse_args()
+
+    if not convert.CRYPTO_AVAILABLE:
+        print("Error: Cryptography package not installed.", file=sys.stderr)
+        return 1
+
+    fields = [f.strip() for f in args.fields.split(",") if f.strip()]
+    password = (os.environ.get(args.password_env) if args.password_env
+                else getpass.getpass("Enter password: "))
+    if not password:
+        print("Error: Empty password", file=sys.stderr)
+        return 1
+
+    fmt = _detect_format(args.input, args.format)
+    src = (open(args.input, newline="", encoding="utf-8") if args.input
+           else sys.stdin)
+    dst = (open(args.output, "w", newline="", encoding="utf-8",
+                buffering=1024 * 1024) if args.output else sys.stdout)
+
+    count = 0
+    start = time.perf_counter()
+    try:
+        if fmt == "csv":
+            reader = csv.DictReader(src)
+            writer = csv.DictWriter(dst, fieldnames=reader.fieldnames or [])
+            writer.writeheader()
+            records = reader
+        else:
+            records = (json.loads(line) for line in src if line.strip())
+
+        for record in process_records(
+            records, fields, password, args.mode, args.algorithm,
+            args.workers, args.chunk_size
+        ):
+            if fmt == "csv":
+                writer.writerow(record)
+            else:
+                dst.write(json.dumps(record, ensure_ascii=False) + "\n")
+            count += 1
+    except (ValueError, csv.Error) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if args.input:
+            src.close()
+        if args.output:
+            dst.close()
+    elapsed = time.perf_counter() - start
+
+    rate = count / elapsed if elapsed > 0 else 0.0
+    print(
+        f"{args.mode.capitalize()}ed {count} records in {elapsed:.2f}s "
+        f"({rate:.0f} records/s)",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
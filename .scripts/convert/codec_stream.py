@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Streaming Text Codecs
+
+Pipeline-friendly versions of convert.text_to_html_entities,
+convert.text_to_base64 and convert.base64_to_text. Input is processed in
+fixed-size chunks, so memory use stays constant however large the input is:
+
+- entities: UTF-8 input is decoded incrementally, so a multi-byte character
+  split across two reads is never broken, and each chunk is converted with
+  the precomputed convert.HTML_ENTITY_TABLE.
+- b64encode: reads in multiples of 3 bytes, so chunk outputs concatenate into
+  one valid Base64 string with padding only at the very end.
+- b64decode: strips whitespace and decodes in multiples of 4 characters,
+  carrying any remainder into the next read. Output is raw bytes.
+
+Usage:
+    cat page.txt | python3 codec_stream.py entities > page.html
+    python3 codec_stream.py b64encode -i image.png -o image.b64
+    python3 codec_stream.py b64decode -i image.b64 -o image.png
+"""
+
+import argparse
+import base64
+import binascii
+import codecs
+import sys
+import time
+from typing import BinaryIO
+
+import convert
+
+DEFAULT_CHUNK_SIZE = 3 * 256 * 1024  # 768 KiB, a multiple of 3 and 4
+_WHITESPACE = b" \t\r\n\v\f"
+
+
+def entities_stream(src: BinaryIO, dst: BinaryIO,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """
+    Convert UTF-8 text from src into HTML entities written to dst.
+
+    Returns:
+        int: Number of input bytes processed
+
+    Raises:
+        ValueError: If the input is not valid UTF-8
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    table = convert.HTML_ENTITY_TABLE
+    total = 0
+    while True:
+        chunk = src.read(chunk_size)
+        final = not chunk
+        try:
+            text = decoder.decode(chunk, final)
+        except UnicodeDecodeError as e:
+            raise ValueError(
+                f"Invalid UTF-8 input near byte {total + e.start}: {e.reason}"
+            )
+        if text:
+            dst.write(text.translate(table).encode("ascii"))
+        if final:
+            break
+        total += len(chunk)
+    dst.flush()
+    return total
+
+
+def b64encode_stream(src: BinaryIO, dst: BinaryIO,
+                     chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """
+    Base64-encode everything read from src into dst.
+
+    Returns:
+        int: Number of input bytes processed
+    """
+    chunk_size = max(3, chunk_size - chunk_size % 3)
+    pending = b""
+    total = 0
+    while True:
+        data = src.read(chunk_size - len(pending))
+        if not data:
+            break
+        pending += data
+        total += len(data)
+        # Only encode whole 3-byte groups until the input is exhausted
+        aligned = len(pending) - len(pending) % 3
+        if aligned:
+            dst.write(binascii.b2a_base64(pending[:aligned], newline=False))
+            pending = pending[aligned:]
+    if pending:
+        dst.write(binascii.b2a_base64(pending, newline=False))
+    dst.flush()
+    return total
+
+
+def b64decode_stream(src: BinaryIO, dst: BinaryIO,
+                     chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """
+    Decode Base64 read from src (whitespace ignored) into raw bytes in dst.
+
+    Returns:
+        int: Number of decoded bytes written
+
+    Raises:
+        ValueError: If the input is not valid Base64
+    """
+    pending = b""
+    total = 0
+    while True:
+        data = src.read(chunk_size)
+        if not data:
+            break
+        pending += data.translate(None, _WHITESPACE)
+        aligned = len(pending) - len(pending) % 4
+        if aligned:
+            try:
+                decoded = base64.b64decode(pending[:aligned], validate=True)
+            except binascii.Error as e:
+                raise ValueError(f"Invalid Base64 input: {e}")
+            dst.write(decoded)
+            total += len(decoded)
+            pending = pending[aligned:]
+    if pending:
+        raise ValueError("Invalid Base64 input: truncated final group")
+    dst.flush()
+    return total
+
+
+CODECS = {
+    "entities": entities_stream,
+    "b64encode": b64encode_stream,
+    "b64decode": b64decode_stream,
+}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Constant-memory HTML entity and Base64 codecs for pipelines"
+    )
+    parser.add_argument("codec", choices=sorted(CODECS))
+    parser.add_argument("-i", "--input", help="Input file (default: stdin)")
+    parser.add_argument("-o", "--output", help="Output file (default: stdout)")
+    parser.add_argument(
+        "--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+        help=f"Bytes read per chunk (default: {DEFAULT_CHUNK_SIZE})",
+    )
+    parser.add_argument(
+        "-v", "--verbose", action="store_true",
+        help="Report throughput on stderr",
+    )
+    args = parser.parse_args()
+
+    src = open(args.input, "rb") if args.input else sys.stdin.buffer
+    dst = open(args.output, "wb") if args.output else sys.stdout.buffer
+    start = time.perf_counter()
+    try:
+        total = CODECS[args.codec](src, dst, max(4, args.chunk_size))
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if args.input:
+            src.close()
+        if args.output:
+            dst.close()
+    elapsed = time.perf_counter() - start
+
+    if args.verbose:
+        mb = total / (1024 * 1024)
+        rate = mb / elapsed if elapsed > 0 else 0.0
+        print(f"{args.codec}: {mb:.2f} MB in {elapsed:.2f}s ({rate:.1f} MB/s)",
+              file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
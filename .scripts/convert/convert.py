@@ -38,39 +38,152 @@ Example:
     Math Link: URL with embedded mathematical token for verification
 """
 
+import argparse
 import base64
+import functools
 import getpass
 import hashlib
+import hmac
+import importlib
+import importlib.util
+import json
 import math
 import os
 import random
 import re
+import struct
+import sys
+import threading
 import time
 import urllib.parse
 import uuid
-from typing import Optional, Tuple
-
-# Import crypto libraries with graceful fallback
-CRYPTO_AVAILABLE = True
-try:
-    # Import Blowfish from decrepit to avoid deprecation warnings
-    from cryptography.hazmat.decrepit.ciphers.algorithms import Blowfish
-    from cryptography.hazmat.primitives import hashes, serialization
-    from cryptography.hazmat.primitives.asymmetric import padding, rsa
-    from cryptography.hazmat.primitives.ciphers import Cipher, modes
-    from cryptography.hazmat.primitives.ciphers.algorithms import AES
-    from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-except ImportError:
-    CRYPTO_AVAILABLE = False
+from collections import OrderedDict
+from typing import (
+    Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence,
+    Tuple, Union
+)
+
+import modmath
+
+
+class _LazyImport:
+    """
+    Placeholder for a backend name that is imported on first use.
+
+    The first call or attribute access imports the real object and rebinds
+    the module global to it, so later lookups go straight to the backend.
+    """
+
+    def __init__(self, name: str, module: str, attr: Optional[str] = None):
+        self._name = name
+        self._module = module
+        self._attr = attr
+
+    def _load(self):
+        obj = importlib.import_module(self._module)
+        if self._attr:
+            obj = getattr(obj, self._attr)
+        globals()[self._name] = obj
+        return obj
+
+    def __getattr__(self, item):
+        return getattr(self._load(), item)
+
+    def __call__(self, *args, **kwargs):
+        return self._load()(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        target = f"{self._module}.{self._attr}" if self._attr else self._module
+        return f"<lazy import {target}>"
+
+
+# Crypto libraries with graceful fallback; imported when first used
+CRYPTO_AVAILABLE = importlib.util.find_spec("cryptography") is not None
+if not CRYPTO_AVAILABLE:
     print("Warning: Cryptography package not installed.")
     print("To enable encryption, install with: pip install cryptography")
 
-# Optional MongoDB import for session management
-try:
-    from pymongo import MongoClient
-    MONGODB_AVAILABLE = True
-except ImportError:
-    MONGODB_AVAILABLE = False
+# Blowfish comes from decrepit to avoid deprecation warnings
+Blowfish = _LazyImport(
+    "Blowfish", "cryptography.hazmat.decrepit.ciphers.algorithms", "Blowfish"
+)
+hashes = _LazyImport("hashes", "cryptography.hazmat.primitives.hashes")
+serialization = _LazyImport(
+    "serialization", "cryptography.hazmat.primitives.serialization"
+)
+padding = _LazyImport(
+    "padding", "cryptography.hazmat.primitives.asymmetric.padding"
+)
+rsa = _LazyImport("rsa", "cryptography.hazmat.primitives.asymmetric.rsa")
+Cipher = _LazyImport("Cipher", "cryptography.hazmat.primitives.ciphers", "Cipher")
+modes = _LazyImport("modes", "cryptography.hazmat.primitives.ciphers.modes")
+AES = _LazyImport(
+    "AES", "cryptography.hazmat.primitives.ciphers.algorithms", "AES"
+)
+PBKDF2HMAC = _LazyImport(
+    "PBKDF2HMAC", "cryptography.hazmat.primitives.kdf.pbkdf2", "PBKDF2HMAC"
+)
+AESGCM = _LazyImport(
+    "AESGCM", "cryptography.hazmat.primitives.ciphers.aead", "AESGCM"
+)
+ChaCha20Poly1305 = _LazyImport(
+    "ChaCha20Poly1305", "cryptography.hazmat.primitives.ciphers.aead",
+    "ChaCha20Poly1305"
+)
+
+# Optional MongoDB for session management
+MONGODB_AVAILABLE = importlib.util.find_spec("pymongo") is not None
+MongoClient = _LazyImport("MongoClient", "pymongo", "MongoClient")
+
+# Names each backend provides; see load_backend()
+BACKENDS = {
+    "crypto": ("Blowfish", "hashes", "serialization", "padding", "rsa",
+               "Cipher", "modes", "AES", "PBKDF2HMAC", "AESGCM",
+               "ChaCha20Poly1305"),
+    "mongodb": ("MongoClient",),
+}
+
+
+def load_backend(name: str) -> bool:
+    """
+    Import a backend now rather than on first use.
+
+    Args:
+        name (str): "crypto", "mongodb" or "numpy"
+
+    Returns:
+        bool: True if the backend is installed and imported
+    """
+    if name == "numpy":
+        return modmath.load_numpy() is not None
+    try:
+        for attr in BACKENDS[name]:
+            obj = globals()[attr]
+            if isinstance(obj, _LazyImport):
+                obj._load()
+    except ImportError:
+        return False
+    return True
+
+
+class _EntityTable(dict):
+    """
+    str.translate table mapping code points to '&#N;'.
+
+    Code points outside the precomputed range are formatted on each lookup
+    and not stored, so the table keeps a fixed size whatever the input.
+    """
+
+    def __missing__(self, code_point: int) -> str:
+        return f'&#{code_point};'
+
+
+HTML_ENTITY_TABLE_SIZE = 4096
+
+# Precomputed for the first 4096 code points (Latin, Greek, Cyrillic, ...)
+HTML_ENTITY_TABLE = _EntityTable(
+    (cp, f'&#{cp};') for cp in range(HTML_ENTITY_TABLE_SIZE)
+)
 
 
 def text_to_html_entities(text: str) -> str:
@@ -87,7 +200,7 @@ def text_to_html_entities(text: str) -> str:
         >>> text_to_html_entities("A")
         '&#65;'
     """
-    return ''.join(f'&#{ord(c)};' for c in text)
+    return text.translate(HTML_ENTITY_TABLE)
 
 
 def text_to_base64(text: str) -> str:
@@ -127,7 +240,8 @@ def base64_to_text(encoded_text: str) -> str:
         raise ValueError(f"Invalid Base64 string: {e}")
 
 
-def escape_regex(text: str, security_level: int = 1) -> str:
+def escape_regex(text: str, security_level: int = 1,
+                 linear: bool = False) -> str:
     """
     Escape and transform a string into a secure regex pattern using cryptographic principles.
 
@@ -141,6 +255,12 @@ def escape_regex(text: str, security_level: int = 1) -> str:
             1 = Basic escaping
             2 = Intermediate with character classes and alternations
             3 = Advanced with cryptographic hashing and non-deterministic elements
+        linear (bool, optional): For levels 2 and 3, emit a pattern built
+            from possessive quantifiers and atomic groups, so matching time
+            stays linear in the input length (Python 3.11+). It is
+            equivalent to the default pattern except as noted in
+            _linear_regex_level2 (subjects with a newline before the end
+            never match) and _linear_regex_level3 (fillers differ).
 
     Returns:
         str: The secure regex pattern that will only match the original input.
@@ -158,6 +278,11 @@ def escape_regex(text: str, security_level: int = 1) -> str:
     if security_level == 1:
         return escaped_text
 
+    if linear and security_level == 2:
+        return _linear_regex_level2(text)
+    if linear and security_level == 3:
+        return _linear_regex_level3(text)
+
     # Intermediate security (Level 2)
     if security_level == 2:
         # Create character class alternatives for each character
@@ -217,6 +342,101 @@ def escape_regex(text: str, security_level: int = 1) -> str:
     return escaped_text
 
 
+def _regex_class_members(char: str) -> str:
+    """Character-class body for one character of an escape_regex level 2 pattern."""
+    if char.isalpha():
+        return re.escape(char.lower() + char.upper())
+    return re.escape(char)
+
+
+def _linear_regex_level2(text: str) -> str:
+    """
+    Level 2 pattern without backtracking, matching the same strings.
+
+    The original joins per-character classes with lazy ".*?" gaps, which is a
+    subsequence test that backtracks polynomially on near misses. On a
+    subject without inner newlines every gap, including the "[^0-9]*?" and
+    "+?" tails of digits and special characters, can absorb any run of
+    characters, so each gap here skips possessively to the first character
+    of the next class. Only the last element keeps its tail: a digit must be
+    the last digit of the subject ("[5][^0-9]*+"), and a special character
+    only needs to be the last character (its repeats are themselves the last
+    character). The final ".*" backtracks at most once per position.
+
+    A digit tail may also cross newlines, which makes the choice of
+    positions depend on every later line and cannot be made without
+    backtracking. Subjects containing a newline before the end are therefore
+    refused: a possessive lookahead rejects them up front, where the original
+    pattern may match them. Every other subject gets the same answer.
+    """
+    if not text:
+        return "^$"
+    members = [_regex_class_members(char) for char in text]
+
+    def tail(char: str) -> str:
+        if char.isdigit():
+            return "[^0-9]*+"
+        if char in r'.^$*+?()[]{}|\\':
+            return f"[{re.escape(char)}]*+"
+        return ""
+
+    pattern = [f"[{members[0]}]"]
+    if len(members) == 1:
+        pattern.append(tail(text[0]))
+    else:
+        for body in members[1:-1]:
+            pattern.append(f"[^{body}\\n]*+[{body}]")
+        pattern.append(f".*[{members[-1]}]")
+        if text[-1].isdigit():
+            pattern.append(tail(text[-1]))
+    return f"^(?=[^\\n]*+\\n?\\Z){''.join(pattern)}$"
+
+
+def _linear_regex_level3(text: str) -> str:
+    """
+    Level 3 pattern without backtracking.
+
+    Anchoring comes first and each lookahead skips possessively to its
+    character, so a search no longer rescans the input from every position.
+    The optional filler after each character is an atomic group that is only
+    taken when it is not the next required character, and the choice is
+    never revisited. The original text and its filler variants still match;
+    the one difference from the original is that a filler equal to the next
+    required character (e.g. "aaaa" for "aa") is no longer accepted.
+    """
+    lookaheads = "".join(
+        f"(?=[^{re.escape(char)}\\n]*+{re.escape(char)})"
+        for char in dict.fromkeys(text)
+    )
+    parts = []
+    for i, char in enumerate(text):
+        following = text[i + 1] if i + 1 < len(text) else None
+        if following is None:
+            filler = "(?>\\S|)"
+        else:
+            filler = f"(?>(?!{re.escape(following)})\\S|)"
+        parts.append(re.escape(char) + filler)
+    return f"^{lookaheads}(?:{''.join(parts)})$"
+
+
+REGEX_CACHE_SIZE = 256
+
+
+@functools.lru_cache(maxsize=REGEX_CACHE_SIZE)
+def compile_escaped_regex(text: str, security_level: int = 1,
+                          linear: bool = False, flags: int = 0) -> "re.Pattern":
+    """
+    Build and compile an escape_regex pattern once per distinct argument set.
+
+    Repeated lookups return the same compiled object without regenerating
+    the pattern string.
+
+    Returns:
+        re.Pattern: The compiled pattern
+    """
+    return re.compile(escape_regex(text, security_level, linear), flags)
+
+
 def create_advanced_saml_url(
     url: str, email: str, pattern: str, encryption_key: str
 ) -> str:
@@ -239,121 +459,198 @@ def create_advanced_saml_url(
     Note:
         Generated URLs are guaranteed to be unique due to UUID and timestamp
         components. The HASH(BEGIN) and HASH(END) components must match for
-        validation to succeed.
+        validation to succeed. To create many URLs under one key, or URLs in
+        the compact format, use SamlUrlSigner.
     """
     if not CRYPTO_AVAILABLE:
         return "[Error: Cryptography package required for advanced SAML URLs]"
 
     try:
-        # Generate a unique UUID (never the same)
-        unique_id = str(uuid.uuid4())
+        return SamlUrlSigner(encryption_key).sign(url, email, pattern)
+    except Exception as e:
+        return f"[SAML URL generation error: {str(e)}]"
 
-        # Add timestamp to ensure uniqueness even with same inputs
-        timestamp = str(int(time.time()))
 
-        # Generate HASH(BEGIN) and HASH(END) which must work together
-        hash_seed = encryption_key + timestamp
-        hash_begin = hashlib.sha256(
-            (hash_seed + "BEGIN").encode()
-        ).hexdigest()[:16]
-        hash_end = hashlib.sha256(
-            (hash_seed + "END").encode()
-        ).hexdigest()[:16]
+VERIFICATION_CACHE_SIZE = 4096
+VERIFICATION_CACHE_TTL = 300.0  # longest lifetime of a cache entry
 
-        # Component 1: Encoded URL with UUID
-        component_1 = base64.urlsafe_b64encode(
-            (url + ":" + unique_id + ":" + timestamp).encode()
-        ).decode().rstrip("=")
 
-        # Component 2: Encryption + HASH(BEGIN) + hazmat
-        # Use AES for encryption with the HASH(BEGIN) as additional data
-        key_bytes = hashlib.sha256(encryption_key.encode()).digest()
-        iv = os.urandom(16)
-        cipher = Cipher(AES(key_bytes), modes.GCM(iv))
-        encryptor = cipher.encryptor()
-        encryptor.authenticate_additional_data(hash_begin.encode())
-        component_2_raw = (
-            encryptor.update(hash_begin.encode()) + encryptor.finalize()
-        )
-        component_2_tag = encryptor.tag
-        component_2 = base64.urlsafe_b64encode(
-            iv + component_2_raw + component_2_tag
-        ).decode().rstrip("=")
+class VerificationCache:
+    """
+    Thread-safe LRU cache of successful SAML and SNAPI link verifications.
 
-        # Component 3: Regex + email
-        email_pattern = re.escape(email)
-        component_3 = base64.urlsafe_b64encode(
-            (email_pattern + ":" + email).encode()
-        ).decode().rstrip("=")
+    Entries are looked up by SHA-256 of (key id, URL), where the key id is an
+    HMAC of the key under a per-process random secret, so keys are never
+    stored. Only valid results are cached. An entry expires at the link's
+    own expiry time or after ttl_seconds, whichever comes first.
+    """
 
-        # Component 4: Encryption layer
-        cipher = Cipher(AES(key_bytes), modes.CBC(iv))
-        encryptor = cipher.encryptor()
-        padded_email = (
-            email.encode() + b'\0' * (16 - (len(email.encode()) % 16))
-        )
-        component_4 = base64.urlsafe_b64encode(
-            iv + encryptor.update(padded_email) + encryptor.finalize()
-        ).decode().rstrip("=")
+    def __init__(self, max_entries: int = VERIFICATION_CACHE_SIZE,
+                 ttl_seconds: float = VERIFICATION_CACHE_TTL):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of verified links to keep
+            ttl_seconds: Longest lifetime of any entry
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._keyed = hmac.new(os.urandom(32), digestmod=hashlib.sha256)
+        self._entries: "OrderedDict[bytes, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key_id(self, key: str, scope: str) -> bytes:
+        """Identify a key within a scope ("saml" or "snapi")."""
+        keyed = self._keyed.copy()
+        keyed.update(f"{scope}|{key}".encode())
+        return keyed.digest()[:16]
+
+    @staticmethod
+    def _lookup_key(key_id: bytes, url: str) -> bytes:
+        return hashlib.sha256(key_id + url.encode()).digest()
+
+    def get(self, key_id: bytes, url: str,
+            now: Optional[float] = None) -> Optional[str]:
+        """Return the cached success message, or None if missing or expired."""
+        lookup = self._lookup_key(key_id, url)
+        current_time = time.time() if now is None else now
+        with self._lock:
+            entry = self._entries.get(lookup)
+            if entry is None:
+                self.misses += 1
+                return None
+            message, expires_at = entry
+            if current_time > expires_at:
+                del self._entries[lookup]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(lookup)
+            self.hits += 1
+            return message
+
+    def put(self, key_id: bytes, url: str, message: str,
+            expires_at: Optional[float] = None,
+            now: Optional[float] = None) -> None:
+        """
+        Record a successful verification.
+
+        Args:
+            key_id: Result of key_id() for the verifying key
+            url: The verified URL
+            message: The success message to return on later hits
+            expires_at: UNIX time after which the link is no longer valid;
+                        capped at ttl_seconds from now, which is also used
+                        when it is None
+            now: Current UNIX time; defaults to time.time()
+        """
+        if self.max_entries <= 0:
+            return
+        latest = (time.time() if now is None else now) + self.ttl_seconds
+        expires_at = latest if expires_at is None else min(expires_at, latest)
+        lookup = self._lookup_key(key_id, url)
+        with self._lock:
+            self._entries.pop(lookup, None)
+            self._entries[lookup] = (message, expires_at)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, float]:
+        """Entry count, hit and miss counters, and the hit rate."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
 
-        # Component 5: Regex pattern + HASH(END)
-        component_5 = base64.urlsafe_b64encode(
-            (pattern + ":" + hash_end).encode()
-        ).decode().rstrip("=")
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
 
-        # Component 6: Final encryption layer
-        cipher = Cipher(AES(key_bytes), modes.CFB8(iv))
-        encryptor = cipher.encryptor()
-        component_6 = base64.urlsafe_b64encode(
-            iv + encryptor.update(hash_end.encode()) + encryptor.finalize()
-        ).decode().rstrip("=")
+    def __len__(self) -> int:
+        return len(self._entries)
 
-        # Assemble the final URL
-        result = (
-            f"{url}/{component_1}/{component_2}/{component_3}/"
-            f"{component_4}/{component_5}/{component_6}/exit/"
-        )
 
-        return result
-    except Exception as e:
-        return f"[SAML URL generation error: {str(e)}]"
+# Shared cache used by verify_advanced_saml_url and verify_snapi_link
+_verification_cache = VerificationCache()
 
 
-def verify_advanced_saml_url(
-    saml_url: str, encryption_key: str
-) -> Tuple[bool, str]:
+def verification_cache_stats() -> Dict[str, float]:
+    """Counters of the shared link verification cache."""
+    return _verification_cache.stats()
+
+
+def clear_verification_cache() -> None:
+    """Discard every cached link verification (e.g. after a key rotation)."""
+    _verification_cache.clear()
+
+
+class SamlKeyMaterial:
+    """
+    Key-dependent values shared by every advanced SAML URL verification.
+
+    Building this once per encryption key avoids re-hashing the key and
+    re-creating the AES key schedule for every URL checked.
+    """
+
+    __slots__ = ("aes", "seed_prefix")
+
+    def __init__(self, encryption_key: str):
+        """
+        Precompute key material.
+
+        Args:
+            encryption_key: The encryption key used to create the URLs
+        """
+        self.aes = AES(hashlib.sha256(encryption_key.encode()).digest())
+        # hash_seed is encryption_key + timestamp, so the key can be absorbed
+        # into a SHA-256 state once and copied per URL
+        self.seed_prefix = hashlib.sha256(encryption_key.encode())
+
+    def seed_hash(self, timestamp: str, label: str) -> str:
+        """Return sha256(encryption_key + timestamp + label)[:16] as hex."""
+        digest = self.seed_prefix.copy()
+        digest.update((timestamp + label).encode())
+        return digest.hexdigest()[:16]
+
+
+def check_advanced_saml_url(
+    saml_url: str, material: "SamlKeyMaterial"
+) -> Tuple[str, str]:
     """
-    Verify an advanced SAML URL created with create_advanced_saml_url.
+    Verify an advanced SAML URL against precomputed key material.
 
     Args:
         saml_url (str): The advanced SAML URL to verify
-        encryption_key (str): The encryption key used to create the URL
+        material (SamlKeyMaterial): Key material for the encryption key
 
     Returns:
-        Tuple[bool, str]: (is_valid, message) where is_valid indicates if
-                          the URL is valid and message provides details
+        Tuple[str, str]: (code, message) where code is one of "ok",
+                         "format", "begin_hash", "end_hash", "email" or
+                         "error", and message provides details
     """
-    if not CRYPTO_AVAILABLE:
-        return False, "Cryptography package required for verification"
-
     try:
-        # Split the URL into components
+        # Split the URL into components; the six components always sit
+        # right before the trailing "exit" marker
         parts = saml_url.rstrip("/").split("/")
 
         if len(parts) < 8:  # Ensure we have enough parts
-            return False, "Invalid URL format: insufficient components"
+            return "format", "Invalid URL format: insufficient components"
 
-        # We don't use domain and component_6 directly, but keep for clarity
-        # domain = parts[0]
-        component_1 = parts[1]  # encoded+UUID
-        component_2 = parts[2]  # HASH(BEGIN)
-        component_3 = parts[3]  # email
-        component_4 = parts[4]  # encrypted email
-        component_5 = parts[5]  # pattern+HASH(END)
-        # component_6 = parts[6]  # encrypted HASH(END)
-
-        # Derive key from the encryption key
-        key_bytes = hashlib.sha256(encryption_key.encode()).digest()
+        component_1 = parts[-7]  # encoded+UUID
+        component_2 = parts[-6]  # HASH(BEGIN)
+        component_3 = parts[-5]  # email
+        component_4 = parts[-4]  # encrypted email
+        component_5 = parts[-3]  # pattern+HASH(END)
+        # component_6 = parts[-2]  # encrypted HASH(END)
 
         # Extract and verify HASH(BEGIN) from component 2
         try:
@@ -362,8 +659,7 @@ def verify_advanced_saml_url(
             encrypted_data = data[16:-16]
             tag = data[-16:]
 
-            cipher = Cipher(AES(key_bytes), modes.GCM(iv, tag))
-            decryptor = cipher.decryptor()
+            decryptor = Cipher(material.aes, modes.GCM(iv, tag)).decryptor()
 
             # We need to extract the hash_begin to authenticate with
             # First, decode component 1 to get timestamp
@@ -371,20 +667,17 @@ def verify_advanced_saml_url(
             timestamp = comp1_data.split(":")[-1]
 
             # Regenerate hash_begin for authentication
-            hash_seed = encryption_key + timestamp
-            expected_hash_begin = hashlib.sha256(
-                (hash_seed + "BEGIN").encode()
-            ).hexdigest()[:16]
+            expected_hash_begin = material.seed_hash(timestamp, "BEGIN")
 
             decryptor.authenticate_additional_data(expected_hash_begin.encode())
             hash_begin = decryptor.update(encrypted_data) + decryptor.finalize()
             hash_begin = hash_begin.decode()
 
             if hash_begin != expected_hash_begin:
-                return False, "BEGIN hash validation failed"
+                return "begin_hash", "BEGIN hash validation failed"
 
         except Exception as e:
-            return False, f"Failed to verify BEGIN hash: {str(e)}"
+            return "begin_hash", f"Failed to verify BEGIN hash: {str(e)}"
 
         # Extract and verify HASH(END) from component 5
         try:
@@ -392,15 +685,13 @@ def verify_advanced_saml_url(
             hash_end = comp5_data.split(":")[-1]
 
             # Regenerate hash_end for comparison
-            expected_hash_end = hashlib.sha256(
-                (hash_seed + "END").encode()
-            ).hexdigest()[:16]
+            expected_hash_end = material.seed_hash(timestamp, "END")
 
             if hash_end != expected_hash_end:
-                return False, "END hash validation failed"
+                return "end_hash", "END hash validation failed"
 
         except Exception as e:
-            return False, f"Failed to verify END hash: {str(e)}"
+            return "end_hash", f"Failed to verify END hash: {str(e)}"
 
         # Decrypt email for verification
         try:
@@ -408,8 +699,7 @@ def verify_advanced_saml_url(
             iv = data[:16]
             encrypted_data = data[16:]
 
-            cipher = Cipher(AES(key_bytes), modes.CBC(iv))
-            decryptor = cipher.decryptor()
+            decryptor = Cipher(material.aes, modes.CBC(iv)).decryptor()
             decrypted_email = (
                 decryptor.update(encrypted_data) + decryptor.finalize()
             )
@@ -420,17 +710,286 @@ def verify_advanced_saml_url(
             encoded_email = comp3_data.split(":")[-1]
 
             if decrypted_email != encoded_email:
-                return False, "Email verification failed"
+                return "email", "Email verification failed"
 
         except Exception as e:
-            return False, f"Failed to verify email: {str(e)}"
+            return "email", f"Failed to verify email: {str(e)}"
 
         # All validations passed
-        return True, "URL verification successful"
+        return "ok", "URL verification successful"
 
+    except Exception as e:
+        return "error", f"Verification error: {str(e)}"
+
+
+COMPACT_SAML_VERSION = 1
+# version | nonce, followed by the sealed claims and the GCM tag
+_COMPACT_SAML_HEADER = struct.Struct(">B12s")
+# uuid | timestamp | email length, followed by the email and the pattern
+_COMPACT_SAML_CLAIMS = struct.Struct(">16sIH")
+
+
+class SamlClaims(NamedTuple):
+    """Fields carried by a compact advanced SAML URL."""
+    unique_id: str
+    timestamp: int
+    email: str
+    pattern: str
+
+
+class SamlUrlSigner:
+    """
+    Creates and verifies advanced SAML URLs under one encryption key.
+
+    The key hash, the AES key schedule and the SHA-256 state for the
+    BEGIN/END hashes are computed once, so each URL only pays for its own
+    ciphers. Two URL formats are supported:
+
+    - legacy: the six-component format of create_advanced_saml_url
+    - compact: domain/<blob>, where blob is base64url of
+      version | nonce | AES-GCM(uuid | timestamp | email | pattern). The
+      domain is bound as associated data and a single tag covers every
+      field, so the URL is about half as long and needs one AEAD operation
+      to verify. The email and pattern are encrypted rather than encoded.
+
+    Verification detects the format, so both can be mixed in one batch.
+
+    Args:
+        encryption_key (str): Key for encryption layers
+    """
+
+    def __init__(self, encryption_key: str):
+        self.material = SamlKeyMaterial(encryption_key)
+        # Separate key for the compact format, so the two formats never
+        # share nonces under one key
+        self._aead = AESGCM(hmac.new(
+            self.material.aes.key, b"compact-saml-url", hashlib.sha256
+        ).digest())
+
+    def sign(self, url: str, email: str, pattern: str,
+             compact: bool = False) -> str:
+        """
+        Create an advanced SAML URL.
+
+        Args:
+            url (str): The base URL (domain)
+            email (str): Email to encode in the SAML URL
+            pattern (str): Pattern to use for regex validation
+            compact (bool): Emit the compact single-blob format
+
+        Returns:
+            str: The SAML URL
+        """
+        if compact:
+            return self._sign_compact(url, email, pattern)
+        return self._sign_legacy(url, email, pattern)
+
+    def _sign_legacy(self, url: str, email: str, pattern: str) -> str:
+        """Build the six-component URL described in create_advanced_saml_url."""
+        aes = self.material.aes
+
+        # Generate a unique UUID (never the same)
+        unique_id = str(uuid.uuid4())
+
+        # Add timestamp to ensure uniqueness even with same inputs
+        timestamp = str(int(time.time()))
+
+        # Generate HASH(BEGIN) and HASH(END) which must work together
+        hash_begin = self.material.seed_hash(timestamp, "BEGIN")
+        hash_end = self.material.seed_hash(timestamp, "END")
+
+        # Component 1: Encoded URL with UUID
+        component_1 = base64.urlsafe_b64encode(
+            (url + ":" + unique_id + ":" + timestamp).encode()
+        ).decode().rstrip("=")
+
+        # Component 2: Encryption + HASH(BEGIN) + hazmat
+        # Use AES for encryption with the HASH(BEGIN) as additional data
+        iv = os.urandom(16)
+        encryptor = Cipher(aes, modes.GCM(iv)).encryptor()
+        encryptor.authenticate_additional_data(hash_begin.encode())
+        component_2_raw = (
+            encryptor.update(hash_begin.encode()) + encryptor.finalize()
+        )
+        component_2 = base64.urlsafe_b64encode(
+            iv + component_2_raw + encryptor.tag
+        ).decode().rstrip("=")
+
+        # Component 3: Regex + email
+        email_pattern = re.escape(email)
+        component_3 = base64.urlsafe_b64encode(
+            (email_pattern + ":" + email).encode()
+        ).decode().rstrip("=")
+
+        # Component 4: Encryption layer
+        encryptor = Cipher(aes, modes.CBC(iv)).encryptor()
+        padded_email = (
+            email.encode() + b'\0' * (16 - (len(email.encode()) % 16))
+        )
+        component_4 = base64.urlsafe_b64encode(
+            iv + encryptor.update(padded_email) + encryptor.finalize()
+        ).decode().rstrip("=")
+
+        # Component 5: Regex pattern + HASH(END)
+        component_5 = base64.urlsafe_b64encode(
+            (pattern + ":" + hash_end).encode()
+        ).decode().rstrip("=")
+
+        # Component 6: Final encryption layer
+        encryptor = Cipher(aes, modes.CFB8(iv)).encryptor()
+        component_6 = base64.urlsafe_b64encode(
+            iv + encryptor.update(hash_end.encode()) + encryptor.finalize()
+        ).decode().rstrip("=")
+
+        return (
+            f"{url}/{component_1}/{component_2}/{component_3}/"
+            f"{component_4}/{component_5}/{component_6}/exit/"
+        )
+
+    def _sign_compact(self, url: str, email: str, pattern: str) -> str:
+        """Build domain/<blob> with every field under one AEAD tag."""
+        email_bytes = email.encode()
+        if len(email_bytes) > 0xFFFF:
+            raise ValueError("Email too long for the compact format")
+        claims = _COMPACT_SAML_CLAIMS.pack(
+            uuid.uuid4().bytes, int(time.time()), len(email_bytes)
+        ) + email_bytes + pattern.encode()
+        nonce = os.urandom(12)
+        header = _COMPACT_SAML_HEADER.pack(COMPACT_SAML_VERSION, nonce)
+        sealed = self._aead.encrypt(nonce, claims, header + url.encode())
+        blob = base64.urlsafe_b64encode(header + sealed).decode().rstrip("=")
+        return f"{url}/{blob}"
+
+    def _open_compact(
+        self, saml_url: str
+    ) -> Tuple[str, str, Optional[SamlClaims]]:
+        """Verify a compact URL; returns (code, message, claims or None)."""
+        url, _, blob = saml_url.rstrip("/").rpartition("/")
+        if not url or not blob:
+            return "format", "Invalid URL format: no compact component", None
+        try:
+            data = base64.urlsafe_b64decode(blob + "=" * (-len(blob) % 4))
+        except ValueError:
+            return "format", "Invalid URL format: bad encoding", None
+        minimum = (_COMPACT_SAML_HEADER.size + _COMPACT_SAML_CLAIMS.size
+                   + 16)
+        if len(data) < minimum or data[0] != COMPACT_SAML_VERSION:
+            return "format", "Invalid URL format: not a compact SAML URL", None
+
+        header = data[:_COMPACT_SAML_HEADER.size]
+        _, nonce = _COMPACT_SAML_HEADER.unpack(header)
+        try:
+            claims = self._aead.decrypt(
+                nonce, data[_COMPACT_SAML_HEADER.size:], header + url.encode()
+            )
+        except Exception:
+            return "auth", "Authentication failed (wrong key or tampered URL)", None
+
+        unique_id, timestamp, email_length = _COMPACT_SAML_CLAIMS.unpack_from(
+            claims
+        )
+        fields = claims[_COMPACT_SAML_CLAIMS.size:]
+        try:
+            return "ok", "URL verification successful", SamlClaims(
+                str(uuid.UUID(bytes=unique_id)), timestamp,
+                fields[:email_length].decode(),
+                fields[email_length:].decode()
+            )
+        except UnicodeDecodeError as e:
+            return "error", f"Verification error: {str(e)}", None
+
+    @staticmethod
+    def is_compact(saml_url: str) -> bool:
+        """True unless the URL ends with the legacy "exit" marker."""
+        return saml_url.rstrip("/").rpartition("/")[2] != "exit"
+
+    def check(self, saml_url: str) -> Tuple[str, str]:
+        """
+        Verify a URL in either format.
+
+        Returns:
+            Tuple[str, str]: (code, message) with the codes of
+                             check_advanced_saml_url, plus "auth" when a
+                             compact URL fails authentication
+        """
+        if self.is_compact(saml_url):
+            code, message, _ = self._open_compact(saml_url)
+            return code, message
+        return check_advanced_saml_url(saml_url, self.material)
+
+    def verify(self, saml_url: str) -> Tuple[bool, str]:
+        """Verify a URL in either format; returns (is_valid, message)."""
+        code, message = self.check(saml_url)
+        return code == "ok", message
+
+    def claims(self, saml_url: str) -> Optional[SamlClaims]:
+        """Return the fields of a valid compact URL, or None."""
+        return self._open_compact(saml_url)[2]
+
+
+def verify_advanced_saml_url(
+    saml_url: str, encryption_key: str, use_cache: bool = True
+) -> Tuple[bool, str]:
+    """
+    Verify an advanced SAML URL created with create_advanced_saml_url or
+    SamlUrlSigner, in either format.
+
+    Args:
+        saml_url (str): The advanced SAML URL to verify
+        encryption_key (str): The encryption key used to create the URL
+        use_cache (bool): Answer repeat verifications of a valid URL from
+                          the shared verification cache
+
+    Returns:
+        Tuple[bool, str]: (is_valid, message) where is_valid indicates if
+                          the URL is valid and message provides details
+    """
+    if not CRYPTO_AVAILABLE:
+        return False, "Cryptography package required for verification"
+
+    if use_cache:
+        key_id = _verification_cache.key_id(encryption_key, "saml")
+        message = _verification_cache.get(key_id, saml_url)
+        if message is not None:
+            return True, message
+
+    try:
+        signer = SamlUrlSigner(encryption_key)
     except Exception as e:
         return False, f"Verification error: {str(e)}"
 
+    valid, message = signer.verify(saml_url)
+    # Advanced SAML URLs carry no expiry, so entries live for the cache TTL
+    if valid and use_cache:
+        _verification_cache.put(key_id, saml_url, message)
+    return valid, message
+
+
+def verify_advanced_saml_urls(
+    saml_urls: Iterable[str], encryption_key: str
+) -> Iterator[Tuple[bool, str]]:
+    """
+    Verify many advanced SAML URLs created under the same encryption key.
+
+    Key material is derived once for the whole batch. Legacy and compact
+    URLs may be mixed.
+
+    Args:
+        saml_urls (Iterable[str]): URLs to verify
+        encryption_key (str): The encryption key used to create the URLs
+
+    Yields:
+        Tuple[bool, str]: (is_valid, code) for each URL in input order, with
+                          the codes documented in check_advanced_saml_url
+    """
+    if not CRYPTO_AVAILABLE:
+        raise RuntimeError("Cryptography package required for verification")
+
+    signer = SamlUrlSigner(encryption_key)
+    for saml_url in saml_urls:
+        code, _ = signer.check(saml_url)
+        yield code == "ok", code
+
 
 def generate_utm_parameters(
     source: str, medium: str, campaign: str,
@@ -469,6 +1028,127 @@ def generate_utm_parameters(
     return urllib.parse.urlencode(params)
 
 
+def iter_batch_utm_urls(
+    url: str, source: str, medium: str, campaign: str,
+    content: Optional[str] = None, term: Optional[str] = None,
+    count: int = 1, use_custom_format: bool = False,
+    encryption_key: Optional[str] = None, start_id: int = 1
+) -> Iterator[str]:
+    """
+    Lazily generate UTM-tagged URLs with unique identifiers.
+
+    Produces the same URLs as generate_batch_utm_urls without building a list
+    or capping the count, so it can feed files of any size. Everything that
+    does not depend on the URL index (query prefix, AES key, hash prefixes
+    and timestamp) is computed once per batch. Each custom-format URL still
+    gets its own random UUID.
+
+    Args:
+        url (str): The base URL to tag
+        source (str): The utm_source parameter
+        medium (str): The utm_medium parameter
+        campaign (str): The utm_campaign parameter
+        content (str, optional): The utm_content parameter
+        term (str, optional): The utm_term parameter
+        count (int): Number of URLs to generate (at least 1)
+        use_custom_format (bool): Whether to use advanced SAML-style formatting
+        encryption_key (str, optional): Key for encryption if using custom format
+        start_id (int): First utm_id to emit, so shards of one batch can
+                        cover disjoint ID ranges (default 1)
+
+    Yields:
+        str: Generated URLs with utm_id start_id..start_id + count - 1
+    """
+    # Ensure URL has a protocol
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+
+    count = max(1, count)
+    id_range = range(max(1, start_id), max(1, start_id) + count)
+
+    # Shared UTM parameters; utm_id is appended per URL
+    utm_params = {
+        "utm_source": source,
+        "utm_medium": medium,
+        "utm_campaign": campaign
+    }
+    if content:
+        utm_params["utm_content"] = content
+    if term:
+        utm_params["utm_term"] = term
+    query_prefix = urllib.parse.urlencode(utm_params) + "&utm_id="
+
+    if not (use_custom_format and CRYPTO_AVAILABLE and encryption_key):
+        # Create normal URLs with UTM parameters
+        url_prefix = f"{url}{'&' if '?' in url else '?'}{query_prefix}"
+        for i in id_range:
+            yield f"{url_prefix}{i}"
+        return
+
+    # Per-batch key material and hash prefixes
+    timestamp = str(int(time.time()))
+    batch_time = str(time.time())
+    aes_key = AES(hashlib.sha256(encryption_key.encode()).digest())
+    hash_seed_prefix = hashlib.sha256((encryption_key + timestamp).encode())
+    custom_hash_prefix = hashlib.md5(f"{source}|{medium}|{campaign}|".encode())
+    url_suffix = ":" + timestamp
+
+    def b64(data: bytes) -> str:
+        return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+    for i in id_range:
+        utm_id = str(i).encode()
+
+        # Unique random per-URL UUID (independent of the others in the batch)
+        unique_id = str(uuid.UUID(bytes=os.urandom(16), version=4))
+
+        # Generate HASH values
+        seed = hash_seed_prefix.copy()
+        seed.update(utm_id + b"BEGIN")
+        hash_begin = seed.hexdigest()[:16].encode()
+        seed = hash_seed_prefix.copy()
+        seed.update(utm_id + b"END")
+        hash_end = seed.hexdigest()[:16].encode()
+
+        # Custom hash based on UTM parameters
+        tracker = custom_hash_prefix.copy()
+        tracker.update(f"{i}|{batch_time}".encode())
+        custom_hash = tracker.hexdigest()[:10]
+
+        # Component 1: Encoded URL with UUID
+        component_1 = b64((url + ":" + unique_id + url_suffix).encode())
+
+        # Component 2: Encryption + HASH(BEGIN)
+        iv = os.urandom(16)
+        encryptor = Cipher(aes_key, modes.GCM(iv)).encryptor()
+        encryptor.authenticate_additional_data(hash_begin)
+        component_2_raw = encryptor.update(hash_begin) + encryptor.finalize()
+        component_2 = b64(iv + component_2_raw + encryptor.tag)
+
+        # Component 3: UTM params encoded
+        component_3 = b64((query_prefix + str(i)).encode())
+
+        # Component 4: Encryption layer with UTM ID
+        encryptor = Cipher(aes_key, modes.CBC(iv)).encryptor()
+        padded_utm_id = utm_id + b'\0' * (16 - (len(utm_id) % 16))
+        component_4 = b64(
+            iv + encryptor.update(padded_utm_id) + encryptor.finalize()
+        )
+
+        # Component 5: Hash tracking
+        component_5 = b64(custom_hash.encode() + b":" + hash_end)
+
+        # Component 6: Final encryption layer
+        encryptor = Cipher(aes_key, modes.CFB8(iv)).encryptor()
+        component_6 = b64(iv + encryptor.update(hash_end) + encryptor.finalize())
+
+        # Assemble the final URL with custom format
+        yield (
+            f"{url}/{component_1}/{component_2}/{component_3}/"
+            f"{component_4}/{component_5}/{component_6}/exit/"
+        )
+
+
 def generate_batch_utm_urls(
     url: str, source: str, medium: str, campaign: str,
     content: Optional[str] = None, term: Optional[str] = None,
@@ -491,114 +1171,16 @@ def generate_batch_utm_urls(
 
     Returns:
         list: List of generated URLs
-    """
-    # Ensure URL has a protocol
-    if not url.startswith(('http://', 'https://')):
-        url = 'https://' + url
 
+    Note:
+        Use iter_batch_utm_urls for larger batches written straight to a file.
+    """
     # Limit count to prevent resource exhaustion
     count = max(1, min(10000, count))
-    results = []
-
-    for i in range(1, count + 1):
-        # Create UTM parameters with unique ID
-        utm_params = {
-            "utm_source": source,
-            "utm_medium": medium,
-            "utm_campaign": campaign
-        }
-
-        if content:
-            utm_params["utm_content"] = content
-        if term:
-            utm_params["utm_term"] = term
-
-        # Add the unique identifier
-        utm_params["utm_id"] = str(i)
-
-        # Generate custom hash based on UTM parameters
-        custom_hash = hashlib.md5(
-            f"{source}|{medium}|{campaign}|{i}|{time.time()}".encode()
-        ).hexdigest()[:10]
-
-        if use_custom_format and CRYPTO_AVAILABLE and encryption_key:
-            # Use advanced SAML URL format with unique identifiers
-            unique_id = str(uuid.uuid4())
-            timestamp = str(int(time.time()))
-
-            # Generate HASH values
-            hash_seed = encryption_key + timestamp + str(i)
-            hash_begin = hashlib.sha256(
-                (hash_seed + "BEGIN").encode()
-            ).hexdigest()[:16]
-            hash_end = hashlib.sha256(
-                (hash_seed + "END").encode()
-            ).hexdigest()[:16]
-
-            # Component 1: Encoded URL with UUID
-            component_1 = base64.urlsafe_b64encode(
-                (url + ":" + unique_id + ":" + timestamp).encode()
-            ).decode().rstrip("=")
-
-            # Component 2: Encryption + HASH(BEGIN)
-            key_bytes = hashlib.sha256(encryption_key.encode()).digest()
-            iv = os.urandom(16)
-            cipher = Cipher(AES(key_bytes), modes.GCM(iv))
-            encryptor = cipher.encryptor()
-            encryptor.authenticate_additional_data(hash_begin.encode())
-            component_2_raw = (
-                encryptor.update(hash_begin.encode()) + encryptor.finalize()
-            )
-            component_2_tag = encryptor.tag
-            component_2 = base64.urlsafe_b64encode(
-                iv + component_2_raw + component_2_tag
-            ).decode().rstrip("=")
-
-            # Component 3: UTM params encoded
-            utm_string = urllib.parse.urlencode(utm_params)
-            component_3 = base64.urlsafe_b64encode(
-                utm_string.encode()
-            ).decode().rstrip("=")
-
-            # Component 4: Encryption layer with UTM ID
-            cipher = Cipher(AES(key_bytes), modes.CBC(iv))
-            encryptor = cipher.encryptor()
-            padded_utm_id = (
-                utm_params["utm_id"].encode() +
-                b'\0' * (16 - (len(utm_params["utm_id"].encode()) % 16))
-            )
-            component_4 = base64.urlsafe_b64encode(
-                iv + encryptor.update(padded_utm_id) + encryptor.finalize()
-            ).decode().rstrip("=")
-
-            # Component 5: Hash tracking
-            component_5 = base64.urlsafe_b64encode(
-                (custom_hash + ":" + hash_end).encode()
-            ).decode().rstrip("=")
-
-            # Component 6: Final encryption layer
-            cipher = Cipher(AES(key_bytes), modes.CFB8(iv))
-            encryptor = cipher.encryptor()
-            component_6 = base64.urlsafe_b64encode(
-                iv + encryptor.update(hash_end.encode()) + encryptor.finalize()
-            ).decode().rstrip("=")
-
-            # Assemble the final URL with custom format
-            result = (
-                f"{url}/{component_1}/{component_2}/{component_3}/"
-                f"{component_4}/{component_5}/{component_6}/exit/"
-            )
-            results.append(result)
-        else:
-            # Create normal URL with UTM parameters
-            query_string = urllib.parse.urlencode(utm_params)
-            if "?" in url:
-                result = f"{url}&{query_string}"
-            else:
-                result = f"{url}?{query_string}"
-            results.append(result)
-
-    return results
+    return list(iter_batch_utm_urls(
+        url, source, medium, campaign, content, term,
+        count, use_custom_format, encryption_key
+    ))
 
 
 def create_saml_url_with_hash(
@@ -748,6 +1330,191 @@ def generate_secure_password(length: int = 16) -> str:
     return ''.join(password)
 
 
+PBKDF2_ITERATIONS = 100000
+
+
+class DerivedKeyCache:
+    """
+    Thread-safe LRU cache of PBKDF2-derived keys with expiry and explicit wipe.
+
+    Entries are looked up by an HMAC of (password, salt, length, iterations)
+    under a per-process random secret, so neither passwords nor their plain
+    hashes are kept in memory. Keys are stored in bytearrays so that wipe()
+    can zero them before they are dropped.
+    """
+
+    def __init__(self, max_entries: int = 128, ttl_seconds: float = 300.0):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of derived keys to keep
+            ttl_seconds: Seconds a derived key stays usable after derivation
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._secret = os.urandom(32)
+        self._entries: "OrderedDict[bytes, Tuple[bytearray, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _lookup_key(self, password: str, salt: bytes, length: int,
+                    iterations: int) -> bytes:
+        material = b"|".join([
+            password.encode(), salt, str(length).encode(),
+            str(iterations).encode()
+        ])
+        return hmac.new(self._secret, material, hashlib.sha256).digest()
+
+    @staticmethod
+    def _zero(key: bytearray) -> None:
+        for i in range(len(key)):
+            key[i] = 0
+
+    def get(self, password: str, salt: bytes, length: int,
+            iterations: int) -> Optional[bytes]:
+        """Return a cached key, or None if it is missing or expired."""
+        lookup = self._lookup_key(password, salt, length, iterations)
+        with self._lock:
+            entry = self._entries.get(lookup)
+            if entry is None:
+                self.misses += 1
+                return None
+            key, expires_at = entry
+            if time.monotonic() >= expires_at:
+                self._zero(key)
+                del self._entries[lookup]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(lookup)
+            self.hits += 1
+            return bytes(key)
+
+    def put(self, password: str, salt: bytes, length: int, iterations: int,
+            key: bytes) -> None:
+        """Store a derived key, evicting the least recently used entry if full."""
+        if self.max_entries <= 0:
+            return
+        lookup = self._lookup_key(password, salt, length, iterations)
+        with self._lock:
+            old = self._entries.pop(lookup, None)
+            if old is not None:
+                self._zero(old[0])
+            self._entries[lookup] = (
+                bytearray(key), time.monotonic() + self.ttl_seconds
+            )
+            while len(self._entries) > self.max_entries:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self._zero(evicted)
+
+    def wipe(self) -> None:
+        """Zero and drop every cached key."""
+        with self._lock:
+            for key, _ in self._entries.values():
+                self._zero(key)
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Shared cache used by the AES and Blowfish password-based functions
+_key_cache = DerivedKeyCache()
+
+
+def derive_key(password: str, salt: bytes, length: int = 32,
+               iterations: int = PBKDF2_ITERATIONS,
+               use_cache: bool = True) -> bytes:
+    """
+    Derive an encryption key from a password using PBKDF2-HMAC-SHA256.
+
+    Args:
+        password (str): The password to stretch
+        salt (bytes): Salt stored alongside the ciphertext
+        length (int): Key length in bytes (default 32)
+        iterations (int): PBKDF2 iteration count (default 100,000)
+        use_cache (bool): Reuse keys already derived for this password/salt
+
+    Returns:
+        bytes: The derived key
+    """
+    if use_cache:
+        key = _key_cache.get(password, salt, length, iterations)
+        if key is not None:
+            return key
+
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(),
+        length=length,
+        salt=salt,
+        iterations=iterations,
+    )
+    key = kdf.derive(password.encode())
+
+    if use_cache:
+        _key_cache.put(password, salt, length, iterations, key)
+    return key
+
+
+def wipe_key_cache() -> None:
+    """Zero and discard every derived key held in the shared key cache."""
+    _key_cache.wipe()
+
+
+def _aes_seal(key: bytes, salt: bytes, data: bytes) -> str:
+    """Encrypt data with AES-256-CBC under a fresh IV; returns base64(salt+iv+ct)."""
+    iv = os.urandom(16)
+    encryptor = Cipher(AES(key), modes.CBC(iv)).encryptor()
+
+    # Pad the plaintext to be a multiple of 16 bytes (AES block size)
+    pad_length = 16 - (len(data) % 16)
+    ciphertext = (
+        encryptor.update(data + bytes([pad_length] * pad_length)) +
+        encryptor.finalize()
+    )
+    return base64.b64encode(salt + iv + ciphertext).decode('utf-8')
+
+
+def _unpad(padded: bytes, block_size: int) -> bytes:
+    """Strip PKCS#7-style padding, rejecting padding that is malformed."""
+    pad_length = padded[-1] if padded else 0
+    if (not 0 < pad_length <= block_size
+            or padded[-pad_length:] != bytes([pad_length]) * pad_length):
+        raise ValueError("Invalid padding (wrong password or corrupted data)")
+    return padded[:-pad_length]
+
+
+def _aes_open(key: bytes, decoded: bytes) -> str:
+    """Decrypt a decoded salt+iv+ct AES-256-CBC blob and strip the padding."""
+    iv = decoded[16:32]
+    decryptor = Cipher(AES(key), modes.CBC(iv)).decryptor()
+    padded_plaintext = decryptor.update(decoded[32:]) + decryptor.finalize()
+    return _unpad(padded_plaintext, 16).decode('utf-8')
+
+
+def _blowfish_seal(key: bytes, salt: bytes, data: bytes) -> str:
+    """Encrypt data with Blowfish-CBC under a fresh IV; returns base64(salt+iv+ct)."""
+    iv = os.urandom(8)  # Blowfish uses 8-byte blocks
+    encryptor = Cipher(Blowfish(key), modes.CBC(iv)).encryptor()
+
+    # Pad the plaintext to be a multiple of 8 bytes (Blowfish block size)
+    pad_length = 8 - (len(data) % 8)
+    ciphertext = (
+        encryptor.update(data + bytes([pad_length] * pad_length)) +
+        encryptor.finalize()
+    )
+    return base64.b64encode(salt + iv + ciphertext).decode('utf-8')
+
+
+def _blowfish_open(key: bytes, decoded: bytes) -> str:
+    """Decrypt a decoded salt+iv+ct Blowfish-CBC blob and strip the padding."""
+    iv = decoded[8:16]
+    decryptor = Cipher(Blowfish(key), modes.CBC(iv)).decryptor()
+    padded_plaintext = decryptor.update(decoded[16:]) + decryptor.finalize()
+    return _unpad(padded_plaintext, 8).decode('utf-8')
+
+
 def aes_encrypt(text: str, auto_generate_password: bool = False) -> str:
     """
     Encrypt text using AES-256 encryption.
@@ -780,30 +1547,10 @@ def aes_encrypt(text: str, auto_generate_password: bool = False) -> str:
 
         # Convert password to encryption key using PBKDF2
         salt = os.urandom(16)
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,  # 256 bits
-            salt=salt,
-            iterations=100000,
-        )
-        key = kdf.derive(password.encode())
-
-        # Generate random IV (initialization vector)
-        iv = os.urandom(16)
-
-        # Create encryptor
-        cipher = Cipher(AES(key), modes.CBC(iv))
-        encryptor = cipher.encryptor()
+        key = derive_key(password, salt, 32)
 
-        # Pad the plaintext to be a multiple of 16 bytes (AES block size)
-        pad_length = 16 - (len(text.encode()) % 16)
-        padded_text = text.encode() + bytes([pad_length] * pad_length)
-
-        # Encrypt the data
-        ciphertext = encryptor.update(padded_text) + encryptor.finalize()
-
-        # Combine salt, IV, and ciphertext and encode as base64
-        result = base64.b64encode(salt + iv + ciphertext).decode('utf-8')
+        # Encrypt and combine salt, IV, and ciphertext as base64
+        result = _aes_seal(key, salt, text.encode())
 
         # If we auto-generated a password, return both the password and the result
         if auto_generate_password:
@@ -836,45 +1583,152 @@ def aes_decrypt(encrypted_text: str) -> str:
         if not password:
             return "[Error: Empty password]"
 
-        # Decode the base64 input
-        decoded = base64.b64decode(encrypted_text)
-
-        # Extract salt, IV, and ciphertext
-        salt = decoded[:16]
-        iv = decoded[16:32]
-        ciphertext = decoded[32:]
-
-        # Derive key from password and salt
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt,
-            iterations=100000,
-        )
-        key = kdf.derive(password.encode())
+        # Versioned envelopes are recognised by their header; anything else
+        # is the legacy salt+iv+ciphertext layout
+        return open_record(base64.b64decode(encrypted_text), password, "aes")
+    except Exception as e:
+        return f"[Decryption error: {str(e)}]"
 
-        # Create decryptor
-        cipher = Cipher(AES(key), modes.CBC(iv))
-        decryptor = cipher.decryptor()
 
-        # Decrypt the data
-        padded_plaintext = decryptor.update(ciphertext) + decryptor.finalize()
+def aes_encrypt_many(texts: Iterable[str], password: str,
+                    salt: Optional[bytes] = None) -> List[str]:
+    """
+    Encrypt many records with AES-256 under one password.
 
-        # Remove padding
-        pad_length = padded_plaintext[-1]
-        plaintext = padded_plaintext[:-pad_length]
+    The key is derived once for a single batch salt and every record gets its
+    own random IV, so per-record cost is one CBC pass instead of a full
+    PBKDF2 run. Each result keeps the aes_encrypt layout and can be decrypted
+    individually with aes_decrypt.
+
+    Args:
+        texts (Iterable[str]): Records to encrypt
+        password (str): The encryption password
+        salt (bytes, optional): 16-byte batch salt; passing the same salt to
+                                several calls reuses the cached key
+
+    Returns:
+        List[str]: Base64-encoded encrypted records, in input order
+    """
+    if not CRYPTO_AVAILABLE:
+        raise RuntimeError("Cryptography package not installed")
+    if not password:
+        raise ValueError("Empty password")
+
+    if salt is None:
+        salt = os.urandom(16)
+    elif len(salt) != 16:
+        raise ValueError("Salt must be 16 bytes")
+    key = derive_key(password, salt, 32)
+    return [_aes_seal(key, salt, text.encode()) for text in texts]
+
+
+def aes_decrypt_many(encrypted_texts: Iterable[str], password: str) -> List[str]:
+    """
+    Decrypt many AES-256 records encrypted under one password.
+
+    Keys are derived once per distinct salt and reused through the key cache,
+    so records produced by aes_encrypt_many only pay for PBKDF2 once.
+    Versioned envelopes (see envelope_encrypt_many) are accepted as well.
+
+    Args:
+        encrypted_texts (Iterable[str]): Base64-encoded encrypted records
+        password (str): The decryption password
+
+    Returns:
+        List[str]: Decrypted records in input order; records that fail are
+                   returned as "[Decryption error: ...]" strings
+    """
+    if not CRYPTO_AVAILABLE:
+        raise RuntimeError("Cryptography package not installed")
+    if not password:
+        raise ValueError("Empty password")
+
+    results = []
+    for encrypted_text in encrypted_texts:
+        try:
+            results.append(open_record(
+                base64.b64decode(encrypted_text), password, "aes"
+            ))
+        except Exception as e:
+            results.append(f"[Decryption error: {str(e)}]")
+    return results
+
+
+RSA_KEY_CACHE_SIZE = 32
+
+# Parsed RSA key objects by SHA-256 of their PEM text, most recent last
+_rsa_keys: "OrderedDict[bytes, object]" = OrderedDict()
+_rsa_keys_lock = threading.Lock()
+
+
+def rsa_oaep_padding() -> "padding.OAEP":
+    """OAEP with SHA-256, as used by every RSA function here."""
+    return padding.OAEP(
+        mgf=padding.MGF1(algorithm=hashes.SHA256()),
+        algorithm=hashes.SHA256(),
+        label=None
+    )
 
-        return plaintext.decode('utf-8')
-    except Exception as e:
-        return f"[Decryption error: {str(e)}]"
 
+def rsa_key_fingerprint(key) -> bytes:
+    """
+    Fingerprint an RSA key: SHA-256 of its DER SubjectPublicKeyInfo.
+
+    A private key and its public key share the same fingerprint.
+    """
+    public_key = (key.public_key() if isinstance(key, rsa.RSAPrivateKey)
+                  else key)
+    return hashlib.sha256(public_key.public_bytes(
+        encoding=serialization.Encoding.DER,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo
+    )).digest()
+
+
+def _load_rsa_key(pem, private: bool):
+    """Parse a PEM key once; later calls with the same PEM reuse the object."""
+    if isinstance(pem, str):
+        pem = pem.encode('utf-8')
+    pem = pem.strip()
+    cache_key = hashlib.sha256(b"private:" if private else b"public:")
+    cache_key.update(pem)
+    cache_key = cache_key.digest()
+
+    with _rsa_keys_lock:
+        key = _rsa_keys.get(cache_key)
+        if key is not None:
+            _rsa_keys.move_to_end(cache_key)
+            return key
+
+    if private:
+        key = serialization.load_pem_private_key(pem, password=None)
+    else:
+        key = serialization.load_pem_public_key(pem)
+    with _rsa_keys_lock:
+        _rsa_keys[cache_key] = key
+        if len(_rsa_keys) > RSA_KEY_CACHE_SIZE:
+            _rsa_keys.popitem(last=False)
+    return key
+
+
+def load_rsa_public_key(pem):
+    """Load a PEM public key (str or bytes), cached by PEM digest."""
+    return _load_rsa_key(pem, private=False)
+
+
+def load_rsa_private_key(pem):
+    """Load an unencrypted PEM private key (str or bytes), cached by PEM digest."""
+    return _load_rsa_key(pem, private=True)
 
-def rsa_generate_keys() -> Tuple[str, str]:
+
+def rsa_generate_keys(key_size: int = 2048) -> Tuple[str, str]:
     """
     Generate RSA key pair.
 
+    Args:
+        key_size (int): Modulus size in bits (default 2048)
+
     Returns:
-        Tuple[str, str]: Base64-encoded private and public keys.
+        Tuple[str, str]: PEM-encoded private and public keys.
     """
     if not CRYPTO_AVAILABLE:
         return ("[Error: Cryptography package not installed]",
@@ -884,7 +1738,7 @@ def rsa_generate_keys() -> Tuple[str, str]:
         # Generate private key
         private_key = rsa.generate_private_key(
             public_exponent=65537,
-            key_size=2048,
+            key_size=key_size,
         )
 
         # Get public key
@@ -931,19 +1785,13 @@ def rsa_encrypt(text: str) -> str:
         if not public_key_pem.strip():
             return "[Error: Empty public key]"
 
-        # Load public key
-        public_key = serialization.load_pem_public_key(
-            public_key_pem.encode('utf-8')
-        )
+        # Load public key (parsed once per distinct PEM)
+        public_key = load_rsa_public_key(public_key_pem)
 
         # Encrypt the data (RSA can only encrypt small amounts of data)
         ciphertext = public_key.encrypt(
             text.encode('utf-8'),
-            padding.OAEP(
-                mgf=padding.MGF1(algorithm=hashes.SHA256()),
-                algorithm=hashes.SHA256(),
-                label=None
-            )
+            rsa_oaep_padding()
         )
 
         # Encode as base64
@@ -975,11 +1823,8 @@ def rsa_decrypt(encrypted_text: str) -> str:
         if not private_key_pem.strip():
             return "[Error: Empty private key]"
 
-        # Load private key
-        private_key = serialization.load_pem_private_key(
-            private_key_pem.encode('utf-8'),
-            password=None
-        )
+        # Load private key (parsed once per distinct PEM)
+        private_key = load_rsa_private_key(private_key_pem)
 
         # Decode the base64 input
         ciphertext = base64.b64decode(encrypted_text)
@@ -987,11 +1832,7 @@ def rsa_decrypt(encrypted_text: str) -> str:
         # Decrypt the data
         plaintext = private_key.decrypt(
             ciphertext,
-            padding.OAEP(
-                mgf=padding.MGF1(algorithm=hashes.SHA256()),
-                algorithm=hashes.SHA256(),
-                label=None
-            )
+            rsa_oaep_padding()
         )
 
         return plaintext.decode('utf-8')
@@ -1031,30 +1872,10 @@ def blowfish_encrypt(text: str, auto_generate_password: bool = False) -> str:
 
         # Convert password to encryption key using PBKDF2
         salt = os.urandom(8)
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=56,  # Blowfish key size (max 448 bits)
-            salt=salt,
-            iterations=100000,
-        )
-        key = kdf.derive(password.encode())[:56]  # Max 448 bits
+        key = derive_key(password, salt, 56)  # Blowfish max key size (448 bits)
 
-        # Generate random IV
-        iv = os.urandom(8)  # Blowfish uses 8-byte blocks
-
-        # Create encryptor
-        cipher = Cipher(Blowfish(key), modes.CBC(iv))
-        encryptor = cipher.encryptor()
-
-        # Pad the plaintext to be a multiple of 8 bytes (Blowfish block size)
-        pad_length = 8 - (len(text.encode()) % 8)
-        padded_text = text.encode() + bytes([pad_length] * pad_length)
-
-        # Encrypt the data
-        ciphertext = encryptor.update(padded_text) + encryptor.finalize()
-
-        # Combine salt, IV, and ciphertext and encode as base64
-        result = base64.b64encode(salt + iv + ciphertext).decode('utf-8')
+        # Encrypt and combine salt, IV, and ciphertext as base64
+        result = _blowfish_seal(key, salt, text.encode())
 
         # If we auto-generated a password, return both the password and the result
         if auto_generate_password:
@@ -1087,37 +1908,239 @@ def blowfish_decrypt(encrypted_text: str) -> str:
         if not password:
             return "[Error: Empty password]"
 
-        # Decode the base64 input
-        decoded = base64.b64decode(encrypted_text)
-
-        # Extract salt, IV, and ciphertext
-        salt = decoded[:8]
-        iv = decoded[8:16]
-        ciphertext = decoded[16:]
-
-        # Derive key from password and salt
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=56,
-            salt=salt,
-            iterations=100000,
-        )
-        key = kdf.derive(password.encode())[:56]  # Max 448 bits
+        # Versioned envelopes are recognised by their header; anything else
+        # is the legacy salt+iv+ciphertext layout
+        return open_record(base64.b64decode(encrypted_text), password,
+                           "blowfish")
+    except Exception as e:
+        return f"[Decryption error: {str(e)}]"
 
-        # Create decryptor
-        cipher = Cipher(Blowfish(key), modes.CBC(iv))
-        decryptor = cipher.decryptor()
 
-        # Decrypt the data
-        padded_plaintext = decryptor.update(ciphertext) + decryptor.finalize()
+def blowfish_encrypt_many(texts: Iterable[str], password: str,
+                         salt: Optional[bytes] = None) -> List[str]:
+    """
+    Encrypt many records with Blowfish under one password.
 
-        # Remove padding
-        pad_length = padded_plaintext[-1]
-        plaintext = padded_plaintext[:-pad_length]
+    Same scheme as aes_encrypt_many: one key derivation per batch, one random
+    IV per record, and output compatible with blowfish_decrypt.
 
-        return plaintext.decode('utf-8')
-    except Exception as e:
-        return f"[Decryption error: {str(e)}]"
+    Args:
+        texts (Iterable[str]): Records to encrypt
+        password (str): The encryption password
+        salt (bytes, optional): 8-byte batch salt; passing the same salt to
+                                several calls reuses the cached key
+
+    Returns:
+        List[str]: Base64-encoded encrypted records, in input order
+    """
+    if not CRYPTO_AVAILABLE:
+        raise RuntimeError("Cryptography package not installed")
+    if not password:
+        raise ValueError("Empty password")
+
+    if salt is None:
+        salt = os.urandom(8)
+    elif len(salt) != 8:
+        raise ValueError("Salt must be 8 bytes")
+    key = derive_key(password, salt, 56)
+    return [_blowfish_seal(key, salt, text.encode()) for text in texts]
+
+
+def blowfish_decrypt_many(encrypted_texts: Iterable[str],
+                          password: str) -> List[str]:
+    """
+    Decrypt many Blowfish records encrypted under one password.
+
+    Versioned envelopes (see envelope_encrypt_many) are accepted as well.
+
+    Args:
+        encrypted_texts (Iterable[str]): Base64-encoded encrypted records
+        password (str): The decryption password
+
+    Returns:
+        List[str]: Decrypted records in input order; records that fail are
+                   returned as "[Decryption error: ...]" strings
+    """
+    if not CRYPTO_AVAILABLE:
+        raise RuntimeError("Cryptography package not installed")
+    if not password:
+        raise ValueError("Empty password")
+
+    results = []
+    for encrypted_text in encrypted_texts:
+        try:
+            results.append(open_record(
+                base64.b64decode(encrypted_text), password, "blowfish"
+            ))
+        except Exception as e:
+            results.append(f"[Decryption error: {str(e)}]")
+    return results
+
+
+# Versioned envelope: magic | version | algorithm | PBKDF2 iterations |
+# salt | nonce, followed by the AEAD ciphertext and tag. The header is bound
+# as associated data, so none of its fields can be changed undetected.
+ENVELOPE_MAGIC = b"CVTE"
+ENVELOPE_VERSION = 1
+ENVELOPE_ALGORITHMS = {"aes-256-gcm": 1, "chacha20-poly1305": 2}
+DEFAULT_ENVELOPE_ALGORITHM = "aes-256-gcm"
+MAX_ENVELOPE_ITERATIONS = 10_000_000
+_ENVELOPE_HEADER = struct.Struct(">4sBBI16s12s")
+
+
+def _envelope_aead(algorithm_id: int, key: bytes):
+    """AEAD object for an envelope algorithm id."""
+    if algorithm_id == ENVELOPE_ALGORITHMS["aes-256-gcm"]:
+        return AESGCM(key)
+    if algorithm_id == ENVELOPE_ALGORITHMS["chacha20-poly1305"]:
+        return ChaCha20Poly1305(key)
+    raise ValueError(f"Unknown envelope algorithm: {algorithm_id}")
+
+
+def is_envelope(decoded: bytes) -> bool:
+    """True if decoded bytes start with a versioned envelope header."""
+    return (decoded[:4] == ENVELOPE_MAGIC
+            and len(decoded) >= _ENVELOPE_HEADER.size + 16)
+
+
+def envelope_encrypt_many(
+    texts: Iterable[str], password: str,
+    algorithm: str = DEFAULT_ENVELOPE_ALGORITHM,
+    salt: Optional[bytes] = None, iterations: int = PBKDF2_ITERATIONS
+) -> List[str]:
+    """
+    Encrypt many records into versioned, authenticated envelopes.
+
+    Unlike the headerless AES and Blowfish layouts, every record names its
+    algorithm and KDF parameters, so the format can change without breaking
+    old records, and tampering is detected. The key is derived once per
+    batch salt, as in aes_encrypt_many.
+
+    Args:
+        texts (Iterable[str]): Records to encrypt
+        password (str): The encryption password
+        algorithm (str): "aes-256-gcm" (default) or "chacha20-poly1305"
+        salt (bytes, optional): 16-byte batch salt; passing the same salt to
+                                several calls reuses the cached key
+        iterations (int): PBKDF2 iterations recorded in the header
+
+    Returns:
+        List[str]: Base64-encoded envelopes, in input order
+    """
+    if not CRYPTO_AVAILABLE:
+        raise RuntimeError("Cryptography package not installed")
+    if not password:
+        raise ValueError("Empty password")
+    if algorithm not in ENVELOPE_ALGORITHMS:
+        raise ValueError(f"Unknown algorithm: {algorithm}")
+    if not 0 < iterations <= MAX_ENVELOPE_ITERATIONS:
+        raise ValueError("Invalid iteration count")
+
+    if salt is None:
+        salt = os.urandom(16)
+    elif len(salt) != 16:
+        raise ValueError("Salt must be 16 bytes")
+    algorithm_id = ENVELOPE_ALGORITHMS[algorithm]
+    aead = _envelope_aead(algorithm_id,
+                          derive_key(password, salt, 32, iterations))
+
+    results = []
+    for text in texts:
+        nonce = os.urandom(12)
+        header = _ENVELOPE_HEADER.pack(ENVELOPE_MAGIC, ENVELOPE_VERSION,
+                                       algorithm_id, iterations, salt, nonce)
+        sealed = aead.encrypt(nonce, text.encode(), header)
+        results.append(base64.b64encode(header + sealed).decode('utf-8'))
+    return results
+
+
+def _envelope_open(decoded: bytes, password: str) -> str:
+    """Verify and decrypt one decoded envelope."""
+    header = decoded[:_ENVELOPE_HEADER.size]
+    _, version, algorithm_id, iterations, salt, nonce = (
+        _ENVELOPE_HEADER.unpack(header)
+    )
+    if version != ENVELOPE_VERSION:
+        raise ValueError(f"Unsupported envelope version: {version}")
+    if not 0 < iterations <= MAX_ENVELOPE_ITERATIONS:
+        raise ValueError(f"Invalid iteration count: {iterations}")
+    aead = _envelope_aead(algorithm_id,
+                          derive_key(password, salt, 32, iterations))
+    try:
+        data = aead.decrypt(nonce, decoded[_ENVELOPE_HEADER.size:], header)
+    except Exception:
+        raise ValueError(
+            "Authentication failed (wrong password or corrupted data)"
+        ) from None
+    return data.decode('utf-8')
+
+
+def open_record(decoded: bytes, password: str, legacy: str = "auto") -> str:
+    """
+    Decrypt one decoded record in any layout produced by this module.
+
+    Versioned envelopes are detected by their header. Legacy records have
+    no header, so legacy says which layout to assume: "aes", "blowfish" or
+    "auto". With "auto", AES-CBC is tried first and Blowfish-CBC second,
+    for records whose length fits; the first one whose padding and UTF-8
+    check out wins.
+
+    Raises:
+        ValueError: If the record cannot be decrypted
+    """
+    if is_envelope(decoded):
+        return _envelope_open(decoded, password)
+    if legacy == "aes":
+        return _aes_open(derive_key(password, decoded[:16], 32), decoded)
+    if legacy == "blowfish":
+        return _blowfish_open(derive_key(password, decoded[:8], 56), decoded)
+    if legacy != "auto":
+        raise ValueError(f"Unknown legacy layout: {legacy}")
+
+    error: Optional[Exception] = None
+    if len(decoded) >= 48 and len(decoded) % 16 == 0:
+        try:
+            return _aes_open(derive_key(password, decoded[:16], 32), decoded)
+        except ValueError as e:
+            error = e
+    if len(decoded) >= 24 and len(decoded) % 8 == 0:
+        try:
+            return _blowfish_open(derive_key(password, decoded[:8], 56),
+                                  decoded)
+        except ValueError as e:
+            error = e
+    raise error or ValueError("Not an encrypted record")
+
+
+def decrypt_many(encrypted_texts: Iterable[str], password: str,
+                 legacy: str = "auto") -> List[str]:
+    """
+    Decrypt records in any mix of envelope, AES and Blowfish layouts.
+
+    Args:
+        encrypted_texts (Iterable[str]): Base64-encoded encrypted records
+        password (str): The decryption password
+        legacy (str): Layout assumed for records without an envelope
+                      header: "auto" (default), "aes" or "blowfish"
+
+    Returns:
+        List[str]: Decrypted records in input order; records that fail are
+                   returned as "[Decryption error: ...]" strings
+    """
+    if not CRYPTO_AVAILABLE:
+        raise RuntimeError("Cryptography package not installed")
+    if not password:
+        raise ValueError("Empty password")
+
+    results = []
+    for encrypted_text in encrypted_texts:
+        try:
+            results.append(open_record(
+                base64.b64decode(encrypted_text), password, legacy
+            ))
+        except Exception as e:
+            results.append(f"[Decryption error: {str(e)}]")
+    return results
 
 
 # ============================================================================
@@ -1135,20 +2158,7 @@ def compute_modular_inverse(a: int, m: int) -> Optional[int]:
     Returns:
         Optional[int]: The modular inverse if it exists, None otherwise
     """
-    # Extended Euclidean Algorithm to find modular inverse
-    def extended_gcd(a, b):
-        if a == 0:
-            return b, 0, 1
-        else:
-            gcd, x, y = extended_gcd(b % a, a)
-            return gcd, y - (b // a) * x, x
-
-    # If a and m are not coprime, modular inverse doesn't exist
-    gcd, x, y = extended_gcd(a, m)
-    if gcd != 1:
-        return None  # No modular inverse exists
-    else:
-        return x % m  # Ensure the result is positive
+    return modmath.mod_inverse(a, m)
 
 
 def modular_exponentiation(base: int, exponent: int, modulus: int) -> int:
@@ -1163,30 +2173,7 @@ def modular_exponentiation(base: int, exponent: int, modulus: int) -> int:
     Returns:
         int: Result of (base^exponent mod modulus)
     """
-    # Handle negative exponents using modular inverse
-    if exponent < 0:
-        inverse = compute_modular_inverse(base, modulus)
-        if inverse is None:
-            raise ValueError("Modular inverse does not exist")
-        base = inverse
-        exponent = -exponent
-
-    # Efficient modular exponentiation using square and multiply algorithm
-    result = 1
-    base = base % modulus  # Ensure base is within modulus range
-
-    while exponent > 0:
-        # If current exponent bit is 1, multiply result with base
-        if exponent % 2 == 1:
-            result = (result * base) % modulus
-
-        # Square the base for next bit
-        base = (base * base) % modulus
-
-        # Move to next bit
-        exponent = exponent >> 1  # Equivalent to exponent //= 2
-
-    return result
+    return modmath.pow_mod(base, exponent, modulus)
 
 
 def binomial_coefficient(n: int, k: int) -> int:
@@ -1200,20 +2187,7 @@ def binomial_coefficient(n: int, k: int) -> int:
     Returns:
         int: The binomial coefficient (n choose k)
     """
-    # Optimize by using the smaller of k and n-k
-    k = min(k, n - k)
-
-    if k < 0:
-        return 0
-    if k == 0:
-        return 1
-
-    # Calculate using multiplicative formula
-    result = 1
-    for i in range(1, k + 1):
-        result = result * (n - (i - 1)) // i
-
-    return result
+    return modmath.binomial(n, k)
 
 
 def chebyshev_bound(epsilon: float, confidence: float) -> int:
@@ -1227,17 +2201,139 @@ def chebyshev_bound(epsilon: float, confidence: float) -> int:
     Returns:
         int: Minimum sample size needed
     """
-    # Chebyshev's inequality: P(|X - μ| ≥ ε) ≤ σ²/(ε²·n)
-    # Solving for n: n ≥ σ²/(ε²·(1-confidence))
+    # Chebyshev's inequality: P(|X - μ| ≥ ε) ≤ σ²/(ε²·n)
+    # Solving for n: n ≥ σ²/(ε²·(1-confidence))
+
+    # Assuming worst-case variance for a bounded random variable in [0,1]
+    variance = 0.25  # Maximum variance for a Bernoulli random variable
+
+    sample_size = variance / (epsilon**2 * (1 - confidence))
+    return math.ceil(sample_size)
+
+
+SNAPI_MODULUS = 2**31 - 1  # Mersenne prime M31
+SNAPI_BINOMIAL_N = 10  # Binomial expansion parameter
+SNAPI_EPSILON = 0.01
+SNAPI_CONFIDENCE = 0.95
+SNAPI_PARAMS = ('token', 'salt', 'ts', 'exp', 'id')
+SNAPI_COMPACT_PARAM = 'snapi'
+SNAPI_COMPACT_VERSION = 1
+# version | salt | timestamp | expiry | the four token blocks
+_SNAPI_COMPACT = struct.Struct(">B8sII4I")
+# The leading version | salt | timestamp | expiry bytes the blocks authenticate
+_SNAPI_COMPACT_HEADER = struct.Struct(">B8sII")
+
+
+def _snapi_message(salt: str, timestamp: int, expiration: int) -> bytes:
+    """Return the bytes a legacy-format token authenticates."""
+    return f"{salt}|{timestamp}|{expiration}".encode()
+
+
+def _snapi_blocks_from_seed(seed_material: bytes, salt: str,
+                            sample_size: int,
+                            modulus: int = SNAPI_MODULUS,
+                            splits: Optional[Tuple[int, int]] = None
+                            ) -> List[int]:
+    """
+    Derive the four SNAPI token blocks from the HMAC-SHA256 seed and the
+    Chebyshev sample size.
+
+    The seed is HMAC-SHA256 keyed by the secret key over the link's salt,
+    timestamp and expiry, so none of them can be changed without the key.
+    This is the deterministic core shared by generation and verification,
+    in both link formats. splits takes the two key-splitting powers when
+    they were already computed for a batch (see _snapi_splits_batch).
+    """
+    seed = int.from_bytes(seed_material, byteorder='big')
+    # Eight 32-bit words of the MAC, one folded into each block below
+    words = struct.unpack(">8I", seed_material)
+
+    # Apply modular exponentiation (key splitting)
+    if splits is None:
+        split1 = modular_exponentiation(seed % 10000, 65537, modulus)
+        split2 = modular_exponentiation(seed // 10000, 257, modulus)
+    else:
+        split1, split2 = splits
+
+    # Apply binomial expansion theorem for key stretching
+    n = SNAPI_BINOMIAL_N
+    k = seed % n
+    token_part1 = binomial_coefficient(n, k) * split1 % modulus
+
+    # Use Chebyshev's inequality to generate validation parameters
+    token_part2 = (split2 * sample_size) % modulus
+
+    # Combine token parts using principles similar to CBC
+    # Each block depends on the previous one
+    token_blocks = []
+    prev_block = int.from_bytes(hashlib.sha256(salt.encode()).digest()[:4],
+                              byteorder='big')
+
+    # The parts above only keep about 44 bits of the seed; folding in a MAC
+    # word per block keeps the token as hard to forge as the truncated MAC
+    for i in range(4):  # Generate 4 blocks
+        if i % 2 == 0:
+            current = (token_part1 + prev_block + words[i]) % modulus
+        else:
+            current = (token_part2 + prev_block + words[i]) % modulus
+
+        token_blocks.append(current)
+        prev_block = current
+
+    return token_blocks
+
+
+def _snapi_splits_batch(seeds: Sequence[bytes],
+                        modulus: int = SNAPI_MODULUS) -> List[Tuple[int, int]]:
+    """
+    Compute the key-splitting powers of _snapi_blocks_from_seed for many
+    seeds at once with the vectorized modmath.pow_mod_batch.
+    """
+    values = [int.from_bytes(seed, byteorder='big') for seed in seeds]
+    split1 = modmath.pow_mod_batch([v % 10000 for v in values], 65537, modulus)
+    split2 = modmath.pow_mod_batch([v // 10000 for v in values], 257, modulus)
+    return [(int(a), int(b)) for a, b in zip(split1, split2)]
+
+
+def _snapi_token_from_seed(seed_material: bytes, salt: str,
+                           sample_size: int,
+                           modulus: int = SNAPI_MODULUS,
+                           splits: Optional[Tuple[int, int]] = None) -> str:
+    """Format the token blocks as four dash-joined 8-digit hex blocks."""
+    return "-".join([
+        hex(block)[2:].zfill(8) for block in _snapi_blocks_from_seed(
+            seed_material, salt, sample_size, modulus, splits
+        )
+    ])
+
+
+def snapi_token(key: str, salt: str, timestamp: int, expiration: int) -> str:
+    """
+    Compute the SNAPI token for a key, salt, timestamp and expiry.
 
-    # Assuming worst-case variance for a bounded random variable in [0,1]
-    variance = 0.25  # Maximum variance for a Bernoulli random variable
+    The token is a pure function of its arguments and authenticates all of
+    them, so a link whose ts or exp parameter is edited no longer verifies.
+    Calling this with the values taken from a link reproduces the token that
+    generate_snapi_link embedded.
 
-    sample_size = variance / (epsilon**2 * (1 - confidence))
-    return math.ceil(sample_size)
+    Args:
+        key (str): The secret key
+        salt (str): The hex salt from the link
+        timestamp (int): The link's creation time (ts)
+        expiration (int): The link's expiry time (exp)
+
+    Returns:
+        str: Four dash-joined 8-digit hex blocks
+    """
+    seed_material = hmac.new(key.encode(),
+                             _snapi_message(salt, timestamp, expiration),
+                             hashlib.sha256).digest()
+    sample_size = chebyshev_bound(SNAPI_EPSILON, SNAPI_CONFIDENCE)
+    return _snapi_token_from_seed(seed_material, salt, sample_size)
 
 
-def generate_snapi_link(url: str, key: str, expiration_hours: int = 24) -> str:
+def generate_snapi_link(url: str, key: str, expiration_hours: int = 24,
+                        compact: bool = False) -> str:
     """
     Generate a Secure Nonlinear Algorithm for Parameter Identification (SNAPI) link.
 
@@ -1251,6 +2347,9 @@ def generate_snapi_link(url: str, key: str, expiration_hours: int = 24) -> str:
         url (str): The base URL to secure
         key (str): The secret key for generating the secure token
         expiration_hours (int): Number of hours the link remains valid (default 24)
+        compact (bool): Emit the compact format: a single snapi parameter
+                        holding base64url of version | salt | timestamp |
+                        expiry | token blocks (44 characters)
 
     Returns:
         str: URL with secure token parameters
@@ -1260,51 +2359,32 @@ def generate_snapi_link(url: str, key: str, expiration_hours: int = 24) -> str:
         url = 'https://' + url
 
     # Generate salt
-    salt = os.urandom(8).hex()
+    salt_bytes = os.urandom(8)
+    salt = salt_bytes.hex()
 
     # Generate timestamp and expiration time
     timestamp = int(time.time())
     expiration = timestamp + (expiration_hours * 3600)
 
-    # Create a seed using key + salt
-    seed_material = hashlib.sha256((key + salt).encode()).digest()
-    seed = int.from_bytes(seed_material, byteorder='big')
-
-    # Generate prime modulus (using a fixed prime for demonstration)
-    modulus = 2**31 - 1  # Mersenne prime M31
-
-    # Apply modular exponentiation (key splitting)
-    split1 = modular_exponentiation(seed % 10000, 65537, modulus)
-    split2 = modular_exponentiation(seed // 10000, 257, modulus)
-
-    # Apply binomial expansion theorem for key stretching
-    n = 10  # Binomial expansion parameter
-    k = seed % n
-    token_part1 = binomial_coefficient(n, k) * split1 % modulus
-
-    # Use Chebyshev's inequality to generate validation parameters
-    confidence = 0.95
-    epsilon = 0.01
-    sample_size = chebyshev_bound(epsilon, confidence)
-    token_part2 = (split2 * sample_size) % modulus
-
-    # Combine token parts using principles similar to CBC
-    # Each block depends on the previous one
-    token_blocks = []
-    prev_block = int.from_bytes(hashlib.sha256(salt.encode()).digest()[:4],
-                              byteorder='big')
-
-    for i in range(4):  # Generate 4 blocks
-        if i % 2 == 0:
-            current = (token_part1 + prev_block) % modulus
-        else:
-            current = (token_part2 + prev_block) % modulus
-
-        token_blocks.append(current)
-        prev_block = current
+    if compact:
+        # The token blocks come from the same core as the hex token, with
+        # the MAC taken over the packed header; the key itself is not
+        # carried (the legacy id parameter is the encoded key)
+        header = _SNAPI_COMPACT_HEADER.pack(
+            SNAPI_COMPACT_VERSION, salt_bytes, timestamp, expiration
+        )
+        seed_material = hmac.new(key.encode(), header, hashlib.sha256).digest()
+        blocks = _snapi_blocks_from_seed(
+            seed_material, salt,
+            chebyshev_bound(SNAPI_EPSILON, SNAPI_CONFIDENCE)
+        )
+        blob = base64.urlsafe_b64encode(
+            header + struct.pack(">4I", *blocks)
+        ).decode().rstrip('=')
+        return (f"{url}" + ("&" if "?" in url else "?")
+                + f"{SNAPI_COMPACT_PARAM}={blob}")
 
-    # Create final token string
-    token = "-".join([hex(block)[2:].zfill(8) for block in token_blocks])
+    token = snapi_token(key, salt, timestamp, expiration)
 
     # Add encoded user info
     encoded_key = base64.urlsafe_b64encode(key.encode()).decode().rstrip('=')
@@ -1319,41 +2399,118 @@ def generate_snapi_link(url: str, key: str, expiration_hours: int = 24) -> str:
     return result
 
 
-def verify_snapi_link(url: str, key: str) -> tuple:
-    """
-    Verify a SNAPI-generated link.
+class _SnapiClaim(NamedTuple):
+    """A parsed link whose token is still to be compared."""
+    seed: bytes
+    salt: str
+    token: Union[str, bytes]
+    expiration: int
+    compact: bool
 
-    Args:
-        url (str): The URL with SNAPI parameters
-        key (str): The secret key used for generating the link
 
-    Returns:
-        tuple: (is_valid, message) - Validation result and explanation
+class SnapiVerifier:
     """
-    try:
+    Verifier for SNAPI links created under one secret key.
+
+    Everything that depends only on the key (the keyed HMAC-SHA256 state,
+    the Chebyshev sample size and the modulus) is computed once, so each
+    link costs a URL parse, one HMAC and the modular arithmetic for its
+    salt, timestamp and expiry.
+    """
+
+    def __init__(self, key: str):
+        """
+        Precompute per-key constants.
+
+        Args:
+            key: The secret key used for generating the links
+        """
+        self.key = key
+        self.modulus = SNAPI_MODULUS
+        self.sample_size = chebyshev_bound(SNAPI_EPSILON, SNAPI_CONFIDENCE)
+        self._mac = hmac.new(key.encode(), digestmod=hashlib.sha256)
+
+    def _seed(self, message: bytes) -> bytes:
+        """HMAC-SHA256 of message under this verifier's key."""
+        mac = self._mac.copy()
+        mac.update(message)
+        return mac.digest()
+
+    def token(self, salt: str, timestamp: int, expiration: int) -> str:
+        """Return the expected token for a link's salt, ts and exp."""
+        return _snapi_token_from_seed(
+            self._seed(_snapi_message(salt, timestamp, expiration)), salt,
+            self.sample_size, self.modulus
+        )
+
+    def blocks(self, header: bytes) -> List[int]:
+        """Return the expected token blocks for a packed compact header."""
+        salt = _SNAPI_COMPACT_HEADER.unpack(header)[1].hex()
+        return _snapi_blocks_from_seed(
+            self._seed(header), salt, self.sample_size, self.modulus
+        )
+
+    @staticmethod
+    def _compact_blob(url: str) -> Optional[str]:
+        """Return the snapi parameter of a compact link, or None."""
+        query = url.partition("?")[2].partition("#")[0]
+        for field in query.split("&"):
+            name, _, value = field.partition("=")
+            if name == SNAPI_COMPACT_PARAM:
+                return value
+        return None
+
+    def _claim_compact(self, blob: str, current_time: int):
+        """Parse the snapi parameter of a compact link (see _claim)."""
+        try:
+            data = base64.urlsafe_b64decode(blob + "=" * (-len(blob) % 4))
+        except ValueError:
+            return False, "Invalid compact token encoding", None
+        if len(data) != _SNAPI_COMPACT.size:
+            return False, "Invalid compact token length", None
+        version, salt, _, expiration, *_ = _SNAPI_COMPACT.unpack(data)
+        if version != SNAPI_COMPACT_VERSION:
+            return False, f"Unsupported compact token version: {version}", None
+        if current_time > expiration:
+            return False, "Link has expired", None
+
+        header = data[:_SNAPI_COMPACT_HEADER.size]
+        return _SnapiClaim(self._seed(header), salt.hex(),
+                           data[_SNAPI_COMPACT_HEADER.size:], expiration, True)
+
+    def _claim(self, url: str, current_time: int):
+        """
+        Parse a link and run every check except the token comparison.
+
+        Returns:
+            A (False, message, None) result when the link is already
+            rejected, otherwise a _SnapiClaim for _settle
+        """
+        blob = self._compact_blob(url)
+        if blob is not None:
+            return self._claim_compact(blob, current_time)
+
         # Parse URL and extract parameters
         parsed_url = urllib.parse.urlparse(url)
         params = dict(urllib.parse.parse_qsl(parsed_url.query))
 
         # Extract token components
         if 'token' not in params or 'salt' not in params or 'ts' not in params:
-            return False, "Missing required parameters"
+            return False, "Missing required parameters", None
 
-        token = params['token']
         salt = params['salt']
         timestamp = int(params['ts'])
 
         # Check for expiration time
         if 'exp' in params:
             expiration = int(params['exp'])
-            current_time = int(time.time())
             if current_time > expiration:
-                return False, "Link has expired"
+                return False, "Link has expired", None
         else:
             # If no explicit expiration, use default (24 hour validity)
-            current_time = int(time.time())
-            if current_time - timestamp > 86400:  # 24 hours in seconds
-                return False, "Link has expired (24 hour validity)"
+            expiration = timestamp + 86400  # 24 hours in seconds
+            if current_time > expiration:
+                return False, "Link has expired (24 hour validity)", None
 
         # Check if identifier is present and matches
         if 'id' in params:
@@ -1365,35 +2522,191 @@ def verify_snapi_link(url: str, key: str) -> tuple:
                     encoded_id += '=' * padding_needed
 
                 decoded_id = base64.urlsafe_b64decode(encoded_id).decode('utf-8')
-                if decoded_id != key:
-                    return False, "Key mismatch with encoded identifier"
+                if decoded_id != self.key:
+                    return False, "Key mismatch with encoded identifier", None
             except Exception:
-                return False, "Invalid encoded identifier"
-
-        # Regenerate the token
-        # Extract base URL without token parameters
-        base_url_parts = list(parsed_url)
-        query_params = dict(urllib.parse.parse_qsl(parsed_url.query))
-        for param in ['token', 'salt', 'ts', 'exp', 'id']:
-            if param in query_params:
-                del query_params[param]
-
-        base_url_parts[4] = urllib.parse.urlencode(query_params)
-        base_url = urllib.parse.urlunparse(base_url_parts)
-
-        # Generate expected token
-        expected_url = generate_snapi_link(base_url, key)
-        expected_parsed = urllib.parse.urlparse(expected_url)
-        expected_params = dict(urllib.parse.parse_qsl(expected_parsed.query))
-
-        # Compare tokens
-        if params['token'] == expected_params['token']:
-            return True, "Link is valid and authentic"
+                return False, "Invalid encoded identifier", None
+
+        # The token is recomputed from the link's own salt, ts and exp
+        message = _snapi_message(salt, timestamp, expiration)
+        return _SnapiClaim(self._seed(message), salt, params['token'],
+                           expiration, False)
+
+    def _settle(self, claim: _SnapiClaim,
+                splits: Optional[Tuple[int, int]] = None
+                ) -> Tuple[bool, str, Optional[int]]:
+        """Compare a claim's token with the expected one."""
+        if claim.compact:
+            expected = struct.pack(">4I", *_snapi_blocks_from_seed(
+                claim.seed, claim.salt, self.sample_size, self.modulus, splits
+            ))
         else:
-            return False, "Token mismatch - link may have been tampered with"
+            expected = _snapi_token_from_seed(
+                claim.seed, claim.salt, self.sample_size, self.modulus, splits
+            )
+        if hmac.compare_digest(claim.token, expected):
+            return True, "Link is valid and authentic", claim.expiration
+        return False, "Token mismatch - link may have been tampered with", None
+
+    def verify(self, url: str, now: Optional[int] = None) -> Tuple[bool, str]:
+        """
+        Verify a SNAPI link.
+
+        Args:
+            url (str): The URL with SNAPI parameters
+            now (int, optional): Current UNIX time; defaults to time.time()
+
+        Returns:
+            Tuple[bool, str]: (is_valid, message)
+        """
+        valid, message, _ = self.check(url, now)
+        return valid, message
+
+    def check(self, url: str,
+              now: Optional[int] = None) -> Tuple[bool, str, Optional[int]]:
+        """
+        Verify a SNAPI link and report until when it stays valid.
+
+        Returns:
+            Tuple[bool, str, Optional[int]]: (is_valid, message, expiry),
+                where expiry is the last valid UNIX second of a valid link
+                and None otherwise
+        """
+        try:
+            current_time = int(time.time()) if now is None else now
+            claim = self._claim(url, current_time)
+            if isinstance(claim, _SnapiClaim):
+                return self._settle(claim)
+            return claim
+        except Exception as e:
+            return False, f"Verification error: {str(e)}", None
+
+    def verify_many(self, urls: Iterable[str]) -> List[Tuple[bool, str]]:
+        """
+        Verify many links against one clock reading; results keep input order.
+
+        Links are parsed and checked first, then the modular exponentiations
+        for every remaining link run as one modmath.pow_mod_batch call.
+        """
+        now = int(time.time())
+        results = []
+        claims = []
+        for url in urls:
+            try:
+                result = self._claim(url, now)
+            except Exception as e:
+                result = (False, f"Verification error: {str(e)}", None)
+            if isinstance(result, _SnapiClaim):
+                claims.append((len(results), result))
+            results.append(result)
+
+        splits = _snapi_splits_batch([claim.seed for _, claim in claims],
+                                     self.modulus)
+        for (index, claim), claim_splits in zip(claims, splits):
+            results[index] = self._settle(claim, claim_splits)
+        return [(valid, message) for valid, message, _ in results]
 
-    except Exception as e:
-        return False, f"Verification error: {str(e)}"
+
+def verify_snapi_link(url: str, key: str, use_cache: bool = True) -> tuple:
+    """
+    Verify a SNAPI-generated link.
+
+    Args:
+        url (str): The URL with SNAPI parameters
+        key (str): The secret key used for generating the link
+        use_cache (bool): Answer repeat verifications of a valid link from
+                          the shared verification cache until it expires
+
+    Returns:
+        tuple: (is_valid, message) - Validation result and explanation
+    """
+    if not use_cache:
+        return SnapiVerifier(key).verify(url)
+
+    now = int(time.time())
+    key_id = _verification_cache.key_id(key, "snapi")
+    message = _verification_cache.get(key_id, url, now)
+    if message is not None:
+        return True, message
+
+    valid, message, expiration = SnapiVerifier(key).check(url, now)
+    if valid:
+        _verification_cache.put(key_id, url, message, expiration, now)
+    return valid, message
+
+
+def verify_snapi_links(urls: Iterable[str], key: str) -> List[Tuple[bool, str]]:
+    """
+    Verify many SNAPI links created under the same key.
+
+    Args:
+        urls (Iterable[str]): URLs with SNAPI parameters
+        key (str): The secret key used for generating the links
+
+    Returns:
+        List[Tuple[bool, str]]: (is_valid, message) for each URL, in order
+    """
+    return SnapiVerifier(key).verify_many(urls)
+
+
+class AsymptoticHasher:
+    """
+    Incremental form of asymptotic_hash with an update()/digest() interface.
+
+    Input is streamed through SHA-256 while its length is counted; the
+    length-dependent rounds run only when the digest is requested, so files
+    and streams of any size can be hashed without loading them.
+    """
+
+    def __init__(self, data=b"", bits: int = 128):
+        """
+        Start a new hash.
+
+        Args:
+            data (bytes or str, optional): Initial data to hash
+            bits (int): Desired output size in bits (default: 128)
+        """
+        self.bits = bits
+        self._sha = hashlib.sha256()
+        self._length = 0
+        if data:
+            self.update(data)
+
+    def update(self, data) -> None:
+        """Feed more data; str input is UTF-8 encoded."""
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        self._sha.update(data)
+        self._length += len(data)
+
+    def copy(self) -> "AsymptoticHasher":
+        """Return an independent copy of the current hash state."""
+        clone = AsymptoticHasher(bits=self.bits)
+        clone._sha = self._sha.copy()
+        clone._length = self._length
+        return clone
+
+    def digest(self) -> bytes:
+        """Return the hash of all data fed so far, truncated to bits."""
+        # Determine number of rounds based on input size (logarithmic)
+        n = self._length
+        rounds = math.ceil(math.log2(max(n, 2)))
+
+        # Apply multiple rounds of hashing
+        current_hash = self._sha.digest()
+        for i in range(rounds):
+            # Each round incorporates the original text length in a different
+            # way; the length term wraps at 32 bits so inputs of any size work
+            salt = ((n * (i + 1)) & 0xFFFFFFFF).to_bytes(4, byteorder='big')
+            current_hash = hashlib.sha256(current_hash + salt).digest()
+
+        # Truncate to desired bit length (converted to bytes)
+        bytes_needed = (self.bits + 7) // 8  # Ceiling division to get bytes
+        return current_hash[:bytes_needed]
+
+    def hexdigest(self) -> str:
+        """Return digest() as a hexadecimal string."""
+        return self.digest().hex()
 
 
 def asymptotic_hash(text: str, bits: int = 128) -> str:
@@ -1407,75 +2720,540 @@ def asymptotic_hash(text: str, bits: int = 128) -> str:
     Returns:
         str: The asymptotic hash as a hexadecimal string
     """
-    # Convert text to bytes if it's not already
-    if isinstance(text, str):
-        text = text.encode('utf-8')
+    # Base hash using SHA-256, then O(log n) rounds that depend on the input
+    # length; this simulates O(n log n) complexity as input size increases
+    return AsymptoticHasher(text, bits).hexdigest()
+
+
+def asymptotic_hash_file(path: str, bits: int = 128,
+                         buffer_size: int = 4 * 1024 * 1024) -> str:
+    """
+    Compute asymptotic_hash of a file's contents without loading it.
+
+    Args:
+        path (str): Path of the file to hash
+        bits (int): Desired output size in bits (default: 128)
+        buffer_size (int): Read buffer size in bytes (default: 4 MiB)
+
+    Returns:
+        str: The asymptotic hash as a hexadecimal string
+    """
+    hasher = AsymptoticHasher(bits=bits)
+    buffer = bytearray(buffer_size)
+    view = memoryview(buffer)
+    with open(path, 'rb', buffering=0) as f:
+        while True:
+            read = f.readinto(buffer)
+            if not read:
+                break
+            hasher.update(view[:read])
+    return hasher.hexdigest()
+
+
+# ============================================================================
+# Batch Command-Line Interface
+# ============================================================================
 
-    # Base hash using SHA-256
-    hash_bytes = hashlib.sha256(text).digest()
+BATCH_SIZE = 1000
 
-    # Apply asymptotic transformations
-    # In asymptotic notation, we care about growth rates as input size increases
-    # This simulates O(n log n) complexity by applying additional operations
+BatchFunc = Callable[[List[str]], List[str]]
 
-    # Determine number of rounds based on input size (logarithmic)
-    n = len(text)
-    log_n = math.ceil(math.log2(max(n, 2)))
-    rounds = log_n
 
-    # Apply multiple rounds of hashing
-    current_hash = hash_bytes
-    for i in range(rounds):
-        # Each round incorporates the original text length in a different way
-        # This simulates different asymptotic behaviors
-        salt = (n * (i + 1)).to_bytes(4, byteorder='big')
-        current_hash = hashlib.sha256(current_hash + salt).digest()
+def _per_item(func: Callable[[str], str]) -> BatchFunc:
+    """Wrap a single-item conversion so errors become per-item messages."""
+    def run(items: List[str]) -> List[str]:
+        results = []
+        for item in items:
+            try:
+                results.append(func(item))
+            except Exception as e:
+                results.append(f"[Error: {str(e)}]")
+        return results
+    return run
 
-    # Truncate to desired bit length (converted to bytes)
-    bytes_needed = (bits + 7) // 8  # Ceiling division to get bytes
-    truncated = current_hash[:bytes_needed]
 
-    return truncated.hex()
+def _secret(args: argparse.Namespace, prompt: str) -> str:
+    """
+    Read a password/key once: a value set by a caller (e.g. the daemon),
+    --password-env, or an interactive prompt.
+    """
+    if args.password is not None:
+        value = args.password
+    elif args.password_env:
+        value = os.environ.get(args.password_env, "")
+    else:
+        value = getpass.getpass(prompt)
+    if not value:
+        raise ValueError("Empty password or key")
+    return value
 
 
-def main() -> None:
-    """Main function to run the Universal Text Converter interactively."""
-    # Define conversion functions with their names and handlers
-    conversion_functions = {
-        "1": ("HTML Entities", text_to_html_entities),
-        "2": ("Base64 Encode", text_to_base64),
-        "3": ("Base64 Decode", base64_to_text),
-        "4": ("Regex Escape", escape_regex),
-        "5": ("SAML URL", create_saml_url),
-        "5a": ("Advanced SAML URL", None),  # Special handling
-        "5b": ("SAML URL with Custom Hash", None),  # Special handling
-        "5c": ("SAML URL with UTM Parameters", None),  # Special handling
-        "5d": ("Batch UTM URL Generator", None)  # Special handling for multiple UTM URLs
-    }
+def _require_crypto() -> None:
+    if not CRYPTO_AVAILABLE:
+        raise ValueError(
+            "Cryptography package not installed (pip install cryptography)"
+        )
+
+
+def _batch_regex(args: argparse.Namespace) -> BatchFunc:
+    return _per_item(lambda text: escape_regex(text, args.level, args.linear))
+
+
+def _batch_saml(args: argparse.Namespace) -> BatchFunc:
+    return _per_item(
+        lambda text: create_saml_url(text, args.relay_state, args.target_url)
+    )
+
 
-    # Add encryption functions if available
-    if CRYPTO_AVAILABLE:
-        encryption_functions = {
-            "6": ("AES Encryption", aes_encrypt),
-            "7": ("AES Decryption", aes_decrypt),
-            "8": ("RSA Key Generation", None),  # Special handling
-            "9": ("RSA Encryption", rsa_encrypt),
-            "10": ("RSA Decryption", rsa_decrypt),
-            "11": ("Blowfish Encryption", blowfish_encrypt),
-            "12": ("Blowfish Decryption", blowfish_decrypt)
-        }
-        # Merge the dictionaries
-        for k, v in encryption_functions.items():
-            conversion_functions[k] = v
-
-    # Add mathematical link generation functions
-    math_functions = {
-        "13": ("SNAPI Secure Link", None),  # Special handling
-        "14": ("Verify SNAPI Link", None),  # Special handling
-        "15": ("Asymptotic Hash", None)     # Special handling
+def _batch_advanced_saml(args: argparse.Namespace) -> BatchFunc:
+    _require_crypto()
+    signer = SamlUrlSigner(_secret(args, "Enter encryption key: "))
+    return _per_item(
+        lambda email: signer.sign(args.url, email, args.pattern, args.compact)
+    )
+
+
+def _batch_saml_hash(args: argparse.Namespace) -> BatchFunc:
+    return _per_item(
+        lambda url: create_saml_url_with_hash(
+            url, args.hash, args.relay_state, args.target_url
+        )
+    )
+
+
+def _utm_params(args: argparse.Namespace) -> dict:
+    params = {
+        "utm_source": args.source,
+        "utm_medium": args.medium,
+        "utm_campaign": args.campaign
     }
-    for k, v in math_functions.items():
-        conversion_functions[k] = v
+    if args.content:
+        params["utm_content"] = args.content
+    if args.term:
+        params["utm_term"] = args.term
+    return params
+
+
+def _batch_saml_utm(args: argparse.Namespace) -> BatchFunc:
+    params = _utm_params(args)
+    if args.id is not None:
+        params["utm_id"] = str(max(1, min(100, args.id)))
+    custom_hash = hashlib.md5(
+        f"{args.source}|{args.medium}|{args.campaign}|{time.time()}".encode()
+    ).hexdigest()[:10]
+    return _per_item(
+        lambda url: create_saml_url_with_hash(
+            url, custom_hash, args.relay_state, args.target_url, params
+        )
+    )
+
+
+def _batch_utm(args: argparse.Namespace) -> BatchFunc:
+    key = _secret(args, "Enter encryption key: ") if args.custom else None
+
+    def run(urls: List[str]) -> List[str]:
+        return ["\n".join(iter_batch_utm_urls(
+            url, args.source, args.medium, args.campaign, args.content,
+            args.term, args.count, args.custom, key
+        )) for url in urls]
+    return run
+
+
+def _batch_aes(decrypt: bool) -> Callable[[argparse.Namespace], BatchFunc]:
+    def build(args: argparse.Namespace) -> BatchFunc:
+        _require_crypto()
+        password = _secret(args, "Enter password: ")
+        if decrypt:
+            return lambda items: aes_decrypt_many(items, password)
+        salt = os.urandom(16)
+        return lambda items: aes_encrypt_many(items, password, salt)
+    return build
+
+
+def _batch_blowfish(decrypt: bool) -> Callable[[argparse.Namespace], BatchFunc]:
+    def build(args: argparse.Namespace) -> BatchFunc:
+        _require_crypto()
+        password = _secret(args, "Enter password: ")
+        if decrypt:
+            return lambda items: blowfish_decrypt_many(items, password)
+        salt = os.urandom(8)
+        return lambda items: blowfish_encrypt_many(items, password, salt)
+    return build
+
+
+def _batch_envelope(decrypt: bool) -> Callable[[argparse.Namespace], BatchFunc]:
+    def build(args: argparse.Namespace) -> BatchFunc:
+        _require_crypto()
+        password = _secret(args, "Enter password: ")
+        if decrypt:
+            return lambda items: decrypt_many(items, password, args.legacy)
+        salt = os.urandom(16)
+        return lambda items: envelope_encrypt_many(items, password,
+                                                   args.algorithm, salt)
+    return build
+
+
+def _batch_rsa_encrypt(args: argparse.Namespace) -> BatchFunc:
+    _require_crypto()
+    with open(args.key_file, 'rb') as f:
+        public_key = load_rsa_public_key(f.read())
+    if args.hybrid:
+        import rsa_envelope
+        return _per_item(lambda text: rsa_envelope.encrypt_text(text, public_key))
+    oaep = rsa_oaep_padding()
+    return _per_item(lambda text: base64.b64encode(
+        public_key.encrypt(text.encode('utf-8'), oaep)
+    ).decode('utf-8'))
+
+
+def _batch_rsa_decrypt(args: argparse.Namespace) -> BatchFunc:
+    _require_crypto()
+    import rsa_envelope
+    with open(args.key_file, 'rb') as f:
+        private_key = load_rsa_private_key(f.read())
+    oaep = rsa_oaep_padding()
+
+    def decrypt(text: str) -> str:
+        data = base64.b64decode(text)
+        # Hybrid envelopes are recognised by their magic bytes
+        if data.startswith(rsa_envelope.MAGIC):
+            return rsa_envelope.decrypt_bytes(data, private_key).decode('utf-8')
+        return private_key.decrypt(data, oaep).decode('utf-8')
+    return _per_item(decrypt)
+
+
+def _batch_snapi(args: argparse.Namespace) -> BatchFunc:
+    key = _secret(args, "Enter secret key: ")
+    return _per_item(lambda url: generate_snapi_link(url, key, args.hours,
+                                                     args.compact))
+
+
+def _batch_snapi_verify(args: argparse.Namespace) -> BatchFunc:
+    verifier = SnapiVerifier(_secret(args, "Enter secret key: "))
+
+    def run(urls: List[str]) -> List[str]:
+        return [
+            f"{'valid' if ok else 'invalid'}\t{message}"
+            for ok, message in verifier.verify_many(urls)
+        ]
+    return run
+
+
+def _batch_hash(args: argparse.Namespace) -> BatchFunc:
+    return _per_item(lambda text: asymptotic_hash(text, args.bits))
+
+
+def _add_secret_arg(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--password-env", metavar="VAR",
+        help="Read the password/key from this environment variable "
+             "(default: prompt once)",
+    )
+
+
+def _add_utm_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--source", required=True, help="utm_source")
+    parser.add_argument("--medium", required=True, help="utm_medium")
+    parser.add_argument("--campaign", required=True, help="utm_campaign")
+    parser.add_argument("--content", help="utm_content")
+    parser.add_argument("--term", help="utm_term")
+
+
+def _add_saml_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--relay-state", help="RelayState parameter")
+    parser.add_argument("--target-url", help="Target URL to redirect to")
+
+
+def build_cli_parser() -> argparse.ArgumentParser:
+    """Build the argparse front end; each subcommand mirrors a menu entry."""
+    parser = argparse.ArgumentParser(
+        description="Universal Text Converter - batch mode. Converts every "
+                    "line (or NDJSON record) of the input in one process; "
+                    "run without arguments for the interactive menu."
+    )
+    parser.add_argument(
+        "-i", "--input", help="Input file (default: stdin)"
+    )
+    parser.add_argument(
+        "-o", "--output", help="Output file (default: stdout)"
+    )
+    parser.add_argument(
+        "--ndjson", action="store_true",
+        help="Input lines are JSON objects; convert --field into --out-field",
+    )
+    parser.add_argument(
+        "--field", default="text", help="NDJSON input field (default: text)"
+    )
+    parser.add_argument(
+        "--out-field", default="result",
+        help="NDJSON output field (default: result)",
+    )
+    parser.add_argument(
+        "-q", "--quiet", action="store_true", help="Do not report throughput"
+    )
+    # Callers running the subcommands in-process may supply the secret
+    # directly; secret_commands lists the subcommands that take one
+    secret_names: List[str] = []
+    parser.set_defaults(password=None, secret_commands=secret_names)
+    sub = parser.add_subparsers(dest="command", metavar="COMMAND")
+    sub.required = True
+
+    def add(name: str, menu: Optional[str], help_text: str,
+            build: Callable[[argparse.Namespace], BatchFunc],
+            secret: bool = False):
+        if menu:
+            help_text = f"{help_text} (menu {menu})"
+        cmd = sub.add_parser(name, help=help_text)
+        cmd.set_defaults(build=build)
+        if secret:
+            _add_secret_arg(cmd)
+            secret_names.append(name)
+        return cmd
+
+    add("html-entities", "1", "HTML Entities",
+        lambda args: _per_item(text_to_html_entities))
+    add("base64-encode", "2", "Base64 Encode",
+        lambda args: _per_item(text_to_base64))
+    add("base64-decode", "3", "Base64 Decode",
+        lambda args: _per_item(base64_to_text))
+    cmd = add("regex-escape", "4", "Regex Escape", _batch_regex)
+    cmd.add_argument("--level", type=int, choices=[1, 2, 3], default=1)
+    cmd.add_argument("--linear", action="store_true",
+                     help="Linear-time pattern (possessive/atomic, Python 3.11+)")
+    _add_saml_args(add("saml-url", "5", "SAML URL", _batch_saml))
+    cmd = add("advanced-saml", "5a", "Advanced SAML URL (input: emails)",
+              _batch_advanced_saml, secret=True)
+    cmd.add_argument("--url", required=True, help="Base domain URL")
+    cmd.add_argument("--pattern", default=r'[a-zA-Z0-9]+', help="Regex pattern")
+    cmd.add_argument("--compact", action="store_true",
+                     help="Single-blob URL format (see SamlUrlSigner)")
+    cmd = add("saml-hash", "5b", "SAML URL with Custom Hash", _batch_saml_hash)
+    cmd.add_argument("--hash", required=True, help="Custom tracking hash")
+    _add_saml_args(cmd)
+    cmd = add("saml-utm", "5c", "SAML URL with UTM Parameters", _batch_saml_utm)
+    _add_utm_args(cmd)
+    cmd.add_argument("--id", type=int, help="Tracking ID (1-100)")
+    _add_saml_args(cmd)
+    cmd = add("utm-batch", "5d", "Batch UTM URL Generator (input: base URLs)",
+              _batch_utm, secret=True)
+    _add_utm_args(cmd)
+    cmd.add_argument("-n", "--count", type=int, default=1,
+                     help="URLs per input line")
+    cmd.add_argument("--custom", action="store_true",
+                     help="Advanced SAML-style format")
+    add("aes-encrypt", "6", "AES Encryption", _batch_aes(False), secret=True)
+    add("aes-decrypt", "7", "AES Decryption", _batch_aes(True), secret=True)
+    cmd = add("rsa-encrypt", "9", "RSA Encryption", _batch_rsa_encrypt)
+    cmd.add_argument("--key-file", required=True, help="PEM public key")
+    cmd.add_argument("--hybrid", action="store_true",
+                     help="RSA-OAEP + AES-GCM envelope for input of any size")
+    cmd = add("rsa-decrypt", "10", "RSA Decryption", _batch_rsa_decrypt)
+    cmd.add_argument("--key-file", required=True,
+                     help="PEM private key (also opens hybrid envelopes)")
+    add("blowfish-encrypt", "11", "Blowfish Encryption",
+        _batch_blowfish(False), secret=True)
+    add("blowfish-decrypt", "12", "Blowfish Decryption",
+        _batch_blowfish(True), secret=True)
+    cmd = add("encrypt", None, "Versioned envelope encryption",
+              _batch_envelope(False), secret=True)
+    cmd.add_argument("--algorithm", choices=sorted(ENVELOPE_ALGORITHMS),
+                     default=DEFAULT_ENVELOPE_ALGORITHM)
+    cmd = add("decrypt", None,
+              "Decrypt envelopes and legacy AES/Blowfish records",
+              _batch_envelope(True), secret=True)
+    cmd.add_argument("--legacy", choices=["auto", "aes", "blowfish"],
+                     default="auto",
+                     help="Layout of records without a header (default: auto)")
+    cmd = add("snapi-link", "13", "SNAPI Secure Link (input: URLs)",
+              _batch_snapi, secret=True)
+    cmd.add_argument("--hours", type=int, default=24, help="Expiration hours")
+    cmd.add_argument("--compact", action="store_true",
+                     help="Emit the single-parameter binary token format")
+    add("snapi-verify", "14", "Verify SNAPI Link", _batch_snapi_verify,
+        secret=True)
+    cmd = add("asymptotic-hash", "15", "Asymptotic Hash", _batch_hash)
+    cmd.add_argument("--bits", type=int, default=128, help="Hash size (8-512)")
+    return parser
+
+
+def secret_commands(parser: Optional[argparse.ArgumentParser] = None
+                    ) -> List[str]:
+    """
+    Names of the batch subcommands that read a password or key.
+
+    build_cli_parser records each subcommand as it gives it --password-env,
+    so clients that send the secret separately (convert_client.py) cannot
+    drift from the parser.
+    """
+    parser = parser or build_cli_parser()
+    return sorted(parser.get_default("secret_commands"))
+
+
+def apply_batch(convert_batch: BatchFunc, items: List[str]) -> List[str]:
+    """
+    Run a batch conversion over items, passing empty items through.
+
+    Empty lines yield empty results, so output stays aligned with input.
+    """
+    todo = [i for i, item in enumerate(items) if item]
+    results = [""] * len(items)
+    for i, result in zip(todo, convert_batch([items[i] for i in todo])):
+        results[i] = result
+    return results
+
+
+def _read_batches(src, ndjson: bool, field: str):
+    """Yield (records, items) batches of up to BATCH_SIZE input lines."""
+    records, items = [], []
+    for line in src:
+        line = line.rstrip("\r\n")
+        if ndjson:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            records.append(record)
+            value = record.get(field)
+            items.append(value if isinstance(value, str) else "")
+        else:
+            items.append(line)
+        if len(items) >= BATCH_SIZE:
+            yield records, items
+            records, items = [], []
+    if items:
+        yield records, items
+
+
+def run_cli(argv: Optional[List[str]] = None) -> int:
+    """
+    Run the non-interactive batch front end.
+
+    Every input line (or the --field of every NDJSON record) is converted by
+    the chosen subcommand. Passwords, keys and ciphers are set up once for the
+    whole run, output is written in buffered blocks, and throughput is
+    reported on stderr at the end.
+
+    Args:
+        argv (list, optional): Arguments (default: sys.argv[1:])
+
+    Returns:
+        int: Process exit status
+    """
+    args = build_cli_parser().parse_args(argv)
+
+    try:
+        convert_batch = args.build(args)
+    except (ValueError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    src = open(args.input, encoding='utf-8') if args.input else sys.stdin
+    dst = (open(args.output, 'w', encoding='utf-8', buffering=1024 * 1024)
+           if args.output else sys.stdout)
+    count = 0
+    start = time.perf_counter()
+    try:
+        for records, items in _read_batches(src, args.ndjson, args.field):
+            results = apply_batch(convert_batch, items)
+
+            if args.ndjson:
+                for record, result in zip(records, results):
+                    record[args.out_field] = result
+                lines = [json.dumps(r, ensure_ascii=False) for r in records]
+            else:
+                lines = results
+            dst.write("\n".join(lines) + "\n")
+            count += len(items)
+    except (ValueError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if args.input:
+            src.close()
+        if args.output:
+            dst.close()
+        else:
+            dst.flush()
+    elapsed = time.perf_counter() - start
+
+    if not args.quiet:
+        rate = count / elapsed if elapsed > 0 else 0.0
+        print(f"Converted {count} items with {args.command} in {elapsed:.2f}s "
+              f"({rate:.0f} items/s)", file=sys.stderr)
+    return 0
+
+
+# ============================================================================
+# Conversion Registry
+# ============================================================================
+
+class Conversion(NamedTuple):
+    """A menu entry: display name, handler, family and required backends."""
+    name: str
+    func: Callable
+    family: str
+    backends: Tuple[str, ...] = ()
+
+
+CONVERSIONS = OrderedDict([
+    ("1", Conversion("HTML Entities", text_to_html_entities, "text")),
+    ("2", Conversion("Base64 Encode", text_to_base64, "text")),
+    ("3", Conversion("Base64 Decode", base64_to_text, "text")),
+    ("4", Conversion("Regex Escape", escape_regex, "text")),
+    ("5", Conversion("SAML URL", create_saml_url, "saml")),
+    ("5a", Conversion("Advanced SAML URL", create_advanced_saml_url, "saml",
+                      ("crypto",))),
+    ("5b", Conversion("SAML URL with Custom Hash", create_saml_url_with_hash,
+                      "saml")),
+    ("5c", Conversion("SAML URL with UTM Parameters",
+                      create_saml_url_with_hash, "saml")),
+    ("5d", Conversion("Batch UTM URL Generator", generate_batch_utm_urls,
+                      "saml")),
+    ("6", Conversion("AES Encryption", aes_encrypt, "crypto", ("crypto",))),
+    ("7", Conversion("AES Decryption", aes_decrypt, "crypto", ("crypto",))),
+    ("8", Conversion("RSA Key Generation", rsa_generate_keys, "crypto",
+                     ("crypto",))),
+    ("9", Conversion("RSA Encryption", rsa_encrypt, "crypto", ("crypto",))),
+    ("10", Conversion("RSA Decryption", rsa_decrypt, "crypto", ("crypto",))),
+    ("11", Conversion("Blowfish Encryption", blowfish_encrypt, "crypto",
+                      ("crypto",))),
+    ("12", Conversion("Blowfish Decryption", blowfish_decrypt, "crypto",
+                      ("crypto",))),
+    ("13", Conversion("SNAPI Secure Link", generate_snapi_link, "math")),
+    ("14", Conversion("Verify SNAPI Link", verify_snapi_link, "math")),
+    ("15", Conversion("Asymptotic Hash", asymptotic_hash, "math")),
+])
+
+
+def get_conversion(key: str) -> Conversion:
+    """
+    Look up a menu entry and import the backends it needs.
+
+    Backends are imported the first time one of their conversions is
+    selected, so text conversions never pay for cryptography.
+
+    Args:
+        key (str): Menu key, e.g. "2" or "5a"
+
+    Returns:
+        Conversion: The registry entry
+
+    Raises:
+        KeyError: If the key is not registered
+    """
+    conversion = CONVERSIONS[key]
+    for backend in conversion.backends:
+        load_backend(backend)
+    return conversion
+
+
+def main() -> None:
+    """Main function to run the Universal Text Converter interactively."""
+    # Encryption entries are only offered when cryptography is installed
+    conversion_functions = OrderedDict(
+        (key, (conversion.name, conversion.func))
+        for key, conversion in CONVERSIONS.items()
+        if conversion.family != "crypto" or CRYPTO_AVAILABLE
+    )
 
     print("Universal Text Converter")
     print("=" * 30)
@@ -1499,8 +3277,7 @@ def main() -> None:
             print(f"\nInvalid choice: {choice}.")
             return
 
-        conversion_name = conversion_functions[choice][0]
-        conversion_func = conversion_functions[choice][1]
+        conversion_name, conversion_func, _, _ = get_conversion(choice)
 
         # Special handling for AES Encryption
         if choice == "6":
@@ -2034,11 +3811,64 @@ def main() -> None:
 
 
 # Session management functions
+SESSION_INDEXES = (
+    ("user_id", {"unique": True}),
+    ("token", {"unique": True}),
+    ("expires_at", {}),
+)
+
+# One MongoClient (and so one connection pool) per connection string, and
+# the databases whose session indexes have already been created
+_mongo_clients: Dict[str, object] = {}
+_indexed_session_dbs = set()
+_mongo_lock = threading.Lock()
+
+
+def get_mongo_client(connection_string="mongodb://localhost:27017/"):
+    """
+    Return the shared MongoClient for a connection string.
+
+    MongoClient is thread-safe and pools its connections, so it is created
+    once per process and reused by every later call.
+    """
+    with _mongo_lock:
+        client = _mongo_clients.get(connection_string)
+        if client is None:
+            client = MongoClient(connection_string)
+            _mongo_clients[connection_string] = client
+    return client
+
+
+def close_mongo_clients() -> None:
+    """Close every shared MongoClient (e.g. at shutdown or after fork)."""
+    with _mongo_lock:
+        clients = list(_mongo_clients.values())
+        _mongo_clients.clear()
+        _indexed_session_dbs.clear()
+    for client in clients:
+        client.close()
+
+
+def _ensure_session_indexes(db, cache_key) -> None:
+    """Create the session indexes the first time a database is used."""
+    with _mongo_lock:
+        if cache_key in _indexed_session_dbs:
+            return
+    # create_index is idempotent, so a concurrent first call is harmless
+    for field, options in SESSION_INDEXES:
+        db.sessions.create_index(field, **options)
+    with _mongo_lock:
+        _indexed_session_dbs.add(cache_key)
+
+
 def initialize_session_db(connection_string="mongodb://localhost:27017/",
                           db_name="mini_app"):
     """
     Initialize MongoDB connection for session management.
 
+    The client is shared through get_mongo_client and the session indexes
+    are created only on the first call for each database.
+
     Args:
         connection_string: MongoDB connection string
         db_name: Database name
@@ -2051,14 +3881,8 @@ def initialize_session_db(connection_string="mongodb://localhost:27017/",
         return None
 
     try:
-        client = MongoClient(connection_string)
-        db = client[db_name]
-
-        # Create indexes for session management
-        db.sessions.create_index("user_id", unique=True)
-        db.sessions.create_index("token", unique=True)
-        db.sessions.create_index("expires_at")
-
+        db = get_mongo_client(connection_string)[db_name]
+        _ensure_session_indexes(db, (connection_string, db_name))
         return db
     except Exception as e:
         print(f"MongoDB connection error: {e}")
@@ -2076,7 +3900,7 @@ def check_user_session(db, user_id):
     Returns:
         Session document or None if no active session
     """
-    if not db:
+    if db is None:
         return None
 
     import datetime
@@ -2088,49 +3912,110 @@ def check_user_session(db, user_id):
     })
 
 
-def create_user_session(db, user_id, expiry_minutes=30):
+def _new_session(user_id, expiry_minutes, now):
+    """Build a session document with a fresh token."""
+    import datetime
+
+    # Generate secure token using our crypto functions
+    token = asymptotic_hash(f"{user_id}-{uuid.uuid4()}-{time.time()}",
+                            bits=256)[:32]
+    return {
+        "user_id": user_id,
+        "token": token,
+        "created_at": now,
+        "expires_at": now + datetime.timedelta(minutes=expiry_minutes),
+        "last_activity": now,
+        "usage_count": 0
+    }
+
+
+def create_user_sessions(db, user_ids, expiry_minutes=30):
     """
-    Create a new session for a user.
+    Create sessions for many users in one insert_many round trip.
+
+    Inserts are unordered, so one conflicting user does not stop the rest.
+    Users whose insert fails are looked up with a single extra query to
+    report their active session.
 
     Args:
         db: MongoDB database object
-        user_id: User identifier
-        expiry_minutes: Minutes until session expires
+        user_ids: User identifiers (any iterable)
+        expiry_minutes: Minutes until the sessions expire
 
     Returns:
-        Tuple of (success, message, session_data)
+        List of (success, message, session_data) tuples, one per user id
     """
-    if not db:
-        return False, "MongoDB not available", {}
+    user_ids = list(user_ids)
+    if db is None:
+        return [(False, "MongoDB not available", {}) for _ in user_ids]
 
     import datetime
 
-    # Check for existing session
-    existing = check_user_session(db, user_id)
-    if existing:
-        return False, "User already has an active session", existing
+    now = datetime.datetime.utcnow()
+    results: List[Optional[tuple]] = [None] * len(user_ids)
+    sessions = []
+    positions = []
+    seen = set()
+    for index, user_id in enumerate(user_ids):
+        if user_id in seen:
+            results[index] = (False, "Duplicate user id in request", {})
+            continue
+        seen.add(user_id)
+        sessions.append(_new_session(user_id, expiry_minutes, now))
+        positions.append(index)
+
+    write_errors = {}
+    if sessions:
+        from pymongo.errors import BulkWriteError
 
-    # Generate secure token using our crypto functions
-    token = generate_asymptotic_hash(f"{user_id}-{uuid.uuid4()}-{time.time()}",
-                                    bits=256)[:32]
+        try:
+            db.sessions.insert_many(sessions, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                write_errors[error["index"]] = error.get("errmsg", "")
+        except Exception as e:
+            message = f"Error creating session: {str(e)}"
+            return [result or (False, message, {}) for result in results]
+
+    existing = {}
+    if write_errors:
+        failed_ids = [sessions[i]["user_id"] for i in write_errors]
+        for session in db.sessions.find({
+            "user_id": {"$in": failed_ids},
+            "expires_at": {"$gt": now}
+        }):
+            existing[session["user_id"]] = session
+
+    for offset, session in enumerate(sessions):
+        index = positions[offset]
+        if offset not in write_errors:
+            results[index] = (True, "Session created successfully", session)
+        elif session["user_id"] in existing:
+            results[index] = (False, "User already has an active session",
+                              existing[session["user_id"]])
+        else:
+            results[index] = (
+                False, f"Error creating session: {write_errors[offset]}", {}
+            )
+    return results
 
-    # Create session document
-    session = {
-        "user_id": user_id,
-        "token": token,
-        "created_at": datetime.datetime.utcnow(),
-        "expires_at": datetime.datetime.utcnow() +
-                      datetime.timedelta(minutes=expiry_minutes),
-        "last_activity": datetime.datetime.utcnow(),
-        "usage_count": 0
-    }
 
-    try:
-        db.sessions.insert_one(session)
-        return True, "Session created successfully", session
-    except Exception as e:
-        return False, f"Error creating session: {str(e)}", {}
+def create_user_session(db, user_id, expiry_minutes=30):
+    """
+    Create a new session for a user.
+
+    Args:
+        db: MongoDB database object
+        user_id: User identifier
+        expiry_minutes: Minutes until session expires
+
+    Returns:
+        Tuple of (success, message, session_data)
+    """
+    return create_user_sessions(db, [user_id], expiry_minutes)[0]
 
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(run_cli())
     main()
@@ -0,0 +1,444 @@
+#!/usr/bin/env python3
+"""
+Asyncio API for convert.py
+
+Coroutine counterparts of the convert.py encryption, SAML and SNAPI
+functions, for callers running inside an event loop. PBKDF2, RSA and the
+block ciphers would otherwise block the loop for tens of milliseconds per
+call. Here they run on a bounded thread pool, and the loop only awaits the
+result.
+
+- Passwords, keys and PEM texts are always arguments. Nothing prompts or
+  prints.
+- At most max_pending calls are handed to the pool at once. Further callers
+  wait on the loop without queuing work, so a burst cannot build an
+  unbounded backlog.
+- Cancelling a call that is still waiting for a slot, or is queued in the
+  pool, means it never runs. A call already running in a thread finishes,
+  and its result is discarded. Batch functions work in slices of
+  batch_size records, so cancelling one stops it at the next slice.
+
+The encrypt/decrypt functions raise on an empty password or missing
+cryptography package, like the convert.py *_many functions. Records that
+fail to decrypt come back as "[Decryption error: ...]" strings.
+
+Usage:
+    import convert_async
+    token = await convert_async.aes_encrypt(text, password)
+    ok, message = await convert_async.verify_snapi_link(url, key)
+
+    python3 convert_async.py --tasks 200 --workers 4    # event-loop latency load test
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple
+
+import convert
+
+DEFAULT_BATCH_SIZE = 256
+
+
+class AsyncExecutor:
+    """
+    Bounded thread pool for running blocking convert.py calls from asyncio.
+
+    Args:
+        max_workers (int, optional): Pool threads (default: all cores)
+        max_pending (int, optional): Calls submitted to the pool at once,
+                                     running or queued (default: 2 per thread)
+    """
+
+    def __init__(self, max_workers: Optional[int] = None,
+                 max_pending: Optional[int] = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.max_workers * 2
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="convert-async"
+        )
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        """Slot semaphore for the running loop (recreated if the loop changes)."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._slots = asyncio.Semaphore(self.max_pending)
+        return self._slots
+
+    @staticmethod
+    def _release(loop: asyncio.AbstractEventLoop,
+                 slots: asyncio.Semaphore) -> None:
+        """Free a slot from the pool thread once the call has returned."""
+        try:
+            loop.call_soon_threadsafe(slots.release)
+        except RuntimeError:  # loop already closed
+            pass
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run func(*args) on the pool and await its result.
+
+        The slot is held until the function has actually returned, so
+        cancelled calls still count against max_pending while their thread
+        finishes.
+        """
+        slots = self._semaphore()
+        await slots.acquire()
+        loop = asyncio.get_running_loop()
+        try:
+            future = self._pool.submit(func, *args)
+        except BaseException:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: self._release(loop, slots))
+        return await asyncio.wrap_future(future)
+
+    async def run_batch(self, func: Callable[[List[Any]], List[Any]],
+                        items: Iterable[Any],
+                        batch_size: int = DEFAULT_BATCH_SIZE) -> List[Any]:
+        """
+        Apply a list-to-list function to items in slices of batch_size.
+
+        Slices run one after another, so a cancelled batch stops after the
+        slice in progress. Results keep input order.
+        """
+        items = list(items)
+        results: List[Any] = []
+        for start in range(0, len(items), batch_size):
+            results.extend(await self.run(func, items[start:start + batch_size]))
+        return results
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+
+_executor: Optional[AsyncExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> AsyncExecutor:
+    """Return the shared executor, creating it with default limits."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = AsyncExecutor()
+        return _executor
+
+
+def configure(max_workers: Optional[int] = None,
+              max_pending: Optional[int] = None) -> AsyncExecutor:
+    """
+    Replace the shared executor with one using the given limits.
+
+    Call this at startup, before any coroutine in this module runs. The old
+    executor is shut down after its running calls finish.
+    """
+    global _executor
+    with _executor_lock:
+        old, _executor = _executor, AsyncExecutor(max_workers, max_pending)
+    if old is not None:
+        old.shutdown(wait=False)
+    return _executor
+
+
+def shutdown(wait: bool = True) -> None:
+    """Shut down the shared executor (a new one is created on next use)."""
+    global _executor
+    with _executor_lock:
+        old, _executor = _executor, None
+    if old is not None:
+        old.shutdown(wait=wait)
+
+
+# Encryption
+
+async def aes_encrypt(text: str, password: str) -> str:
+    """Async aes_encrypt with an explicit password (fresh salt, full PBKDF2)."""
+    return (await get_executor().run(convert.aes_encrypt_many,
+                                     [text], password))[0]
+
+
+async def aes_decrypt(encrypted_text: str, password: str) -> str:
+    """Async aes_decrypt with an explicit password."""
+    return (await get_executor().run(convert.aes_decrypt_many,
+                                     [encrypted_text], password))[0]
+
+
+async def aes_encrypt_many(texts: Iterable[str], password: str,
+                           batch_size: int = DEFAULT_BATCH_SIZE) -> List[str]:
+    """Async aes_encrypt_many; one salt and key for the whole batch."""
+    salt = os.urandom(16)
+    return await get_executor().run_batch(
+        lambda items: convert.aes_encrypt_many(items, password, salt),
+        texts, batch_size
+    )
+
+
+async def aes_decrypt_many(encrypted_texts: Iterable[str], password: str,
+                           batch_size: int = DEFAULT_BATCH_SIZE) -> List[str]:
+    """Async aes_decrypt_many."""
+    return await get_executor().run_batch(
+        lambda items: convert.aes_decrypt_many(items, password),
+        encrypted_texts, batch_size
+    )
+
+
+async def blowfish_encrypt(text: str, password: str) -> str:
+    """Async blowfish_encrypt with an explicit password."""
+    return (await get_executor().run(convert.blowfish_encrypt_many,
+                                     [text], password))[0]
+
+
+async def blowfish_decrypt(encrypted_text: str, password: str) -> str:
+    """Async blowfish_decrypt with an explicit password."""
+    return (await get_executor().run(convert.blowfish_decrypt_many,
+                                     [encrypted_text], password))[0]
+
+
+async def blowfish_encrypt_many(
+    texts: Iterable[str], password: str,
+    batch_size: int = DEFAULT_BATCH_SIZE
+) -> List[str]:
+    """Async blowfish_encrypt_many; one salt and key for the whole batch."""
+    salt = os.urandom(8)
+    return await get_executor().run_batch(
+        lambda items: convert.blowfish_encrypt_many(items, password, salt),
+        texts, batch_size
+    )
+
+
+async def blowfish_decrypt_many(
+    encrypted_texts: Iterable[str], password: str,
+    batch_size: int = DEFAULT_BATCH_SIZE
+) -> List[str]:
+    """Async blowfish_decrypt_many."""
+    return await get_executor().run_batch(
+        lambda items: convert.blowfish_decrypt_many(items, password),
+        encrypted_texts, batch_size
+    )
+
+
+async def envelope_encrypt_many(
+    texts: Iterable[str], password: str,
+    algorithm: str = convert.DEFAULT_ENVELOPE_ALGORITHM,
+    batch_size: int = DEFAULT_BATCH_SIZE
+) -> List[str]:
+    """Async envelope_encrypt_many; one salt and key for the whole batch."""
+    salt = os.urandom(16)
+    return await get_executor().run_batch(
+        lambda items: convert.envelope_encrypt_many(items, password,
+                                                    algorithm, salt),
+        texts, batch_size
+    )
+
+
+async def decrypt_many(encrypted_texts: Iterable[str], password: str,
+                       legacy: str = "auto",
+                       batch_size: int = DEFAULT_BATCH_SIZE) -> List[str]:
+    """Async decrypt_many (envelopes and legacy AES/Blowfish records)."""
+    return await get_executor().run_batch(
+        lambda items: convert.decrypt_many(items, password, legacy),
+        encrypted_texts, batch_size
+    )
+
+
+def _rsa_encrypt(text: str, public_key_pem) -> str:
+    public_key = convert.load_rsa_public_key(public_key_pem)
+    return convert.base64.b64encode(
+        public_key.encrypt(text.encode('utf-8'), convert.rsa_oaep_padding())
+    ).decode('utf-8')
+
+
+def _rsa_decrypt(encrypted_text: str, private_key_pem) -> str:
+    private_key = convert.load_rsa_private_key(private_key_pem)
+    return private_key.decrypt(
+        convert.base64.b64decode(encrypted_text), convert.rsa_oaep_padding()
+    ).decode('utf-8')
+
+
+async def rsa_encrypt(text: str, public_key_pem) -> str:
+    """
+    Async rsa_encrypt with the public key passed as PEM text or bytes.
+
+    Raises:
+        ValueError: If the key cannot be loaded or the text is too long
+    """
+    if not convert.CRYPTO_AVAILABLE:
+        raise RuntimeError("Cryptography package not installed")
+    return await get_executor().run(_rsa_encrypt, text, public_key_pem)
+
+
+async def rsa_decrypt(encrypted_text: str, private_key_pem) -> str:
+    """
+    Async rsa_decrypt with the private key passed as PEM text or bytes.
+
+    Raises:
+        ValueError: If the key cannot be loaded or decryption fails
+    """
+    if not convert.CRYPTO_AVAILABLE:
+        raise RuntimeError("Cryptography package not installed")
+    return await get_executor().run(_rsa_decrypt, encrypted_text,
+                                    private_key_pem)
+
+
+async def rsa_generate_keys(key_size: int = 2048) -> Tuple[str, str]:
+    """Async rsa_generate_keys: (private_pem, public_pem)."""
+    return await get_executor().run(convert.rsa_generate_keys, key_size)
+
+
+# SAML and SNAPI links
+
+async def create_advanced_saml_url(url: str, email: str, pattern: str,
+                                   encryption_key: str,
+                                   compact: bool = False) -> str:
+    """Async SamlUrlSigner.sign (legacy or compact format)."""
+    if not convert.CRYPTO_AVAILABLE:
+        return "[Error: Cryptography package required for advanced SAML URLs]"
+    return await get_executor().run(
+        lambda: convert.SamlUrlSigner(encryption_key).sign(url, email,
+                                                           pattern, compact)
+    )
+
+
+async def verify_advanced_saml_url(saml_url: str,
+                                   encryption_key: str) -> Tuple[bool, str]:
+    """Async verify_advanced_saml_url."""
+    return await get_executor().run(convert.verify_advanced_saml_url,
+                                    saml_url, encryption_key)
+
+
+async def verify_advanced_saml_urls(
+    saml_urls: Iterable[str], encryption_key: str,
+    batch_size: int = DEFAULT_BATCH_SIZE
+) -> List[Tuple[bool, str]]:
+    """Async verify_advanced_saml_urls: (is_valid, code) per URL."""
+    return await get_executor().run_batch(
+        lambda urls: list(convert.verify_advanced_saml_urls(urls,
+                                                            encryption_key)),
+        saml_urls, batch_size
+    )
+
+
+async def generate_snapi_link(url: str, key: str,
+                              expiration_hours: int = 24,
+                              compact: bool = False) -> str:
+    """Async generate_snapi_link (legacy or compact format)."""
+    return await get_executor().run(convert.generate_snapi_link, url, key,
+                                    expiration_hours, compact)
+
+
+async def verify_snapi_link(url: str, key: str) -> Tuple[bool, str]:
+    """Async verify_snapi_link."""
+    return await get_executor().run(convert.verify_snapi_link, url, key)
+
+
+async def verify_snapi_links(urls: Iterable[str], key: str,
+                             batch_size: int = DEFAULT_BATCH_SIZE
+                             ) -> List[Tuple[bool, str]]:
+    """Async verify_snapi_links."""
+    verifier = convert.SnapiVerifier(key)
+    return await get_executor().run_batch(verifier.verify_many, urls,
+                                          batch_size)
+
+
+# Load test
+
+def _percentile(ordered: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list, in milliseconds."""
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1,
+                      int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[rank] * 1000
+
+
+async def _heartbeat(stop: asyncio.Event, interval: float,
+                     lags: List[float]) -> None:
+    """Record how late the loop wakes a sleeper that asked for interval."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, time.perf_counter() - start - interval))
+
+
+async def _load(tasks: int, password: str, blocking: bool,
+                interval: float) -> Tuple[float, List[float]]:
+    """Run tasks concurrent aes_encrypt calls while measuring loop lag."""
+    lags: List[float] = []
+    stop = asyncio.Event()
+    heartbeat = asyncio.create_task(_heartbeat(stop, interval, lags))
+    await asyncio.sleep(interval * 2)
+
+    async def blocking_call(i: int) -> str:
+        await asyncio.sleep(0)
+        return convert.aes_encrypt_many([f"record {i}"], password)[0]
+
+    start = time.perf_counter()
+    if blocking:
+        await asyncio.gather(*(blocking_call(i) for i in range(tasks)))
+    else:
+        await asyncio.gather(*(aes_encrypt(f"record {i}", password)
+                               for i in range(tasks)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await heartbeat
+    return elapsed, sorted(lags)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Event-loop latency load test for the async convert API"
+    )
+    parser.add_argument(
+        "--tasks", type=int, default=64,
+        help="Concurrent aes_encrypt calls (default: 64)",
+    )
+    parser.add_argument(
+        "-w", "--workers", type=int, default=0,
+        help="Executor threads (default: 0 = all cores)",
+    )
+    parser.add_argument(
+        "--interval", type=float, default=5.0,
+        help="Heartbeat interval in ms (default: 5)",
+    )
+    parser.add_argument(
+        "--no-baseline", action="store_true",
+        help="Skip the run that calls aes_encrypt directly on the loop",
+    )
+    args = parser.parse_args()
+
+    if not convert.CRYPTO_AVAILABLE:
+        print("Error: Cryptography package not installed.", file=sys.stderr)
+        return 1
+
+    configure(args.workers or None)
+    password = convert.generate_secure_password(20)
+    interval = args.interval / 1000
+    runs = [("executor", False)]
+    if not args.no_baseline:
+        runs.append(("blocking", True))
+
+    print(f"{args.tasks} concurrent aes_encrypt calls, "
+          f"{get_executor().max_workers} threads, "
+          f"{args.interval:g} ms heartbeat")
+    print(f"{'mode':<10} {'calls/s':>9} {'lag p50':>9} {'lag p99':>9} "
+          f"{'lag max':>9} {'beats':>6}")
+    for name, blocking in runs:
+        elapsed, lags = asyncio.run(_load(args.tasks, password, blocking,
+                                          interval))
+        print(f"{name:<10} {args.tasks / elapsed:>9.1f} "
+              f"{_percentile(lags, 50):>7.2f}ms {_percentile(lags, 99):>7.2f}ms "
+              f"{(lags[-1] * 1000 if lags else 0):>7.2f}ms {len(lags):>6}")
+    shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Thin Client for the Conversion Daemon
+
+Sends newline-delimited input to a running convertd.py and writes the
+results, one line per input line, without importing convert.py or any
+crypto library. Lines are sent in batches with several batches in flight,
+so the daemon's thread pool stays busy while results stream back.
+
+The command and its options are exactly those of the batch CLI
+(`python3 convert.py COMMAND -h`). Secrets are read on the client side
+(--password-env or a prompt) and sent over the socket, never on argv.
+
+Protocol: every message is a 4-byte big-endian length followed by a UTF-8
+JSON object.
+
+    request:  {"argv": [...], "items": [...], "secret": "..."}
+              {"stats": true}
+              {"commands": true}
+    response: {"results": [...]} | {"error": "..."} | {"stats": {...}}
+              | {"secret_commands": [...]}
+
+The client asks the daemon which subcommands take a secret, so that list
+always matches the daemon's parser.
+
+Usage:
+    python3 convert_client.py base64-encode < names.txt
+    SNAPI_KEY=secret python3 convert_client.py --password-env SNAPI_KEY snapi-verify < links.txt
+    python3 convert_client.py --stats
+"""
+
+import argparse
+import getpass
+import json
+import os
+import socket
+import struct
+import sys
+import time
+from collections import deque
+from typing import Iterator, List, Optional, TextIO
+
+FRAME_HEADER = struct.Struct(">I")
+MAX_FRAME_SIZE = 64 * 1024 * 1024
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_WINDOW = 4
+
+
+def default_socket_path() -> str:
+    """$CONVERT_SOCKET, or a per-user socket in the temp directory."""
+    return os.environ.get(
+        "CONVERT_SOCKET", f"/tmp/convertd-{os.getuid()}.sock"
+    )
+
+
+def encode_frame(message: dict) -> bytes:
+    """Serialize a message as a length-prefixed JSON frame."""
+    payload = json.dumps(message, ensure_ascii=False).encode("utf-8")
+    if len(payload) > MAX_FRAME_SIZE:
+        raise ValueError("Frame too large; use a smaller batch size")
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+
+def decode_payload(payload: bytes) -> dict:
+    """Parse a frame payload into a message object."""
+    message = json.loads(payload.decode("utf-8"))
+    if not isinstance(message, dict):
+        raise ValueError("Frame is not a JSON object")
+    return message
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = sock.recv(size - len(buf))
+        if not chunk:
+            raise ConnectionError("Daemon closed the connection")
+        buf += chunk
+    return bytes(buf)
+
+
+def recv_frame(sock: socket.socket) -> dict:
+    """Read one length-prefixed JSON frame from a blocking socket."""
+    (size,) = FRAME_HEADER.unpack(_recv_exactly(sock, FRAME_HEADER.size))
+    if size > MAX_FRAME_SIZE:
+        raise ValueError(f"Frame of {size} bytes exceeds the limit")
+    return decode_payload(_recv_exactly(sock, size))
+
+
+def connect(path: Optional[str] = None) -> socket.socket:
+    """Connect to the daemon socket."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.connect(path or default_socket_path())
+    return sock
+
+
+def secret_commands(sock: socket.socket) -> List[str]:
+    """Ask the daemon which subcommands need a password or key."""
+    sock.sendall(encode_frame({"commands": True}))
+    return recv_frame(sock).get("secret_commands", [])
+
+
+def _batches(src: TextIO, size: int) -> Iterator[List[str]]:
+    batch = []
+    for line in src:
+        batch.append(line.rstrip("\r\n"))
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def convert_stream(
+    sock: socket.socket, argv: List[str], src: TextIO, dst: TextIO,
+    secret: Optional[str] = None, batch_size: int = DEFAULT_BATCH_SIZE,
+    window: int = DEFAULT_WINDOW
+) -> int:
+    """
+    Convert every line of src through the daemon and write results to dst.
+
+    Up to window batches are in flight at once; results are written in
+    input order as each response arrives.
+
+    Returns:
+        int: Number of lines converted
+
+    Raises:
+        RuntimeError: If the daemon rejects a request
+    """
+    in_flight = deque()
+    count = 0
+    batches = _batches(src, batch_size)
+    exhausted = False
+    while True:
+        while not exhausted and len(in_flight) < window:
+            batch = next(batches, None)
+            if batch is None:
+                exhausted = True
+                break
+            request = {"argv": argv, "items": batch}
+            if secret is not None:
+                request["secret"] = secret
+            sock.sendall(encode_frame(request))
+            in_flight.append(len(batch))
+        if not in_flight:
+            return count
+        response = recv_frame(sock)
+        if "error" in response:
+            raise RuntimeError(response["error"])
+        dst.write("\n".join(response["results"]) + "\n")
+        count += in_flight.popleft()
+
+
+def print_stats(stats: dict) -> None:
+    """Print the daemon's per-operation latency percentiles."""
+    print(f"Daemon up {stats['uptime']:.0f}s, "
+          f"{stats['requests']} requests, {stats['items']} items")
+    print(f"{'operation':<18} {'requests':>8} {'items':>9} "
+          f"{'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for op, row in sorted(stats["operations"].items()):
+        print(f"{op:<18} {row['requests']:>8} {row['items']:>9} "
+              f"{row['p50']:>8.2f} {row['p90']:>8.2f} "
+              f"{row['p99']:>8.2f} {row['max']:>8.2f}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Send conversions to a running convertd.py daemon",
+        usage="%(prog)s [options] COMMAND [command options]",
+    )
+    parser.add_argument(
+        "--socket", help="Daemon socket (default: $CONVERT_SOCKET or "
+                         f"{default_socket_path()})",
+    )
+    parser.add_argument("-i", "--input", help="Input file (default: stdin)")
+    parser.add_argument("-o", "--output", help="Output file (default: stdout)")
+    parser.add_argument(
+        "--password-env", metavar="VAR",
+        help="Read the password/key from this environment variable "
+             "(default: prompt when the command needs one)",
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+        help=f"Lines per request (default: {DEFAULT_BATCH_SIZE})",
+    )
+    parser.add_argument(
+        "--window", type=int, default=DEFAULT_WINDOW,
+        help=f"Requests in flight (default: {DEFAULT_WINDOW})",
+    )
+    parser.add_argument(
+        "--stats", action="store_true",
+        help="Print the daemon's latency percentiles and exit",
+    )
+    parser.add_argument(
+        "-q", "--quiet", action="store_true", help="Do not report throughput"
+    )
+    parser.add_argument(
+        "command", nargs=argparse.REMAINDER,
+        help="Batch CLI subcommand and its options",
+    )
+    args = parser.parse_args()
+
+    try:
+        sock = connect(args.socket)
+    except OSError as e:
+        print(f"Error: cannot reach daemon: {e}", file=sys.stderr)
+        return 1
+
+    with sock:
+        if args.stats:
+            sock.sendall(encode_frame({"stats": True}))
+            print_stats(recv_frame(sock)["stats"])
+            return 0
+
+        if not args.command:
+            parser.error("a COMMAND is required")
+        secret = None
+        if args.command[0] in secret_commands(sock):
+            secret = (os.environ.get(args.password_env, "")
+                      if args.password_env else getpass.getpass())
+            if not secret:
+                print("Error: Empty password or key", file=sys.stderr)
+                return 1
+
+        src = open(args.input, encoding="utf-8") if args.input else sys.stdin
+        dst = (open(args.output, "w", encoding="utf-8",
+                    buffering=1024 * 1024) if args.output else sys.stdout)
+        start = time.perf_counter()
+        try:
+            count = convert_stream(
+                sock, args.command, src, dst, secret,
+                max(1, args.batch_size), max(1, args.window)
+            )
+        except (RuntimeError, ValueError, ConnectionError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+        finally:
+            if args.input:
+                src.close()
+            if args.output:
+                dst.close()
+        elapsed = time.perf_counter() - start
+
+    if not args.quiet:
+        rate = count / elapsed if elapsed > 0 else 0.0
+        print(f"Converted {count} items in {elapsed:.2f}s ({rate:.0f} items/s)",
+              file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Warm Conversion Daemon
+
+Serves the convert.py batch subcommands over a Unix domain socket so that
+interpreter startup, crypto imports and PBKDF2 derivations are paid once
+instead of on every invocation. Use convert_client.py to talk to it.
+
+- Requests name a batch CLI subcommand with its options (argv) plus a list
+  of items. The converter built for each (argv, secret) pair is kept in a
+  small LRU, so its salt, derived key, loaded RSA key or SNAPI verifier is
+  reused by later requests.
+- Clients are served concurrently by asyncio. Each connection may pipeline
+  several requests; conversions run on a thread pool and responses go back
+  in request order.
+- Per-operation latency (p50/p90/p99/max) is available through a stats
+  request and is printed when the daemon stops.
+
+The frame format is defined in convert_client.py.
+
+Usage:
+    python3 convertd.py                        # socket: $CONVERT_SOCKET or /tmp/convertd-<uid>.sock
+    python3 convertd.py --socket /run/convert.sock --threads 8
+"""
+
+import argparse
+import asyncio
+import errno
+import hashlib
+import os
+import signal
+import socket
+import stat
+import sys
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Deque, Dict, List, Optional, Tuple
+
+import convert
+from convert_client import (
+    FRAME_HEADER, MAX_FRAME_SIZE, decode_payload, default_socket_path,
+    encode_frame
+)
+
+CONVERTER_CACHE_SIZE = 64
+MAX_PIPELINED = 32  # requests read ahead per connection
+LATENCY_WINDOW = 10000  # samples kept per operation
+
+
+class LatencyStats:
+    """Rolling per-operation latency samples with percentile reporting."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.started = time.time()
+        self._window = window
+        self._samples: Dict[str, Deque[float]] = defaultdict(
+            lambda: deque(maxlen=self._window)
+        )
+        self._requests: Dict[str, int] = defaultdict(int)
+        self._items: Dict[str, int] = defaultdict(int)
+
+    def record(self, op: str, seconds: float, items: int) -> None:
+        self._samples[op].append(seconds)
+        self._requests[op] += 1
+        self._items[op] += items
+
+    @staticmethod
+    def _percentile(ordered: List[float], pct: float) -> float:
+        """Nearest-rank percentile of an ascending list, in milliseconds."""
+        rank = max(0, min(len(ordered) - 1,
+                          int(round(pct / 100 * len(ordered))) - 1))
+        return ordered[rank] * 1000
+
+    def snapshot(self) -> dict:
+        operations = {}
+        for op, samples in self._samples.items():
+            ordered = sorted(samples)
+            operations[op] = {
+                "requests": self._requests[op],
+                "items": self._items[op],
+                "p50": self._percentile(ordered, 50),
+                "p90": self._percentile(ordered, 90),
+                "p99": self._percentile(ordered, 99),
+                "max": ordered[-1] * 1000,
+            }
+        return {
+            "uptime": time.time() - self.started,
+            "requests": sum(self._requests.values()),
+            "items": sum(self._items.values()),
+            "operations": operations,
+        }
+
+
+def remove_stale_socket(path: str) -> None:
+    """
+    Remove a socket left behind by a daemon that is no longer running.
+
+    Raises:
+        RuntimeError: If a daemon still accepts connections on path, or
+                      path exists and is not a socket
+    """
+    try:
+        mode = os.stat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise RuntimeError(f"{path} exists and is not a socket")
+
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.settimeout(1.0)
+        probe.connect(path)
+    except OSError as e:
+        if e.errno not in (errno.ECONNREFUSED, errno.ENOENT):
+            raise RuntimeError(f"Cannot check {path}: {e}") from None
+    else:
+        raise RuntimeError(f"convertd already running on {path}")
+    finally:
+        probe.close()
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class ConversionDaemon:
+    """
+    asyncio server running batch conversions on a thread pool.
+
+    Args:
+        socket_path (str): Unix socket to listen on
+        threads (int, optional): Conversion threads (default: all cores)
+    """
+
+    def __init__(self, socket_path: str, threads: Optional[int] = None):
+        self.socket_path = socket_path
+        self.stats = LatencyStats()
+        self._pool = ThreadPoolExecutor(
+            max_workers=threads or os.cpu_count() or 1,
+            thread_name_prefix="convertd",
+        )
+        self._parser = convert.build_cli_parser()
+        self._secret_commands = convert.secret_commands(self._parser)
+        self._converters: "OrderedDict[Tuple, convert.BatchFunc]" = OrderedDict()
+        self._converters_lock = threading.Lock()
+
+    def _converter(self, argv: List[str],
+                   secret: Optional[str]) -> "convert.BatchFunc":
+        """Build, or reuse, the batch converter for a subcommand and secret."""
+        digest = hashlib.sha256(secret.encode()).digest() if secret else None
+        key = (tuple(argv), digest)
+        with self._converters_lock:
+            converter = self._converters.get(key)
+            if converter is not None:
+                self._converters.move_to_end(key)
+                return converter
+
+        try:
+            args = self._parser.parse_args(argv)
+        except SystemExit:
+            raise ValueError(f"Invalid command: {' '.join(argv)}")
+        args.password = secret or ""
+        converter = args.build(args)
+        with self._converters_lock:
+            self._converters[key] = converter
+            if len(self._converters) > CONVERTER_CACHE_SIZE:
+                self._converters.popitem(last=False)
+        return converter
+
+    def _run(self, argv: List[str], secret: Optional[str],
+             items: List[str]) -> List[str]:
+        """Thread pool entry point for one request."""
+        return convert.apply_batch(self._converter(argv, secret), items)
+
+    async def _handle(self, request: dict) -> dict:
+        if request.get("stats"):
+            return {"stats": self.stats.snapshot()}
+        if request.get("commands"):
+            return {"secret_commands": self._secret_commands}
+
+        argv = request.get("argv")
+        items = request.get("items")
+        if (not isinstance(argv, list) or not argv
+                or not isinstance(items, list)):
+            return {"error": "Request needs 'argv' and 'items' lists"}
+
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(
+                self._pool, self._run, [str(a) for a in argv],
+                request.get("secret"), [str(i) for i in items]
+            )
+        except Exception as e:
+            return {"error": str(e)}
+        self.stats.record(str(argv[0]), time.perf_counter() - start,
+                          len(items))
+        return {"results": results}
+
+    async def _serve_client(self, reader: asyncio.StreamReader,
+                            writer: asyncio.StreamWriter) -> None:
+        """Read pipelined requests and answer them in order."""
+        responses: asyncio.Queue = asyncio.Queue(MAX_PIPELINED)
+        loop = asyncio.get_running_loop()
+
+        async def send_responses() -> None:
+            while True:
+                task = await responses.get()
+                if task is None:
+                    return
+                writer.write(encode_frame(await task))
+                await writer.drain()
+
+        sender = asyncio.create_task(send_responses())
+        try:
+            while not sender.done():
+                header = await reader.readexactly(FRAME_HEADER.size)
+                (size,) = FRAME_HEADER.unpack(header)
+                if size > MAX_FRAME_SIZE:
+                    break
+                try:
+                    request = decode_payload(await reader.readexactly(size))
+                except ValueError as e:
+                    request_task = loop.create_future()
+                    request_task.set_result({"error": f"Bad request: {e}"})
+                else:
+                    request_task = asyncio.create_task(self._handle(request))
+                await responses.put(request_task)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            await responses.put(None)
+            try:
+                await sender
+            except ConnectionError:
+                pass
+            writer.close()
+
+    async def serve(self) -> None:
+        """Listen until SIGINT/SIGTERM, then print latency percentiles."""
+        remove_stale_socket(self.socket_path)
+        old_umask = os.umask(0o177)  # socket readable by this user only
+        try:
+            server = await asyncio.start_unix_server(
+                self._serve_client, path=self.socket_path
+            )
+        finally:
+            os.umask(old_umask)
+
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+
+        print(f"convertd listening on {self.socket_path}", file=sys.stderr)
+        async with server:
+            await stop.wait()
+        os.remove(self.socket_path)
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        convert.wipe_key_cache()
+        self.print_stats()
+
+    def print_stats(self) -> None:
+        snapshot = self.stats.snapshot()
+        print(f"\nServed {snapshot['requests']} requests "
+              f"({snapshot['items']} items) in {snapshot['uptime']:.0f}s",
+              file=sys.stderr)
+        for op, row in sorted(snapshot["operations"].items()):
+            print(f"  {op:<18} p50 {row['p50']:.2f} ms  p90 {row['p90']:.2f} ms"
+                  f"  p99 {row['p99']:.2f} ms  max {row['max']:.2f} ms",
+                  file=sys.stderr)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Serve convert.py batch conversions over a Unix socket"
+    )
+    parser.add_argument(
+        "--socket", default=default_socket_path(),
+        help="Socket path (default: $CONVERT_SOCKET or %(default)s)",
+    )
+    parser.add_argument(
+        "--threads", type=int,
+        help="Conversion threads (default: all cores)",
+    )
+    args = parser.parse_args()
+
+    convert.load_backend("crypto")
+    try:
+        asyncio.run(ConversionDaemon(args.socket, args.threads).serve())
+    except RuntimeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
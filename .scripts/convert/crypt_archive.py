@@ -0,0 +1,511 @@
+#!/usr/bin/env python3
+"""
+Seekable Encrypted Archive
+
+Packs a directory into one encrypted file that supports random access. The
+contents of all member files are concatenated into a single data stream.
+That stream is cut into fixed-size chunks, and each chunk is sealed on its
+own. An encrypted index at the end of the file records each member's offset
+and size in the stream. To extract one member, or a byte range of one, only
+the index and the chunks that range touches are read and decrypted, however
+large the archive is.
+
+Archive layout:
+    header:  magic (4) | version (1) | algorithm (1) | chunk size (4) |
+             iterations (4) | salt (16) | nonce prefix (7)
+    chunks:  ciphertext + tag, chunk size + 16 bytes each (last may be short)
+    index:   ciphertext + tag of the zlib-compressed JSON member list
+    trailer: index offset (8) | index length (4) | magic (4)
+
+Chunk n is sealed with nonce prefix | n | 0 and the index with
+prefix | 0 | 1. The header is associated data for both. The index stores the
+data length, so truncated, reordered or swapped chunks fail authentication
+when they are read. Algorithm ids and the key derivation are the same as in
+stream_crypt.py.
+
+Usage:
+    python3 crypt_archive.py create -o backup.cva /srv/data
+    python3 crypt_archive.py list backup.cva
+    python3 crypt_archive.py extract -C restore/ backup.cva etc/app.conf
+    python3 crypt_archive.py cat backup.cva logs/app.log --offset 1048576 --length 4096
+"""
+
+import argparse
+import getpass
+import json
+import os
+import struct
+import sys
+import time
+import zlib
+from typing import BinaryIO, Dict, Iterator, List, NamedTuple, Optional
+
+import convert
+import stream_crypt
+from stream_crypt import StreamError
+
+MAGIC = b"CVTA"
+TRAILER_MAGIC = b"CVTX"
+VERSION = 1
+DEFAULT_CHUNK_SIZE = 64 * 1024  # small chunks keep random reads cheap
+TAG_SIZE = stream_crypt.TAG_SIZE
+
+_HEADER = struct.Struct(">4sBBII16s7s")
+_TRAILER = struct.Struct(">QI4s")
+
+
+class Member(NamedTuple):
+    """One archived file: its place in the data stream and its metadata."""
+    name: str
+    offset: int
+    size: int
+    mode: int
+    mtime: float
+
+
+def _nonce(prefix: bytes, counter: int, index: bool = False) -> bytes:
+    """Nonce for data chunk counter, or for the index."""
+    if counter > 0xFFFFFFFF:
+        raise StreamError("Archive too large: chunk counter exhausted")
+    return prefix + counter.to_bytes(4, "big") + (b"\x01" if index else b"\x00")
+
+
+def _safe_name(name: str) -> str:
+    """Reject member names that would escape the extraction directory."""
+    parts = name.split("/")
+    if (not name or name.startswith("/")
+            or any(p in ("", ".", "..") for p in parts)):
+        raise StreamError(f"Unsafe member name: {name!r}")
+    return name
+
+
+class ArchiveWriter:
+    """
+    Writes an archive sequentially, holding at most one chunk in memory.
+
+    Args:
+        path (str): Archive file to create
+        password (str): Password to derive the key from
+        chunk_size (int): Plaintext bytes per chunk (default 64 KiB)
+        algorithm (str): "aes-256-gcm" (default) or "chacha20-poly1305"
+    """
+
+    def __init__(self, path: str, password: str,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 algorithm: str = stream_crypt.DEFAULT_ALGORITHM):
+        if not stream_crypt.CRYPTO_AVAILABLE:
+            raise RuntimeError("Cryptography package not installed")
+        if not password:
+            raise ValueError("Empty password")
+        if not 0 < chunk_size <= stream_crypt.MAX_CHUNK_SIZE:
+            raise ValueError("Chunk size must be between 1 and "
+                             f"{stream_crypt.MAX_CHUNK_SIZE}")
+        if algorithm not in stream_crypt.ALGORITHMS:
+            raise ValueError(f"Unknown algorithm: {algorithm}")
+
+        salt = os.urandom(stream_crypt.SALT_SIZE)
+        self._prefix = os.urandom(stream_crypt.NONCE_PREFIX_SIZE)
+        self._header = _HEADER.pack(
+            MAGIC, VERSION, stream_crypt.ALGORITHMS[algorithm], chunk_size,
+            stream_crypt.PBKDF2_ITERATIONS, salt, self._prefix
+        )
+        self._aead = stream_crypt.make_aead(
+            stream_crypt.ALGORITHMS[algorithm],
+            convert.derive_key(password, salt, 32,
+                               stream_crypt.PBKDF2_ITERATIONS)
+        )
+        self.chunk_size = chunk_size
+        self.members: List[Member] = []
+        self._names = set()
+        self._buffer = bytearray()
+        self._chunks = 0
+        self._length = 0
+        self.path = path
+        self._dst = open(path, "wb")
+        self._dst.write(self._header)
+
+    def _seal_chunk(self, chunk: bytes) -> None:
+        self._dst.write(self._aead.encrypt(
+            _nonce(self._prefix, self._chunks), chunk, self._header
+        ))
+        self._chunks += 1
+
+    def _write(self, data: bytes) -> None:
+        """Append plaintext to the data stream, sealing every full chunk."""
+        self._buffer += data
+        self._length += len(data)
+        size = self.chunk_size
+        if len(self._buffer) < size:
+            return
+        full = len(self._buffer) - len(self._buffer) % size
+        with memoryview(self._buffer) as view:
+            for start in range(0, full, size):
+                self._seal_chunk(view[start:start + size])
+        del self._buffer[:full]
+
+    def add_stream(self, name: str, src: BinaryIO, mode: int = 0o644,
+                   mtime: Optional[float] = None) -> Member:
+        """Add a member read from a binary file object."""
+        name = _safe_name(name)
+        if name in self._names:
+            raise ValueError(f"Duplicate member name: {name}")
+        offset = self._length
+        while True:
+            data = src.read(self.chunk_size)
+            if not data:
+                break
+            self._write(data)
+        member = Member(name, offset, self._length - offset, mode,
+                        time.time() if mtime is None else mtime)
+        self.members.append(member)
+        self._names.add(name)
+        return member
+
+    def add_file(self, path: str, name: Optional[str] = None) -> Member:
+        """Add a file from disk, keeping its permission bits and mtime."""
+        info = os.stat(path)
+        with open(path, "rb") as src:
+            return self.add_stream(
+                name or os.path.basename(path), src, info.st_mode & 0o7777,
+                info.st_mtime
+            )
+
+    def add_directory(self, directory: str) -> int:
+        """Add every regular file under directory, in sorted order."""
+        added = 0
+        for root, dirs, files in os.walk(directory):
+            dirs.sort()
+            for filename in sorted(files):
+                path = os.path.join(root, filename)
+                if not os.path.isfile(path) or os.path.islink(path):
+                    continue
+                name = os.path.relpath(path, directory).replace(os.sep, "/")
+                self.add_file(path, name)
+                added += 1
+        return added
+
+    def close(self) -> None:
+        """Seal the last chunk, then write the encrypted index and trailer."""
+        if self._dst.closed:
+            return
+        if self._buffer:
+            self._seal_chunk(bytes(self._buffer))
+            self._buffer.clear()
+        index = zlib.compress(json.dumps({
+            "data_length": self._length,
+            "members": [list(m) for m in self.members],
+        }, separators=(",", ":")).encode())
+        sealed = self._aead.encrypt(_nonce(self._prefix, 0, index=True),
+                                    index, self._header)
+        index_offset = self._dst.tell()
+        self._dst.write(sealed)
+        self._dst.write(_TRAILER.pack(index_offset, len(sealed),
+                                      TRAILER_MAGIC))
+        self._dst.close()
+
+    def __enter__(self) -> "ArchiveWriter":
+        return self
+
+    def abort(self) -> None:
+        """Discard the archive: close and remove the partly written file."""
+        if self._dst.closed:
+            return
+        self._dst.close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+    def __exit__(self, exc_type, *exc) -> None:
+        # An exception may have stopped a member half way; finishing the
+        # index would make the truncated member look complete
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
+
+
+class ArchiveReader:
+    """
+    Random-access reader: decrypts the index once, then only the chunks
+    each read touches.
+
+    Args:
+        path (str): Archive file to open
+        password (str): Password used to create the archive
+
+    Raises:
+        StreamError: If the archive is malformed, the password is wrong or
+                     the index was tampered with
+    """
+
+    def __init__(self, path: str, password: str):
+        if not stream_crypt.CRYPTO_AVAILABLE:
+            raise RuntimeError("Cryptography package not installed")
+        if not password:
+            raise ValueError("Empty password")
+        self._fd = os.open(path, os.O_RDONLY)
+        try:
+            self._open_index(password)
+        except BaseException:
+            os.close(self._fd)
+            raise
+
+    def _open_index(self, password: str) -> None:
+        header = os.pread(self._fd, _HEADER.size, 0)
+        if len(header) != _HEADER.size or header[:4] != MAGIC:
+            raise StreamError("Not an encrypted archive (bad magic)")
+        (_, version, algorithm_id, chunk_size, iterations, salt,
+         self._prefix) = _HEADER.unpack(header)
+        if version != VERSION:
+            raise StreamError(f"Unsupported archive version: {version}")
+        if not 0 < chunk_size <= stream_crypt.MAX_CHUNK_SIZE:
+            raise StreamError(f"Invalid chunk size: {chunk_size}")
+        if not 0 < iterations <= convert.MAX_ENVELOPE_ITERATIONS:
+            raise StreamError(f"Invalid iteration count: {iterations}")
+        self._header = header
+        self.chunk_size = chunk_size
+        self._aead = stream_crypt.make_aead(
+            algorithm_id, convert.derive_key(password, salt, 32, iterations)
+        )
+
+        file_size = os.fstat(self._fd).st_size
+        trailer = os.pread(self._fd, _TRAILER.size, file_size - _TRAILER.size)
+        if len(trailer) != _TRAILER.size:
+            raise StreamError("Truncated archive: trailer missing")
+        index_offset, index_length, magic = _TRAILER.unpack(trailer)
+        if (magic != TRAILER_MAGIC
+                or index_offset + index_length + _TRAILER.size != file_size):
+            raise StreamError("Truncated archive: bad trailer")
+        try:
+            index = self._aead.decrypt(
+                _nonce(self._prefix, 0, index=True),
+                os.pread(self._fd, index_length, index_offset), self._header
+            )
+        except Exception:
+            raise StreamError(
+                "Authentication failed for the index "
+                "(wrong password or corrupted archive)"
+            ) from None
+
+        data = json.loads(zlib.decompress(index))
+        self.data_length = data["data_length"]
+        self._chunk_count = -(-self.data_length // chunk_size)
+        expected = (_HEADER.size + self.data_length
+                    + self._chunk_count * TAG_SIZE)
+        if expected != index_offset:
+            raise StreamError("Archive data region has the wrong size")
+        self.members: Dict[str, Member] = {
+            m[0]: Member(*m) for m in data["members"]
+        }
+        self._cached_index = -1
+        self._cached_chunk = b""
+
+    def _chunk(self, index: int) -> bytes:
+        """Read and verify one data chunk (the last one is kept cached)."""
+        if index == self._cached_index:
+            return self._cached_chunk
+        if not 0 <= index < self._chunk_count:
+            raise StreamError(f"Chunk {index} out of range")
+        plain_size = min(self.chunk_size,
+                         self.data_length - index * self.chunk_size)
+        sealed = os.pread(self._fd, plain_size + TAG_SIZE,
+                          _HEADER.size + index * (self.chunk_size + TAG_SIZE))
+        try:
+            chunk = self._aead.decrypt(_nonce(self._prefix, index), sealed,
+                                       self._header)
+        except Exception:
+            raise StreamError(
+                f"Authentication failed at chunk {index} (corrupted archive)"
+            ) from None
+        self._cached_index, self._cached_chunk = index, chunk
+        return chunk
+
+    def _iter_range(self, start: int, length: int) -> Iterator[bytes]:
+        """Yield the plaintext of data stream bytes [start, start + length)."""
+        end = start + length
+        position = start
+        while position < end:
+            index = position // self.chunk_size
+            chunk = self._chunk(index)
+            skip = position - index * self.chunk_size
+            piece = chunk[skip:skip + end - position]
+            yield piece
+            position += len(piece)
+
+    def member(self, name: str) -> Member:
+        """Look up a member by name."""
+        try:
+            return self.members[name]
+        except KeyError:
+            raise KeyError(f"No such member: {name}") from None
+
+    def iter_range(self, name: str, start: int = 0,
+                   length: Optional[int] = None) -> Iterator[bytes]:
+        """
+        Decrypt part of a member, yielding at most one chunk at a time.
+
+        Args:
+            name (str): Member name as listed in members
+            start (int): Offset within the member
+            length (int, optional): Bytes to read (default: to the end)
+
+        Yields:
+            bytes: Consecutive pieces of the plaintext; together shorter
+                   than length at the member's end
+        """
+        member = self.member(name)
+        start = max(0, min(start, member.size))
+        remaining = member.size - start
+        length = remaining if length is None else max(0, min(length,
+                                                             remaining))
+        return self._iter_range(member.offset + start, length)
+
+    def read_range(self, name: str, start: int = 0,
+                   length: Optional[int] = None) -> bytes:
+        """Decrypt part of a member into memory (see iter_range)."""
+        return b"".join(self.iter_range(name, start, length))
+
+    def read(self, name: str) -> bytes:
+        """Decrypt a whole member."""
+        return self.read_range(name)
+
+    def extract(self, name: str, directory: str = ".") -> str:
+        """Write one member under directory, streaming chunk by chunk."""
+        member = self.member(name)
+        path = os.path.join(directory, *_safe_name(name).split("/"))
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "wb") as dst:
+            for piece in self._iter_range(member.offset, member.size):
+                dst.write(piece)
+        os.chmod(path, member.mode)
+        os.utime(path, (member.mtime, member.mtime))
+        return path
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def __enter__(self) -> "ArchiveReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def create_archive(
+    directory: str, archive_path: str, password: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    algorithm: str = stream_crypt.DEFAULT_ALGORITHM
+) -> List[Member]:
+    """
+    Encrypt every regular file under directory into one archive.
+
+    Returns:
+        List[Member]: The archived members, in archive order
+    """
+    with ArchiveWriter(archive_path, password, chunk_size, algorithm) as writer:
+        writer.add_directory(directory)
+    return writer.members
+
+
+def _get_password(args: argparse.Namespace, confirm: bool) -> Optional[str]:
+    """Read the password from the named environment variable or a prompt."""
+    if args.password_env:
+        return os.environ.get(args.password_env)
+    password = getpass.getpass("Enter password: ")
+    if confirm and password != getpass.getpass("Confirm password: "):
+        print("Error: Passwords do not match", file=sys.stderr)
+        return None
+    return password
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Encrypted directory archives with random-access reads"
+    )
+    parser.add_argument(
+        "--password-env", metavar="VAR",
+        help="Read the password from this environment variable",
+    )
+    parser.add_argument(
+        "-q", "--quiet", action="store_true", help="Do not report timings"
+    )
+    sub = parser.add_subparsers(dest="command", metavar="COMMAND")
+    sub.required = True
+
+    cmd = sub.add_parser("create", help="Archive a directory")
+    cmd.add_argument("directory")
+    cmd.add_argument("-o", "--output", required=True, help="Archive file")
+    cmd.add_argument(
+        "--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+        help=f"Plaintext bytes per chunk (default: {DEFAULT_CHUNK_SIZE})",
+    )
+    cmd.add_argument(
+        "--algorithm", choices=sorted(stream_crypt.ALGORITHMS),
+        default=stream_crypt.DEFAULT_ALGORITHM,
+    )
+    cmd = sub.add_parser("list", help="List members")
+    cmd.add_argument("archive")
+    cmd = sub.add_parser("extract", help="Extract members (default: all)")
+    cmd.add_argument("archive")
+    cmd.add_argument("names", nargs="*")
+    cmd.add_argument("-C", "--directory", default=".",
+                     help="Destination directory (default: .)")
+    cmd = sub.add_parser("cat", help="Write a member or a range to stdout")
+    cmd.add_argument("archive")
+    cmd.add_argument("name")
+    cmd.add_argument("--offset", type=int, default=0)
+    cmd.add_argument("--length", type=int)
+    args = parser.parse_args()
+
+    if not stream_crypt.CRYPTO_AVAILABLE:
+        print("Error: Cryptography package not installed.", file=sys.stderr)
+        return 1
+    password = _get_password(args, confirm=args.command == "create")
+    if not password:
+        print("Error: Empty password", file=sys.stderr)
+        return 1
+
+    start = time.perf_counter()
+    try:
+        if args.command == "create":
+            members = create_archive(args.directory, args.output, password,
+                                     args.chunk_size, args.algorithm)
+            summary = (f"Archived {len(members)} files "
+                       f"({sum(m.size for m in members) / 1048576:.2f} MB)")
+        else:
+            with ArchiveReader(args.archive, password) as reader:
+                if args.command == "list":
+                    for m in reader.members.values():
+                        stamp = time.strftime("%Y-%m-%d %H:%M",
+                                              time.localtime(m.mtime))
+                        print(f"{m.mode:04o} {m.size:>12} {stamp} {m.name}")
+                    summary = f"Listed {len(reader.members)} members"
+                elif args.command == "extract":
+                    names = args.names or list(reader.members)
+                    for name in names:
+                        reader.extract(name, args.directory)
+                    summary = f"Extracted {len(names)} members"
+                else:
+                    written = 0
+                    for piece in reader.iter_range(args.name, args.offset,
+                                                   args.length):
+                        sys.stdout.buffer.write(piece)
+                        written += len(piece)
+                    sys.stdout.buffer.flush()
+                    summary = f"Read {written} bytes"
+    except (StreamError, ValueError, KeyError, OSError) as e:
+        message = e.args[0] if isinstance(e, KeyError) else e
+        print(f"Error: {message}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - start
+
+    if not args.quiet:
+        print(f"{summary} in {elapsed * 1000:.1f} ms", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Cold-Start Import Benchmark
+
+Measures how long a fresh interpreter takes to import convert.py and get one
+conversion family ready. Each family is timed in its own subprocess: it
+imports convert and selects every registry entry of that family through
+convert.get_conversion(), which imports the backends those entries need.
+
+Two measurements are reported per family, as a median over several runs:
+
+- import: total module import time from `python -X importtime`
+- wall: wall-clock time of the whole subprocess, interpreter start included
+
+The "eager" row imports every backend up front, as convert.py used to do
+at module import, and is the baseline the lazy registry is compared with.
+
+Usage:
+    python3 import_bench.py
+    python3 import_bench.py -r 10 --top 5
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+import convert
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def family_script(family: str) -> str:
+    """Python source that imports convert and readies one family."""
+    if family == "interpreter":
+        return "pass"
+    if family == "eager":
+        return ("import convert\n"
+                "for b in ('crypto', 'mongodb', 'numpy'):\n"
+                "    convert.load_backend(b)\n")
+    keys = [k for k, c in convert.CONVERSIONS.items() if c.family == family]
+    return ("import convert\n"
+            f"for k in {keys!r}:\n"
+            "    convert.get_conversion(k)\n")
+
+
+def parse_importtime(stderr: str) -> Tuple[int, Dict[str, int]]:
+    """
+    Parse `-X importtime` output.
+
+    Returns:
+        Tuple[int, Dict[str, int]]: Total microseconds spent importing
+        (sum of top-level cumulative times) and cumulative microseconds for
+        each top-level module
+    """
+    total = 0
+    top_level = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue  # header line
+        cumulative = int(parts[1])
+        name = parts[2]
+        # Nested imports are indented by two spaces per level
+        if len(name) - len(name.lstrip()) == 1:
+            total += cumulative
+            top_level[name.strip()] = cumulative
+    return total, top_level
+
+
+def measure(family: str) -> Tuple[float, int, Dict[str, int]]:
+    """Run one cold start; returns (wall seconds, import us, top-level us)."""
+    cmd = [sys.executable, "-X", "importtime", "-c", family_script(family)]
+    start = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=HERE, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"{family}: {proc.stderr.strip().splitlines()[-1]}")
+    total, top_level = parse_importtime(proc.stderr)
+    return wall, total, top_level
+
+
+def run_benchmark(repeat: int, top: int) -> None:
+    """Print median cold-start cost for each conversion family."""
+    families = ["interpreter"]
+    for conversion in convert.CONVERSIONS.values():
+        if conversion.family not in families:
+            families.append(conversion.family)
+    families.append("eager")
+
+    print(f"{'family':<12} {'import ms':>10} {'wall ms':>9}  heaviest imports")
+    for family in families:
+        walls: List[float] = []
+        imports: List[int] = []
+        modules: Dict[str, int] = {}
+        for _ in range(repeat):
+            wall, total, top_level = measure(family)
+            walls.append(wall)
+            imports.append(total)
+            modules = top_level
+        heaviest = sorted(modules.items(), key=lambda kv: -kv[1])[:top]
+        detail = ", ".join(f"{name} {us / 1000:.1f}" for name, us in heaviest)
+        print(f"{family:<12} {statistics.median(imports) / 1000:>10.1f} "
+              f"{statistics.median(walls) * 1000:>9.1f}  {detail}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Measure convert.py cold-start time per conversion family"
+    )
+    parser.add_argument(
+        "-r", "--repeat", type=int, default=5,
+        help="Cold starts per family; the median is reported (default: 5)",
+    )
+    parser.add_argument(
+        "--top", type=int, default=3,
+        help="Heaviest top-level imports to list per family (default: 3)",
+    )
+    args = parser.parse_args()
+
+    run_benchmark(max(1, args.repeat), max(0, args.top))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
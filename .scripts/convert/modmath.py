@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Modular Arithmetic Kernel
+
+Fast integer primitives behind the SNAPI link functions in convert.py:
+
+- pow_mod / mod_inverse: scalar paths on CPython's built-in three-argument
+  pow(), which runs in C and handles negative exponents via the inverse.
+- pow_mod_batch: vectorized square-and-multiply over NumPy arrays for moduli
+  below 2**31, where every intermediate product fits in 64 bits. Falls back
+  to a pow() loop when NumPy is not installed. NumPy is imported on the first
+  batch call, so importing this module stays cheap.
+- pascal_row / binomial: binomial coefficients read from cached Pascal rows.
+
+Run with --bench to compare against the original pure-Python loops.
+
+Usage:
+    python3 modmath.py --bench
+"""
+
+import argparse
+import importlib
+import importlib.util
+import math
+import random
+import sys
+import threading
+import time
+from typing import List, Optional, Sequence, Tuple, Union
+
+# Optional NumPy for the vectorized batch path, imported on first use by
+# load_numpy() since it dominates import time
+NUMPY_AVAILABLE = importlib.util.find_spec("numpy") is not None
+np = None
+
+BATCH_MODULUS_LIMIT = 2**31
+PASCAL_TABLE_SIZE = 256
+
+
+def load_numpy():
+    """Import NumPy on first use; returns None when it is not installed."""
+    global np, NUMPY_AVAILABLE
+    if np is None and NUMPY_AVAILABLE:
+        try:
+            np = importlib.import_module("numpy")
+        except ImportError:
+            NUMPY_AVAILABLE = False
+    return np
+
+
+def pow_mod(base: int, exponent: int, modulus: int) -> int:
+    """
+    Compute base^exponent mod modulus.
+
+    Args:
+        base (int): Base value
+        exponent (int): Exponent value (negative uses the modular inverse)
+        modulus (int): Modulus value
+
+    Returns:
+        int: Result of (base^exponent mod modulus)
+
+    Raises:
+        ValueError: If exponent is negative and base has no inverse
+    """
+    try:
+        return pow(base, exponent, modulus)
+    except ValueError:
+        raise ValueError("Modular inverse does not exist") from None
+
+
+def mod_inverse(a: int, m: int) -> Optional[int]:
+    """
+    Compute the modular multiplicative inverse of a modulo m.
+
+    Args:
+        a (int): The number to find the modular inverse for
+        m (int): The modulus
+
+    Returns:
+        Optional[int]: The modular inverse if it exists, None otherwise
+    """
+    try:
+        return pow(a, -1, m)
+    except ValueError:
+        return None
+
+
+def pow_mod_batch(
+    bases: Union[Sequence[int], "np.ndarray"],
+    exponents: Union[int, Sequence[int], "np.ndarray"],
+    modulus: int
+) -> Union[List[int], "np.ndarray"]:
+    """
+    Compute bases[i]^exponents[i] mod modulus for whole arrays at once.
+
+    Args:
+        bases: Base values (any size; reduced mod modulus first)
+        exponents: Non-negative exponents, or one exponent for all bases
+        modulus: Modulus below 2**31
+
+    Returns:
+        np.ndarray of uint64 results, or a list of ints without NumPy
+    """
+    if not 1 < modulus < BATCH_MODULUS_LIMIT:
+        raise ValueError("Batch modulus must be between 2 and 2**31 - 1")
+
+    if load_numpy() is None:
+        if isinstance(exponents, int):
+            exponents = [exponents] * len(bases)
+        if any(e < 0 for e in exponents):
+            raise ValueError("Batch exponents must be non-negative")
+        return [pow(int(b), int(e), modulus) for b, e in zip(bases, exponents)]
+
+    if isinstance(bases, np.ndarray) and bases.dtype.kind in "iu":
+        b = bases.astype(np.uint64) % np.uint64(modulus)
+    else:
+        # Python ints may exceed 64 bits, so reduce them before conversion
+        b = np.fromiter((int(x) % modulus for x in bases), dtype=np.uint64)
+
+    e = np.asarray(exponents)
+    if (e < 0).any():
+        raise ValueError("Batch exponents must be non-negative")
+    e = np.broadcast_to(e.astype(np.uint64), b.shape).copy()
+
+    m = np.uint64(modulus)
+    one = np.uint64(1)
+    result = np.ones_like(b)
+    # Square-and-multiply across every element; operands stay below 2**31
+    # so each product is below 2**62
+    while e.any():
+        odd = (e & one).astype(bool)
+        result = np.where(odd, result * b % m, result)
+        b = b * b % m
+        e >>= one
+    return result
+
+
+# Pascal's triangle rows 0..len-1, extended on demand up to PASCAL_TABLE_SIZE
+_pascal_rows: List[Tuple[int, ...]] = [(1,)]
+_pascal_lock = threading.Lock()
+
+
+def pascal_row(n: int) -> Tuple[int, ...]:
+    """
+    Return row n of Pascal's triangle.
+
+    Rows below PASCAL_TABLE_SIZE are built once, each from the previous row,
+    and kept for later calls; larger rows are computed without caching.
+    """
+    if n < 0:
+        raise ValueError("Row index must be non-negative")
+    if n >= PASCAL_TABLE_SIZE:
+        return tuple(math.comb(n, k) for k in range(n + 1))
+    if n >= len(_pascal_rows):
+        with _pascal_lock:
+            while len(_pascal_rows) <= n:
+                prev = _pascal_rows[-1]
+                _pascal_rows.append(
+                    (1,) + tuple(a + b for a, b in zip(prev, prev[1:])) + (1,)
+                )
+    return _pascal_rows[n]
+
+
+def binomial(n: int, k: int) -> int:
+    """
+    Calculate the binomial coefficient (n choose k).
+
+    Small n is read from the Pascal row table; large n uses math.comb.
+
+    Args:
+        n (int): Total number of items
+        k (int): Number of items to choose
+
+    Returns:
+        int: The binomial coefficient, 0 when k is out of range
+    """
+    if k < 0 or n < 0 or k > n:
+        return 0
+    if n < PASCAL_TABLE_SIZE:
+        return pascal_row(n)[k]
+    return math.comb(n, k)
+
+
+# ============================================================================
+# Benchmarks against the original pure-Python implementations
+# ============================================================================
+
+def _legacy_pow_mod(base: int, exponent: int, modulus: int) -> int:
+    """Square-and-multiply loop as originally written in convert.py."""
+    result = 1
+    base = base % modulus
+    while exponent > 0:
+        if exponent % 2 == 1:
+            result = (result * base) % modulus
+        base = (base * base) % modulus
+        exponent = exponent >> 1
+    return result
+
+
+def _legacy_mod_inverse(a: int, m: int) -> Optional[int]:
+    """Recursive extended Euclid as originally written in convert.py."""
+    def extended_gcd(a, b):
+        if a == 0:
+            return b, 0, 1
+        gcd, x, y = extended_gcd(b % a, a)
+        return gcd, y - (b // a) * x, x
+
+    gcd, x, _ = extended_gcd(a, m)
+    return None if gcd != 1 else x % m
+
+
+def _legacy_binomial(n: int, k: int) -> int:
+    """Multiplicative formula as originally written in convert.py."""
+    k = min(k, n - k)
+    if k < 0:
+        return 0
+    if k == 0:
+        return 1
+    result = 1
+    for i in range(1, k + 1):
+        result = result * (n - (i - 1)) // i
+    return result
+
+
+def _time(func, repeat: int = 3) -> float:
+    """Best wall-clock time of repeat runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmark(count: int) -> None:
+    """Print ops/s for the legacy and kernel implementations."""
+    modulus = 2**31 - 1
+    rng = random.Random(1)
+    bases = [rng.getrandbits(256) for _ in range(count)]
+    exponents = [rng.choice((257, 65537)) for _ in range(count)]
+    pairs = list(zip(bases, exponents))
+    # Mersenne primes, so every a is invertible
+    mid_m, big_m = 2**521 - 1, 2**2203 - 1
+    mid_a = [rng.getrandbits(512) | 1 for _ in range(max(1, count // 10))]
+    big_a = [rng.getrandbits(2048) | 1 for _ in range(max(1, count // 100))]
+    choose = [(10, rng.randrange(11)) for _ in range(count)]
+
+    cases = [
+        ("pow_mod", "legacy loop", count,
+         lambda: [_legacy_pow_mod(b, e, modulus) for b, e in pairs]),
+        ("pow_mod", "builtin pow", count,
+         lambda: [pow_mod(b, e, modulus) for b, e in pairs]),
+    ]
+    if load_numpy() is not None:
+        reduced = np.array([b % modulus for b in bases], dtype=np.uint64)
+        exp_array = np.array(exponents, dtype=np.uint64)
+        cases.append(("pow_mod", "numpy batch", count,
+                      lambda: pow_mod_batch(reduced, exp_array, modulus)))
+    cases += [
+        ("inverse/521", "legacy recursive", len(mid_a),
+         lambda: [_legacy_mod_inverse(a, mid_m) for a in mid_a]),
+        ("inverse/521", "builtin pow", len(mid_a),
+         lambda: [mod_inverse(a, mid_m) for a in mid_a]),
+        ("inverse/2203", "legacy recursive", len(big_a),
+         lambda: [_legacy_mod_inverse(a, big_m) for a in big_a]),
+        ("inverse/2203", "builtin pow", len(big_a),
+         lambda: [mod_inverse(a, big_m) for a in big_a]),
+        ("binomial", "legacy formula", count,
+         lambda: [_legacy_binomial(n, k) for n, k in choose]),
+        ("binomial", "pascal table", count,
+         lambda: [binomial(n, k) for n, k in choose]),
+    ]
+
+    if np is None:
+        print("Note: numpy not installed, skipping the vectorized batch path")
+    print(f"{'function':<12} {'implementation':<18} {'ops':>8} "
+          f"{'seconds':>9} {'ops/s':>12}")
+    for name, impl, ops, func in cases:
+        try:
+            elapsed = _time(func)
+        except RecursionError:
+            print(f"{name:<12} {impl:<18} {ops:>8} "
+                  f"{'failed: recursion limit exceeded':>22}")
+            continue
+        rate = ops / elapsed if elapsed > 0 else 0.0
+        print(f"{name:<12} {impl:<18} {ops:>8} {elapsed:>9.4f} {rate:>12.0f}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Modular arithmetic kernel for the SNAPI link functions"
+    )
+    parser.add_argument(
+        "--bench", action="store_true",
+        help="Benchmark the kernel against the original implementations",
+    )
+    parser.add_argument(
+        "-n", "--count", type=int, default=100000,
+        help="Operations per benchmark case (default: 100000)",
+    )
+    args = parser.parse_args()
+
+    if not args.bench:
+        parser.print_help()
+        return 0
+    run_benchmark(max(1, args.count))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Regex Complexity Analyzer
+
+Benchmarks a pattern from convert.escape_regex (or any pattern) against
+adversarial inputs of increasing size and reports worst-case match time.
+The inputs are derived from the text the pattern was generated for:
+
+- near-miss-repeat: the text without its last character, repeated, then a
+  character that cannot match (drives lazy-gap backtracking)
+- near-miss-spread: the text's characters spread out with filler, ending
+  in a character that cannot match
+- noise-prefix: filler followed by the text (drives unanchored scans)
+- near-miss-lines: the near-miss-repeat input followed by blank lines
+  (subjects spanning several lines, which "." cannot cross)
+
+Each family runs in its own worker process with increasing sizes. A size that
+exceeds the timeout kills the worker, and the larger sizes of that family
+are skipped. From the timings the analyzer estimates the growth exponent
+(time ~ size^k).
+
+With --fuzz N the analyzer instead checks that the linear pattern accepts
+the same subjects as the original one: N random texts, each against ten
+subjects (mostly the text with random insertions, which the original
+accepts), over an alphabet of letters, digits, special characters, spaces
+and newlines. Mismatches are printed, and the exit status is 1 if there
+are any. Level 2 must have none; it is expected to reject subjects with a
+newline before the end (see convert._linear_regex_level2). Level 3 differs
+by design (see convert._linear_regex_level3).
+
+Usage:
+    python3 regex_analyze.py password --level 3 --compare
+    python3 regex_analyze.py "a.b*c+" --level 2 --linear --sizes 1000,10000,100000
+    python3 regex_analyze.py sample --pattern '^(a+)+$'
+    python3 regex_analyze.py --fuzz 5000 --level 2
+"""
+
+import argparse
+import math
+import multiprocessing
+import random
+import re
+import sys
+import time
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+import convert
+
+DEFAULT_SIZES = (100, 300, 1000, 3000, 10000)
+DEFAULT_TIMEOUT = 2.0
+FAMILIES = ("near-miss-repeat", "near-miss-spread", "noise-prefix",
+            "near-miss-lines")
+FUZZ_ALPHABET = "aAbZ159.+*\\( x\n"
+
+
+class Measurement(NamedTuple):
+    """Best search time for one input family and size (None = timed out)."""
+    family: str
+    size: int
+    seconds: Optional[float]
+
+
+def _miss_char(sample: str) -> str:
+    """A character that does not occur in the sample, in any case."""
+    for char in "#~%@!":
+        if char.lower() not in sample.lower():
+            return char
+    return "\x00"
+
+
+def make_subject(family: str, sample: str, size: int) -> str:
+    """Build an adversarial input of about size characters."""
+    miss = _miss_char(sample)
+    if family == "near-miss-repeat":
+        unit = sample[:-1] or sample
+        return (unit * (size // len(unit) + 1))[:size] + miss
+    if family == "near-miss-spread":
+        gap = max(0, size // max(1, len(sample)) - 1)
+        return "".join(char + "x" * gap for char in sample[:-1]) + miss
+    if family == "noise-prefix":
+        return "x" * size + sample
+    if family == "near-miss-lines":
+        unit = sample[:-1] or sample
+        return (unit * (size // len(unit) + 1))[:size] + "\n\n"
+    raise ValueError(f"Unknown input family: {family}")
+
+
+def _run_family(conn, pattern: str, sample: str, family: str,
+                sizes: Sequence[int], repeat: int) -> None:
+    """Worker entry point: time one family at each size, reporting as it goes."""
+    regex = re.compile(pattern)
+    for size in sizes:
+        subject = make_subject(family, sample, size)
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            regex.search(subject)
+            best = min(best, time.perf_counter() - start)
+        conn.send((size, best))
+    conn.close()
+
+
+def analyze_pattern(
+    pattern: str, sample: str, sizes: Sequence[int] = DEFAULT_SIZES,
+    timeout: float = DEFAULT_TIMEOUT, repeat: int = 3,
+    families: Sequence[str] = FAMILIES
+) -> List[Measurement]:
+    """
+    Time pattern.search over adversarial inputs derived from sample.
+
+    Args:
+        pattern: Regular expression to analyze
+        sample: Text the pattern was built for (non-empty)
+        sizes: Input sizes to try, in increasing order
+        timeout: Seconds allowed for one size before the family is abandoned
+        repeat: Runs per size; the best time is kept
+        families: Input families to try (default: all)
+
+    Returns:
+        list of Measurement, one per family and size
+
+    Raises:
+        re.error: If the pattern does not compile
+    """
+    if not sample:
+        raise ValueError("A non-empty sample text is required")
+    re.compile(pattern)
+    sizes = sorted(sizes)
+
+    results = []
+    for family in families:
+        parent, child = multiprocessing.Pipe(duplex=False)
+        worker = multiprocessing.Process(
+            target=_run_family,
+            args=(child, pattern, sample, family, sizes, repeat),
+            daemon=True,
+        )
+        worker.start()
+        child.close()
+        done = 0
+        try:
+            while done < len(sizes):
+                if not parent.poll(timeout * repeat):
+                    break
+                size, seconds = parent.recv()
+                results.append(Measurement(family, size, seconds))
+                done += 1
+        except EOFError:
+            pass
+        finally:
+            if worker.is_alive():
+                worker.terminate()
+            worker.join()
+            parent.close()
+        for size in sizes[done:]:
+            results.append(Measurement(family, size, None))
+    return results
+
+
+def growth_exponent(measurements: Sequence[Measurement]) -> Optional[float]:
+    """
+    Estimate k in time ~ size^k from the two largest completed sizes.
+
+    Returns None when fewer than two sizes completed or timings are too
+    small to compare.
+    """
+    completed = [m for m in measurements if m.seconds]
+    if len(completed) < 2:
+        return None
+    a, b = completed[-2], completed[-1]
+    if a.seconds < 1e-6 or b.size == a.size:
+        return None
+    return math.log(b.seconds / a.seconds) / math.log(b.size / a.size)
+
+
+def classify(measurements: Sequence[Measurement]) -> str:
+    """Summarize the growth of one family's timings."""
+    k = growth_exponent(measurements)
+    if any(m.seconds is None for m in measurements):
+        if k is None:
+            return "timed out"
+        return f"timed out (k={k:.2f} before the timeout)"
+    if k is None:
+        return "constant"
+    if k < 1.4:
+        return f"linear (k={k:.2f})"
+    if k < 2.4:
+        return f"quadratic (k={k:.2f})"
+    return f"super-quadratic (k={k:.2f})"
+
+
+def check_equivalence(
+    level: int = 2, cases: int = 1000, seed: int = 0, max_length: int = 8
+) -> List[Tuple[str, str, bool]]:
+    """
+    Compare escape_regex(text, level) with its linear variant on random input.
+
+    Args:
+        level: escape_regex security level (2 or 3)
+        cases: Number of random texts; each is tried against ten subjects
+        seed: Random seed, so failures can be reproduced
+        max_length: Longest random text
+
+    Level 2 linear patterns refuse subjects with a newline before the end,
+    so for those the expected answer is no match.
+
+    Returns:
+        list of (text, subject, expected) for every disagreement
+    """
+    rng = random.Random(seed)
+    mismatches = []
+    for _ in range(cases):
+        text = "".join(rng.choice(FUZZ_ALPHABET)
+                       for _ in range(rng.randint(0, max_length)))
+        original = re.compile(convert.escape_regex(text, level))
+        linear = re.compile(convert.escape_regex(text, level, True))
+        for _ in range(10):
+            if text and rng.random() < 0.6:
+                chars = list(text)
+                for _ in range(rng.randint(0, 4)):
+                    chars.insert(rng.randint(0, len(chars)),
+                                 rng.choice(FUZZ_ALPHABET))
+                subject = "".join(chars)
+            else:
+                subject = "".join(rng.choice(FUZZ_ALPHABET)
+                                  for _ in range(rng.randint(0, 10)))
+            expected = original.search(subject) is not None
+            if level == 2 and "\n" in subject[:-1]:
+                expected = False
+            if (linear.search(subject) is not None) != expected:
+                mismatches.append((text, subject, expected))
+    return mismatches
+
+
+def report(title: str, pattern: str, measurements: List[Measurement]) -> None:
+    """Print a per-family table and the worst case."""
+    print(f"\n{title}")
+    shown = pattern if len(pattern) <= 100 else pattern[:97] + "..."
+    print(f"pattern: {shown}")
+    print(f"{'family':<18} {'size':>8} {'ms':>10}")
+    worst: Optional[Measurement] = None
+    for family in dict.fromkeys(m.family for m in measurements):
+        rows = [m for m in measurements if m.family == family]
+        for m in rows:
+            ms = "timeout" if m.seconds is None else f"{m.seconds * 1000:.3f}"
+            print(f"{family:<18} {m.size:>8} {ms:>10}")
+            if worst is None or worst.seconds is not None and (
+                m.seconds is None or m.seconds > worst.seconds
+            ):
+                worst = m
+        print(f"{'':<18} {'growth':>8}  {classify(rows)}")
+    if worst is not None:
+        ms = ("timeout" if worst.seconds is None
+              else f"{worst.seconds * 1000:.3f} ms")
+        print(f"worst case: {ms} ({worst.family}, size {worst.size})")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Measure worst-case match time of escape_regex patterns"
+    )
+    parser.add_argument("text", nargs="?",
+                        help="Text the pattern is generated for")
+    parser.add_argument(
+        "--level", type=int, choices=[1, 2, 3], default=2,
+        help="escape_regex security level (default: 2)",
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--linear", action="store_true",
+        help="Analyze the linear-time (possessive/atomic) pattern",
+    )
+    mode.add_argument(
+        "--compare", action="store_true",
+        help="Analyze both the original and the linear-time pattern",
+    )
+    mode.add_argument(
+        "--pattern", help="Analyze this pattern instead, using TEXT as sample",
+    )
+    mode.add_argument(
+        "--fuzz", type=int, metavar="N",
+        help="Check the linear pattern against the original on N random texts",
+    )
+    parser.add_argument(
+        "--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+        help="Comma-separated input sizes (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=DEFAULT_TIMEOUT,
+        help=f"Seconds allowed per size (default: {DEFAULT_TIMEOUT})",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3,
+        help="Runs per size, best kept (default: 3)",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0, help="Random seed for --fuzz",
+    )
+    args = parser.parse_args()
+
+    if args.fuzz:
+        level = max(2, args.level)
+        mismatches = check_equivalence(level, args.fuzz, args.seed)
+        for text, subject, expected in mismatches[:20]:
+            print(f"text={text!r} subject={subject!r}: expected "
+                  f"{'a match' if expected else 'no match'}, linear differs")
+        print(f"level {level}: {len(mismatches)} mismatches in "
+              f"{args.fuzz * 10} subjects (seed {args.seed})")
+        return 1 if mismatches else 0
+    if args.text is None:
+        parser.error("TEXT is required unless --fuzz is given")
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    if args.pattern:
+        targets = [("custom pattern", args.pattern)]
+    else:
+        targets = []
+        if not args.linear:
+            targets.append((f"escape_regex level {args.level}",
+                            convert.escape_regex(args.text, args.level)))
+        if args.linear or args.compare:
+            targets.append((f"escape_regex level {args.level}, linear",
+                            convert.escape_regex(args.text, args.level, True)))
+
+    for title, pattern in targets:
+        try:
+            measurements = analyze_pattern(
+                pattern, args.text, sizes, args.timeout, max(1, args.repeat)
+            )
+        except (re.error, ValueError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+        report(title, pattern, measurements)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
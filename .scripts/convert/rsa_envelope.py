@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Hybrid RSA Envelope Encryption
+
+Encrypts payloads of any size to an RSA public key. A random AES-256 key is
+wrapped with RSA-OAEP-SHA256 (as in convert.rsa_encrypt) and the body is
+sealed with AES-256-GCM in the framed, chunked layout of stream_crypt.py, so
+memory use stays flat for large inputs.
+
+Envelope layout:
+    header: magic (4) | version (1) | chunk size (4) |
+            key fingerprint (16) | wrapped key length (2) | nonce prefix (7)
+    wrapped AES key (wrapped key length)
+    frames: length (4) | ciphertext + GCM tag (length)
+
+The fingerprint is the first 16 bytes of convert.rsa_key_fingerprint() for
+the recipient key; header and wrapped key are authenticated with every
+frame. PEM keys go through convert's key cache, so batch decryption parses
+the private key once and unwraps each envelope with the same key object.
+
+Usage:
+    python3 rsa_envelope.py encrypt --key public_key.pem -i backup.tar -o backup.tar.env
+    python3 rsa_envelope.py decrypt --key private_key.pem -i backup.tar.env -o backup.tar
+    python3 rsa_envelope.py decrypt-batch --key private_key.pem --out-dir plain/ inbox/*.env
+"""
+
+import argparse
+import base64
+import io
+import os
+import struct
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Iterable, List, Optional, Tuple
+
+import convert
+import stream_crypt
+from stream_crypt import StreamError, read_full
+
+if stream_crypt.CRYPTO_AVAILABLE:
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+MAGIC = b"CVTH"
+VERSION = 1
+DEFAULT_CHUNK_SIZE = stream_crypt.DEFAULT_CHUNK_SIZE
+FINGERPRINT_SIZE = 16
+AES_KEY_SIZE = 32
+
+_HEADER = struct.Struct(">4sBI16sH7s")
+
+
+def _read_key_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def encrypt_stream(
+    src: BinaryIO, dst: BinaryIO, public_key,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> int:
+    """
+    Encrypt everything read from src to an RSA public key.
+
+    Args:
+        src (BinaryIO): Binary file object to read plaintext from
+        dst (BinaryIO): Binary file object to write the envelope to
+        public_key: RSA public key object, or its PEM text
+        chunk_size (int): Plaintext bytes sealed per frame (default 1 MiB)
+
+    Returns:
+        int: Number of plaintext bytes encrypted
+    """
+    if not stream_crypt.CRYPTO_AVAILABLE:
+        raise RuntimeError("Cryptography package not installed")
+    if not 0 < chunk_size <= stream_crypt.MAX_CHUNK_SIZE:
+        raise ValueError(
+            f"Chunk size must be between 1 and {stream_crypt.MAX_CHUNK_SIZE}"
+        )
+    if isinstance(public_key, (str, bytes)):
+        public_key = convert.load_rsa_public_key(public_key)
+
+    data_key = os.urandom(AES_KEY_SIZE)
+    wrapped = public_key.encrypt(data_key, convert.rsa_oaep_padding())
+    prefix = os.urandom(stream_crypt.NONCE_PREFIX_SIZE)
+    header = _HEADER.pack(
+        MAGIC, VERSION, chunk_size,
+        convert.rsa_key_fingerprint(public_key)[:FINGERPRINT_SIZE],
+        len(wrapped), prefix
+    ) + wrapped
+    dst.write(header)
+    return stream_crypt.seal_frames(
+        AESGCM(data_key), prefix, header, src, dst, chunk_size
+    )
+
+
+def decrypt_stream(src: BinaryIO, dst: BinaryIO, private_key) -> int:
+    """
+    Decrypt an envelope produced by encrypt_stream.
+
+    Args:
+        src (BinaryIO): Binary file object to read the envelope from
+        dst (BinaryIO): Binary file object to write plaintext to
+        private_key: RSA private key object, or its PEM text
+
+    Returns:
+        int: Number of plaintext bytes written
+
+    Raises:
+        StreamError: If the envelope is malformed, for another key, or
+            fails authentication
+    """
+    if not stream_crypt.CRYPTO_AVAILABLE:
+        raise RuntimeError("Cryptography package not installed")
+    if isinstance(private_key, (str, bytes)):
+        private_key = convert.load_rsa_private_key(private_key)
+
+    fixed = read_full(src, _HEADER.size)
+    if len(fixed) != _HEADER.size:
+        raise StreamError("Truncated envelope header")
+    magic, version, chunk_size, fingerprint, wrapped_size, prefix = (
+        _HEADER.unpack(fixed)
+    )
+    if magic != MAGIC:
+        raise StreamError("Not an RSA envelope (bad magic)")
+    if version != VERSION:
+        raise StreamError(f"Unsupported envelope version: {version}")
+    if not 0 < chunk_size <= stream_crypt.MAX_CHUNK_SIZE:
+        raise StreamError(f"Invalid chunk size: {chunk_size}")
+    expected = convert.rsa_key_fingerprint(private_key)[:FINGERPRINT_SIZE]
+    if fingerprint != expected:
+        raise StreamError("Envelope was encrypted to a different RSA key")
+
+    wrapped = read_full(src, wrapped_size)
+    if len(wrapped) != wrapped_size:
+        raise StreamError("Truncated envelope: wrapped key incomplete")
+    try:
+        data_key = private_key.decrypt(wrapped, convert.rsa_oaep_padding())
+    except ValueError:
+        raise StreamError("Could not unwrap the data key") from None
+    if len(data_key) != AES_KEY_SIZE:
+        raise StreamError("Could not unwrap the data key")
+
+    return stream_crypt.open_frames(
+        AESGCM(data_key), prefix, fixed + wrapped,
+        src, dst, chunk_size
+    )
+
+
+def encrypt_bytes(data: bytes, public_key) -> bytes:
+    """Encrypt an in-memory payload to an RSA public key."""
+    dst = io.BytesIO()
+    encrypt_stream(io.BytesIO(data), dst, public_key)
+    return dst.getvalue()
+
+
+def decrypt_bytes(envelope: bytes, private_key) -> bytes:
+    """Decrypt an in-memory envelope."""
+    dst = io.BytesIO()
+    decrypt_stream(io.BytesIO(envelope), dst, private_key)
+    return dst.getvalue()
+
+
+def encrypt_text(text: str, public_key) -> str:
+    """
+    Encrypt text of any length to an RSA public key.
+
+    Returns:
+        str: Base64-encoded envelope, or an "[Encryption error: ...]" message
+    """
+    try:
+        return base64.b64encode(
+            encrypt_bytes(text.encode("utf-8"), public_key)
+        ).decode("utf-8")
+    except Exception as e:
+        return f"[Encryption error: {str(e)}]"
+
+
+def decrypt_text(encrypted_text: str, private_key) -> str:
+    """
+    Decrypt a Base64 envelope from encrypt_text.
+
+    Returns:
+        str: The decrypted text, or a "[Decryption error: ...]" message
+    """
+    try:
+        return decrypt_bytes(
+            base64.b64decode(encrypted_text), private_key
+        ).decode("utf-8")
+    except Exception as e:
+        return f"[Decryption error: {str(e)}]"
+
+
+def decrypt_many(envelopes: Iterable[bytes], private_key) -> List[bytes]:
+    """
+    Decrypt many in-memory envelopes with one private key.
+
+    The PEM (if given) is parsed once and reused for every envelope.
+
+    Raises:
+        StreamError: On the first envelope that fails to decrypt
+    """
+    if isinstance(private_key, (str, bytes)):
+        private_key = convert.load_rsa_private_key(private_key)
+    return [decrypt_bytes(envelope, private_key) for envelope in envelopes]
+
+
+def _output_path(path: str, out_dir: str) -> str:
+    name = os.path.basename(path)
+    for suffix in (".env", ".enc"):
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+            break
+    else:
+        name += ".dec"
+    return os.path.join(out_dir, name)
+
+
+def _decrypt_file(path: str, out_dir: str, private_key) -> Tuple[str, str, int]:
+    """Decrypt one envelope file; returns (path, error or "", bytes)."""
+    target = _output_path(path, out_dir)
+    try:
+        with open(path, "rb") as src, open(target, "wb") as dst:
+            return path, "", decrypt_stream(src, dst, private_key)
+    except (OSError, StreamError) as e:
+        if os.path.exists(target):
+            os.remove(target)
+        return path, str(e), 0
+
+
+def decrypt_files(
+    paths: Iterable[str], private_key, out_dir: str,
+    workers: Optional[int] = None
+) -> List[Tuple[str, str, int]]:
+    """
+    Decrypt envelope files into out_dir with one shared private key.
+
+    Envelopes are decrypted on a thread pool (OAEP unwrap and AES-GCM run
+    in native code). Outputs are named after the input without its
+    ".env"/".enc" suffix.
+
+    Returns:
+        list: (path, error message or "", plaintext bytes) per input
+    """
+    if isinstance(private_key, (str, bytes)):
+        private_key = convert.load_rsa_private_key(private_key)
+    os.makedirs(out_dir, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        return list(pool.map(
+            lambda path: _decrypt_file(path, out_dir, private_key), paths
+        ))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Hybrid RSA-OAEP + AES-256-GCM envelope encryption"
+    )
+    parser.add_argument("mode", choices=["encrypt", "decrypt", "decrypt-batch"])
+    parser.add_argument(
+        "paths", nargs="*", help="With decrypt-batch, envelope files"
+    )
+    parser.add_argument(
+        "--key", required=True,
+        help="PEM public key (encrypt) or private key (decrypt)",
+    )
+    parser.add_argument("-i", "--input", help="Input file (default: stdin)")
+    parser.add_argument(
+        "-o", "--output", help="Output file (default: stdout)"
+    )
+    parser.add_argument(
+        "--out-dir", default=".",
+        help="With decrypt-batch, directory for plaintext files",
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+        help=f"Plaintext bytes per frame (default: {DEFAULT_CHUNK_SIZE})",
+    )
+    parser.add_argument(
+        "-w", "--workers", type=int,
+        help="With decrypt-batch, files decrypted concurrently",
+    )
+    parser.add_argument(
+        "-q", "--quiet", action="store_true", help="Do not report throughput"
+    )
+    # Intermixed so envelope files may follow options like --out-dir
+    args = parser.parse_intermixed_args()
+
+    if not stream_crypt.CRYPTO_AVAILABLE:
+        print("Error: Cryptography package not installed.", file=sys.stderr)
+        print("Install with: pip install cryptography", file=sys.stderr)
+        return 1
+
+    try:
+        pem = _read_key_file(args.key)
+        key = (convert.load_rsa_public_key(pem) if args.mode == "encrypt"
+               else convert.load_rsa_private_key(pem))
+    except (OSError, ValueError) as e:
+        print(f"Error: cannot load key: {e}", file=sys.stderr)
+        return 1
+
+    start = time.perf_counter()
+    if args.mode == "decrypt-batch":
+        if not args.paths:
+            parser.error("decrypt-batch needs envelope files")
+        results = decrypt_files(args.paths, key, args.out_dir, args.workers)
+        total = sum(size for _, _, size in results)
+        failures = [(path, error) for path, error, _ in results if error]
+        for path, error in failures:
+            print(f"{path}: {error}", file=sys.stderr)
+        elapsed = time.perf_counter() - start
+        if not args.quiet:
+            rate = len(results) / elapsed if elapsed > 0 else 0.0
+            print(f"Decrypted {len(results) - len(failures)}/{len(results)} "
+                  f"envelopes ({total / (1024 * 1024):.2f} MB) in "
+                  f"{elapsed:.2f}s ({rate:.0f} envelopes/s)", file=sys.stderr)
+        return 1 if failures else 0
+
+    src = open(args.input, "rb") if args.input else sys.stdin.buffer
+    dst = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        if args.mode == "encrypt":
+            total = encrypt_stream(src, dst, key, args.chunk_size)
+        else:
+            total = decrypt_stream(src, dst, key)
+    except (StreamError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if args.input:
+            src.close()
+        if args.output:
+            dst.close()
+    elapsed = time.perf_counter() - start
+
+    if not args.quiet:
+        mb = total / (1024 * 1024)
+        rate = mb / elapsed if elapsed > 0 else 0.0
+        print(f"{args.mode.capitalize()}ed {mb:.2f} MB in {elapsed:.2f}s "
+              f"({rate:.1f} MB/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+RSA Keypair Pool
+
+Generating a 2048-bit RSA key takes 50-500 ms of CPU, so provisioning many
+tenants with convert.rsa_generate_keys blocks for minutes. This module moves
+generation into worker processes:
+
+- KeypairPool keeps up to `target` keypairs ready or in progress. get()
+  returns a ready pair immediately, and every pair handed out schedules
+  one replacement, so the pool refills in the background.
+- generate_to_directory writes N keypairs as PEM files using all cores
+  (private keys are created with mode 0600).
+
+Usage:
+    python3 rsa_pool.py -n 500 -o keys/ --prefix tenant_
+    python3 rsa_pool.py --bench -n 64
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+import convert
+
+DEFAULT_KEY_SIZE = 2048
+DEFAULT_TARGET = 8
+
+KeyPair = Tuple[str, str]
+
+
+def _generate(key_size: int) -> KeyPair:
+    """Worker entry point: one (private PEM, public PEM) pair."""
+    private_pem, public_pem = convert.rsa_generate_keys(key_size)
+    if private_pem.startswith("["):
+        raise RuntimeError(private_pem.strip("[]"))
+    return private_pem, public_pem
+
+
+class KeypairPool:
+    """
+    Pre-generated RSA keypairs, refilled in background worker processes.
+
+    Args:
+        target (int): Keypairs kept ready or in progress (the watermark)
+        workers (int, optional): Worker processes (default: all cores)
+        key_size (int): Modulus size in bits (default 2048)
+    """
+
+    def __init__(self, target: int = DEFAULT_TARGET,
+                 workers: Optional[int] = None,
+                 key_size: int = DEFAULT_KEY_SIZE):
+        if not convert.CRYPTO_AVAILABLE:
+            raise RuntimeError("Cryptography package not installed")
+        if target < 1:
+            raise ValueError("Pool target must be at least 1")
+        self.target = target
+        self.key_size = key_size
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers or os.cpu_count() or 1
+        )
+        self._ready: deque = deque()
+        self._errors: deque = deque()
+        self._pending = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self._refill()
+
+    def _refill(self) -> None:
+        """Schedule generation until ready + pending reaches the target."""
+        with self._cond:
+            missing = self.target - len(self._ready) - self._pending
+            if self._closed or missing <= 0:
+                return
+            self._pending += missing
+        for _ in range(missing):
+            self._executor.submit(_generate, self.key_size).add_done_callback(
+                self._collect
+            )
+
+    def _collect(self, future: Future) -> None:
+        with self._cond:
+            self._pending -= 1
+            if future.cancelled():
+                return
+            error = future.exception()
+            if error is not None:
+                self._errors.append(error)
+            else:
+                self._ready.append(future.result())
+            self._cond.notify()
+
+    @property
+    def ready(self) -> int:
+        """Number of keypairs available without waiting."""
+        with self._cond:
+            return len(self._ready)
+
+    def get(self, timeout: Optional[float] = None) -> KeyPair:
+        """
+        Take one keypair, waiting only if none is ready yet.
+
+        Returns:
+            Tuple[str, str]: PEM-encoded private and public keys
+
+        Raises:
+            TimeoutError: If no keypair became ready within timeout
+            RuntimeError: If the pool is closed or generation failed
+        """
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Keypair pool is closed")
+            if not self._cond.wait_for(
+                lambda: self._ready or self._errors, timeout
+            ):
+                raise TimeoutError("No keypair ready in time")
+            if self._errors and not self._ready:
+                error = self._errors.popleft()
+                raise RuntimeError(f"Key generation failed: {error}")
+            pair = self._ready.popleft()
+        self._refill()
+        return pair
+
+    def get_many(self, count: int) -> List[KeyPair]:
+        """Take count keypairs, temporarily raising the target to match."""
+        if count > self.target:
+            saved = self.target
+            with self._cond:
+                self.target = count
+            self._refill()
+            try:
+                return [self.get() for _ in range(count)]
+            finally:
+                with self._cond:
+                    self.target = saved
+        return [self.get() for _ in range(count)]
+
+    def close(self) -> None:
+        """Stop refilling and shut the worker processes down."""
+        with self._cond:
+            self._closed = True
+            self._ready.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self) -> "KeypairPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _write_pair(out_dir: str, name: str, pair: KeyPair) -> None:
+    private_pem, public_pem = pair
+    private_path = os.path.join(out_dir, f"{name}_private.pem")
+    fd = os.open(private_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        f.write(private_pem)
+    with open(os.path.join(out_dir, f"{name}_public.pem"), "w") as f:
+        f.write(public_pem)
+
+
+def generate_to_directory(
+    count: int, out_dir: str, workers: Optional[int] = None,
+    key_size: int = DEFAULT_KEY_SIZE, prefix: str = "key_"
+) -> int:
+    """
+    Generate count keypairs into out_dir using all cores.
+
+    Files are named <prefix><n>_private.pem / <prefix><n>_public.pem with n
+    zero-padded from 1; pairs are written as soon as they are generated.
+
+    Returns:
+        int: Number of keypairs written
+    """
+    if not convert.CRYPTO_AVAILABLE:
+        raise RuntimeError("Cryptography package not installed")
+    os.makedirs(out_dir, exist_ok=True)
+    width = max(4, len(str(count)))
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        pairs = pool.map(_generate, [key_size] * count, chunksize=4)
+        for index, pair in enumerate(pairs, 1):
+            _write_pair(out_dir, f"{prefix}{index:0{width}d}", pair)
+    return count
+
+
+def run_benchmark(count: int, workers: Optional[int], key_size: int) -> None:
+    """Compare sequential generation, bulk generation and pool hand-out."""
+    print(f"{count} x RSA-{key_size}")
+    print(f"{'method':<24} {'seconds':>9} {'keys/s':>9} {'ms/key':>9}")
+
+    def report(name: str, elapsed: float) -> None:
+        print(f"{name:<24} {elapsed:>9.2f} {count / elapsed:>9.1f} "
+              f"{elapsed / count * 1000:>9.2f}")
+
+    start = time.perf_counter()
+    for _ in range(count):
+        _generate(key_size)
+    report("sequential", time.perf_counter() - start)
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        start = time.perf_counter()
+        list(pool.map(_generate, [key_size] * count, chunksize=4))
+        report("parallel bulk", time.perf_counter() - start)
+
+    with KeypairPool(target=count, workers=workers, key_size=key_size) as pool:
+        # Let the pool fill as it would between provisioning bursts
+        while pool.ready < count:
+            time.sleep(0.05)
+        start = time.perf_counter()
+        pool.get_many(count)
+        report("warm pool get()", time.perf_counter() - start)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Generate RSA keypairs in bulk on all cores"
+    )
+    parser.add_argument(
+        "-n", "--count", type=int, default=1,
+        help="Number of keypairs (default: 1)",
+    )
+    parser.add_argument(
+        "-o", "--out-dir", default=".",
+        help="Directory for the PEM files (default: current directory)",
+    )
+    parser.add_argument(
+        "--prefix", default="key_", help="File name prefix (default: key_)"
+    )
+    parser.add_argument(
+        "--key-size", type=int, default=DEFAULT_KEY_SIZE,
+        help=f"Modulus size in bits (default: {DEFAULT_KEY_SIZE})",
+    )
+    parser.add_argument(
+        "-w", "--workers", type=int,
+        help="Worker processes (default: all cores)",
+    )
+    parser.add_argument(
+        "--bench", action="store_true",
+        help="Compare sequential, bulk and pooled generation",
+    )
+    args = parser.parse_args()
+
+    if not convert.CRYPTO_AVAILABLE:
+        print("Error: Cryptography package not installed.", file=sys.stderr)
+        return 1
+
+    if args.bench:
+        run_benchmark(max(1, args.count), args.workers, args.key_size)
+        return 0
+
+    start = time.perf_counter()
+    try:
+        written = generate_to_directory(
+            max(1, args.count), args.out_dir, args.workers, args.key_size,
+            args.prefix
+        )
+    except (OSError, RuntimeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - start
+    rate = written / elapsed if elapsed > 0 else 0.0
+    print(f"Generated {written} keypairs in {args.out_dir} in {elapsed:.2f}s "
+          f"({rate:.1f} keys/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
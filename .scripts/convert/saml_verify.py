@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Bulk Advanced SAML URL Verifier
+
+Re-verifies a file of advanced SAML URLs (one per line) on all cores. Each
+worker builds one convert.SamlUrlSigner and checks chunks of URLs with it,
+so legacy and compact URLs can be mixed. Results are written in input order
+as one compact tab-separated line per URL:
+
+    <line number>\t<code>
+
+where code is "ok" or a failure reason ("format", "begin_hash", "end_hash",
+"email", "auth", "error"). Aggregate counts and throughput are printed at the end.
+
+Usage:
+    SAML_KEY=secret python3 saml_verify.py -i audit_urls.txt -o results.tsv --key-env SAML_KEY
+    python3 saml_verify.py -i audit_urls.txt --invalid-only
+"""
+
+import argparse
+import getpass
+import os
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, List, Optional
+
+import convert
+
+DEFAULT_CHUNK_SIZE = 2000
+
+# Per-worker signer set by _init_worker
+_worker_signer: Optional["convert.SamlUrlSigner"] = None
+
+
+def _init_worker(encryption_key: str) -> None:
+    """Derive the key material once for this worker process."""
+    global _worker_signer
+    _worker_signer = convert.SamlUrlSigner(encryption_key)
+
+
+def _verify_chunk(urls: List[str]) -> List[str]:
+    """Return the verification code for each URL in the chunk."""
+    return [_worker_signer.check(url)[0] for url in urls]
+
+
+def _chunked(lines: Iterable[str], size: int) -> Iterator[List[str]]:
+    """Group stripped lines into lists of at most size items."""
+    chunk = []
+    for line in lines:
+        chunk.append(line.strip())
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def verify_urls(
+    urls: Iterable[str], encryption_key: str,
+    workers: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[str]:
+    """
+    Verify URLs across a process pool.
+
+    Args:
+        urls: Iterable of advanced SAML URLs (consumed lazily)
+        encryption_key: The encryption key used to create the URLs
+        workers: Number of worker processes (default: all cores)
+        chunk_size: URLs per work unit
+
+    Yields:
+        str: Verification code for each URL, in input order
+    """
+    if not convert.CRYPTO_AVAILABLE:
+        raise RuntimeError("Cryptography package required for verification")
+
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = workers * 2
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(encryption_key,),
+    ) as pool:
+        pending = deque()
+        for chunk in _chunked(urls, chunk_size):
+            pending.append(pool.submit(_verify_chunk, chunk))
+            if len(pending) >= max_in_flight:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def summarize(counts: Counter, elapsed: float) -> List[str]:
+    """Format aggregate counts and throughput as report lines."""
+    total = sum(counts.values())
+    rate = total / elapsed if elapsed > 0 else 0.0
+    lines = [
+        f"Verified {total} URLs in {elapsed:.2f}s ({rate:.0f} URLs/s)",
+        f"  valid:   {counts.get('ok', 0)}",
+        f"  invalid: {total - counts.get('ok', 0)}",
+    ]
+    for code, count in sorted(counts.items()):
+        if code != "ok":
+            lines.append(f"    {code}: {count}")
+    return lines
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Verify a file of advanced SAML URLs in parallel"
+    )
+    parser.add_argument("-i", "--input", help="URL file (default: stdin)")
+    parser.add_argument(
+        "-o", "--output", help="Result file (default: stdout)"
+    )
+    parser.add_argument(
+        "--key-env", metavar="VAR",
+        help="Read the encryption key from this environment variable",
+    )
+    parser.add_argument(
+        "-w", "--workers", type=int,
+        help="Worker processes (default: all cores)",
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+        help=f"URLs per work unit (default: {DEFAULT_CHUNK_SIZE})",
+    )
+    parser.add_argument(
+        "--invalid-only", action="store_true",
+        help="Only write result lines for URLs that fail verification",
+    )
+    args = parser.parse_args()
+
+    if not convert.CRYPTO_AVAILABLE:
+        print("Error: Cryptography package required for verification.",
+              file=sys.stderr)
+        return 1
+
+    encryption_key = (os.environ.get(args.key_env) if args.key_env
+                      else getpass.getpass("Enter encryption key: "))
+    if not encryption_key:
+        print("Error: Empty encryption key", file=sys.stderr)
+        return 1
+
+    src = open(args.input, encoding="utf-8") if args.input else sys.stdin
+    dst = (open(args.output, "w", encoding="utf-8", buffering=1024 * 1024)
+           if args.output else sys.stdout)
+
+    counts: Counter = Counter()
+    start = time.perf_counter()
+    try:
+        for line_no, code in enumerate(
+            verify_urls(src, encryption_key, args.workers, args.chunk_size),
+            1
+        ):
+            counts[code] += 1
+            if code != "ok" or not args.invalid_only:
+                dst.write(f"{line_no}\t{code}\n")
+    finally:
+        if args.input:
+            src.close()
+        if args.output:
+            dst.close()
+    elapsed = time.perf_counter() - start
+
+    for line in summarize(counts, elapsed):
+        print(line, file=sys.stderr)
+    return 0 if counts.get("ok", 0) == sum(counts.values()) else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
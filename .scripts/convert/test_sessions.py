@@ -0,0 +1,127 @@
+"""
+Tests for the pooled MongoDB session helpers in convert.py, run against
+mongomock instead of a live mongod.
+"""
+
+import datetime
+
+import pytest
+
+mongomock = pytest.importorskip("mongomock")
+pymongo_errors = pytest.importorskip("pymongo.errors")
+
+import convert  # noqa: E402
+
+CONNECTION = "mongodb://localhost:27017/"
+
+
+@pytest.fixture
+def index_calls(monkeypatch):
+    """Route the shared client to mongomock and count create_index calls."""
+    calls = []
+    create_index = mongomock.collection.Collection.create_index
+
+    def counting_create_index(self, keys, **kwargs):
+        calls.append((self.database.name, keys))
+        return create_index(self, keys, **kwargs)
+
+    monkeypatch.setattr(convert, "MONGODB_AVAILABLE", True)
+    monkeypatch.setattr(convert, "MongoClient", mongomock.MongoClient)
+    monkeypatch.setattr(mongomock.collection.Collection, "create_index",
+                        counting_create_index)
+    convert.close_mongo_clients()
+    yield calls
+    convert.close_mongo_clients()
+
+
+@pytest.fixture
+def db(index_calls):
+    return convert.initialize_session_db(CONNECTION, "sessions_test")
+
+
+def test_creates_one_session_per_user(db):
+    results = convert.create_user_sessions(db, ["alice", "bob"])
+
+    assert [ok for ok, _, _ in results] == [True, True]
+    assert [s["user_id"] for _, _, s in results] == ["alice", "bob"]
+    assert db.sessions.count_documents({}) == 2
+
+
+def test_accepts_a_generator_of_ids(db):
+    results = convert.create_user_sessions(db, (u for u in ["alice", "bob"]))
+
+    assert [ok for ok, _, _ in results] == [True, True]
+
+
+def test_existing_active_session_is_a_conflict(db):
+    ok, _, first = convert.create_user_session(db, "alice")
+    assert ok
+
+    results = convert.create_user_sessions(db, ["alice", "bob"])
+
+    assert results[0][:2] == (False, "User already has an active session")
+    assert results[0][2]["token"] == first["token"]
+    assert results[1][0] is True
+    assert db.sessions.count_documents({"user_id": "alice"}) == 1
+
+
+def test_duplicate_ids_in_one_call(db):
+    results = convert.create_user_sessions(db, ["alice", "bob", "alice"])
+
+    assert results[0][0] is True
+    assert results[1][0] is True
+    assert results[2] == (False, "Duplicate user id in request", {})
+    assert db.sessions.count_documents({"user_id": "alice"}) == 1
+
+
+def test_expired_session_reports_the_write_error(db):
+    past = datetime.datetime.utcnow() - datetime.timedelta(hours=1)
+    db.sessions.insert_one({"user_id": "alice", "token": "old",
+                            "expires_at": past})
+
+    ok, message, session = convert.create_user_session(db, "alice")
+
+    assert not ok
+    assert message.startswith("Error creating session:")
+    assert session == {}
+
+
+def test_non_duplicate_write_error(db, monkeypatch):
+    insert_many = mongomock.collection.Collection.insert_many
+
+    def failing_insert_many(self, documents, ordered=True, **kwargs):
+        # Store every document but the second, which fails validation
+        documents = list(documents)
+        insert_many(self, documents[:1] + documents[2:], ordered=ordered)
+        raise pymongo_errors.BulkWriteError({
+            "writeErrors": [{"index": 1, "code": 121,
+                             "errmsg": "Document failed validation"}],
+        })
+
+    monkeypatch.setattr(mongomock.collection.Collection, "insert_many",
+                        failing_insert_many)
+
+    results = convert.create_user_sessions(db, ["alice", "bob", "carol"])
+
+    assert results[0][0] is True
+    assert results[1] == (
+        False, "Error creating session: Document failed validation", {}
+    )
+    assert results[2][0] is True
+
+
+def test_indexes_created_once_per_connection_and_db(index_calls):
+    fields = [field for field, _ in convert.SESSION_INDEXES]
+
+    first = convert.initialize_session_db(CONNECTION, "app_one")
+    again = convert.initialize_session_db(CONNECTION, "app_one")
+    other = convert.initialize_session_db(CONNECTION, "app_two")
+
+    assert first is not None and again is not None and other is not None
+    assert index_calls == ([("app_one", f) for f in fields]
+                           + [("app_two", f) for f in fields])
+    assert convert.get_mongo_client(CONNECTION) is first.client
+
+    convert.close_mongo_clients()
+    convert.initialize_session_db(CONNECTION, "app_one")
+    assert len(index_calls) == 3 * len(fields)
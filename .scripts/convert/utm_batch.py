@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Streaming UTM URL Batch Generator
+
+Writes UTM-tagged URLs straight to a file, gzip file or stdout using
+convert.iter_batch_utm_urls, one URL per line. URLs are generated lazily, so
+the 10,000 URL cap of the interactive generator does not apply here.
+
+With --workers the ID range 1..count is split into contiguous shards, each
+generated by its own process into a part file (part N holds a fixed utm_id
+range), and the parts are concatenated in order into the final output.
+
+Usage:
+    python3 utm_batch.py example.com newsletter email fall2025 -n 1000000 -o urls.txt.gz
+    python3 utm_batch.py example.com fb social winter -n 50000 --custom --key-env UTM_KEY
+    python3 utm_batch.py example.com fb social winter -n 1000000 --custom -w 8 -o urls.txt
+    python3 utm_batch.py --bench -n 20000 --scaling 1,2,4,8
+"""
+
+import argparse
+import getpass
+import gzip
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, List, Optional, Sequence, TextIO, Tuple
+
+import convert
+
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+
+def open_output(path: Optional[str]) -> TextIO:
+    """Open an output path for text writing; '.gz' paths are gzip-compressed."""
+    if not path or path == "-":
+        return sys.stdout
+    if path.endswith(".gz"):
+        return io.TextIOWrapper(
+            io.BufferedWriter(gzip.open(path, "wb", compresslevel=6),
+                              WRITE_BUFFER_SIZE),
+            encoding="utf-8",
+        )
+    return open(path, "w", encoding="utf-8", buffering=WRITE_BUFFER_SIZE)
+
+
+def write_urls(urls: Iterable[str], out: TextIO) -> int:
+    """Write URLs one per line and return how many were written."""
+    written = 0
+    for url in urls:
+        out.write(url)
+        out.write("\n")
+        written += 1
+    return written
+
+
+def shard_ranges(count: int, shards: int) -> List[Tuple[int, int]]:
+    """
+    Split utm_id range 1..count into contiguous (start_id, count) shards.
+
+    Shard sizes differ by at most one, and the split depends only on count
+    and shards, so the same inputs always give the same ID ranges.
+    """
+    shards = max(1, min(shards, count))
+    base, extra = divmod(count, shards)
+    ranges = []
+    start = 1
+    for shard in range(shards):
+        size = base + (1 if shard < extra else 0)
+        ranges.append((start, size))
+        start += size
+    return ranges
+
+
+def _generate_shard(
+    part_path: str, start_id: int, count: int, params: dict
+) -> Tuple[str, int]:
+    """Worker entry point: generate one shard into its own part file."""
+    urls = convert.iter_batch_utm_urls(
+        count=count, start_id=start_id, **params
+    )
+    out = open_output(part_path)
+    try:
+        written = write_urls(urls, out)
+    finally:
+        out.close()
+    return part_path, written
+
+
+def generate_sharded(
+    output: Optional[str], count: int, workers: int, params: dict,
+    keep_parts: bool = False
+) -> int:
+    """
+    Generate count URLs across worker processes and merge the parts in order.
+
+    Args:
+        output: Final output path ('.gz' for gzip), or None for stdout
+        count: Total number of URLs
+        workers: Number of worker processes (and shards)
+        params: Keyword arguments for convert.iter_batch_utm_urls
+        keep_parts: Keep the per-shard part files instead of merging them
+
+    Returns:
+        int: Number of URLs written
+    """
+    ranges = shard_ranges(count, workers)
+    if output and output != "-":
+        part_dir = os.path.dirname(os.path.abspath(output))
+        part_stem = os.path.basename(output)
+    else:
+        part_dir = tempfile.mkdtemp(prefix="utm_parts_")
+        part_stem = "urls.txt"
+    suffix = ".gz" if part_stem.endswith(".gz") else ""
+    if suffix:
+        part_stem = part_stem[:-3]
+    part_paths = [
+        os.path.join(part_dir, f"{part_stem}.part{index:03d}{suffix}")
+        for index in range(len(ranges))
+    ]
+
+    with ProcessPoolExecutor(max_workers=len(ranges)) as pool:
+        futures = [
+            pool.submit(_generate_shard, path, start_id, size, params)
+            for path, (start_id, size) in zip(part_paths, ranges)
+        ]
+        written = sum(future.result()[1] for future in futures)
+
+    if keep_parts and output and output != "-":
+        return written
+
+    # Parts are plain text or complete gzip members, so byte-level
+    # concatenation yields a valid file in utm_id order
+    if output and output != "-":
+        dst = open(output, "wb")
+    else:
+        sys.stdout.flush()
+        dst = sys.stdout.buffer
+    try:
+        for path in part_paths:
+            with open(path, "rb") as src:
+                shutil.copyfileobj(src, dst, WRITE_BUFFER_SIZE)
+            os.remove(path)
+    finally:
+        if dst is not sys.stdout.buffer:
+            dst.close()
+        else:
+            dst.flush()
+    if not output or output == "-":
+        os.rmdir(part_dir)
+    return written
+
+
+def run_scaling_benchmark(count: int, worker_counts: Sequence[int]) -> None:
+    """Report sharded custom-format throughput and speedup per worker count."""
+    if not convert.CRYPTO_AVAILABLE:
+        print("Note: cryptography not installed, skipping scaling benchmark")
+        return
+
+    params = {
+        "url": "www.example.com", "source": "newsletter", "medium": "email",
+        "campaign": "bench", "use_custom_format": True,
+        "encryption_key": "benchmark-key",
+    }
+    print(f"\nSharded custom format, {count} URLs")
+    print(f"{'workers':>7} {'seconds':>9} {'urls/s':>12} {'speedup':>8}")
+    baseline = None
+    with tempfile.TemporaryDirectory(prefix="utm_bench_") as tmp:
+        for workers in worker_counts:
+            output = os.path.join(tmp, f"bench_{workers}.txt")
+            start = time.perf_counter()
+            generate_sharded(output, count, workers, params)
+            elapsed = time.perf_counter() - start
+            rate = count / elapsed if elapsed > 0 else 0.0
+            baseline = baseline or rate
+            print(f"{workers:>7} {elapsed:>9.3f} {rate:>12.0f} "
+                  f"{rate / baseline:>7.2f}x")
+
+
+def run_benchmark(count: int) -> None:
+    """Report URLs/s for the plain and custom-format paths."""
+    args = ("www.example.com", "newsletter", "email", "bench")
+    cases = [("plain", False, None)]
+    if convert.CRYPTO_AVAILABLE:
+        cases.append(("custom", True, "benchmark-key"))
+    else:
+        print("Note: cryptography not installed, skipping custom format")
+
+    print(f"{'path':<8} {'api':<10} {'urls':>9} {'seconds':>9} {'urls/s':>12}")
+    for name, custom, key in cases:
+        list_count = min(count, 10000)
+        runs = [
+            ("list", list_count, lambda n: convert.generate_batch_utm_urls(
+                *args, count=n, use_custom_format=custom,
+                encryption_key=key)),
+            ("generator", count, lambda n: sum(1 for _ in (
+                convert.iter_batch_utm_urls(
+                    *args, count=n, use_custom_format=custom,
+                    encryption_key=key)))),
+        ]
+        for api, n, func in runs:
+            start = time.perf_counter()
+            func(n)
+            elapsed = time.perf_counter() - start
+            rate = n / elapsed if elapsed > 0 else 0.0
+            print(f"{name:<8} {api:<10} {n:>9} {elapsed:>9.3f} {rate:>12.0f}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Stream UTM-tagged URLs to a file, gzip file or stdout"
+    )
+    parser.add_argument("url", nargs="?", help="Base URL to tag")
+    parser.add_argument("source", nargs="?", help="utm_source")
+    parser.add_argument("medium", nargs="?", help="utm_medium")
+    parser.add_argument("campaign", nargs="?", help="utm_campaign")
+    parser.add_argument("--content", help="utm_content")
+    parser.add_argument("--term", help="utm_term")
+    parser.add_argument(
+        "-n", "--count", type=int, default=1,
+        help="Number of URLs to generate (default: 1)",
+    )
+    parser.add_argument(
+        "-o", "--output",
+        help="Output file, '.gz' for gzip (default: stdout)",
+    )
+    parser.add_argument(
+        "--custom", action="store_true",
+        help="Use the advanced SAML-style URL format",
+    )
+    parser.add_argument(
+        "--key-env", metavar="VAR",
+        help="Read the custom-format encryption key from this variable",
+    )
+    parser.add_argument(
+        "-w", "--workers", type=int, default=1,
+        help="Generate in this many parallel shards (default: 1)",
+    )
+    parser.add_argument(
+        "--keep-parts", action="store_true",
+        help="With --workers, keep per-shard part files instead of merging",
+    )
+    parser.add_argument(
+        "--bench", action="store_true",
+        help="Benchmark URLs/s for the plain and custom paths",
+    )
+    parser.add_argument(
+        "--scaling", metavar="LIST",
+        help="With --bench, worker counts for the sharded benchmark "
+             "(e.g. 1,2,4,8)",
+    )
+    args = parser.parse_args()
+
+    if args.bench:
+        count = max(1, args.count)
+        run_benchmark(count)
+        if args.scaling:
+            worker_counts = [int(w) for w in args.scaling.split(",") if w]
+            run_scaling_benchmark(count, worker_counts)
+        return 0
+
+    if not all([args.url, args.source, args.medium, args.campaign]):
+        parser.error("url, source, medium and campaign are required")
+
+    encryption_key = None
+    if args.custom:
+        if not convert.CRYPTO_AVAILABLE:
+            print("Error: Custom format requires cryptography package.",
+                  file=sys.stderr)
+            return 1
+        encryption_key = (os.environ.get(args.key_env) if args.key_env
+                          else getpass.getpass("Enter encryption key: "))
+        if not encryption_key:
+            print("Error: Empty encryption key", file=sys.stderr)
+            return 1
+
+    params = {
+        "url": args.url, "source": args.source, "medium": args.medium,
+        "campaign": args.campaign, "content": args.content,
+        "term": args.term, "use_custom_format": args.custom,
+        "encryption_key": encryption_key,
+    }
+
+    start = time.perf_counter()
+    if args.workers > 1:
+        written = generate_sharded(
+            args.output, max(1, args.count), args.workers, params,
+            args.keep_parts
+        )
+    else:
+        urls = convert.iter_batch_utm_urls(count=args.count, **params)
+        out = open_output(args.output)
+        try:
+            written = write_urls(urls, out)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+    elapsed = time.perf_counter() - start
+
+    rate = written / elapsed if elapsed > 0 else 0.0
+    print(
+        f"Generated {written} URLs in {elapsed:.2f}s ({rate:.0f} URLs/s)",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())